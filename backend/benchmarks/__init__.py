@@ -0,0 +1,13 @@
+# backend/benchmarks/__init__.py
+"""
+Stand-alone performance benchmarks, run from backend/ with
+`python -m benchmarks.<name> --help`.
+"""
+import os
+
+import django
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
@@ -0,0 +1,196 @@
+# backend/benchmarks/celery_queues.py
+"""
+Mixed-traffic load test of one shared Celery queue against the per-workload
+queues (parse / db / light) of entrypoint.sh.
+
+Synthetic tasks stand in for each workload: `cpu` burns CPU like PDF
+parsing, `io` sleeps like an external-DB query, `light` returns at once
+like a batch summary or notification. The same interleaved traffic is sent
+to real worker subprocesses in both profiles; latency is submit -> finish
+per task:
+
+    shared - one prefork worker on one queue (the old setup)
+    split  - prefork `parse` worker (prefetch 1) plus thread-pool `db`
+             and `light` workers, as in entrypoint.sh
+
+    python -m benchmarks.celery_queues                          # REDIS_URL
+    python -m benchmarks.celery_queues --cpu 40 --io 120 --light 200
+    python -m benchmarks.celery_queues --broker filesystem://   # no Redis needed
+
+The filesystem transport polls, and a worker at prefetch 1 waits a poll
+cycle after every task, which inflates the split profile's cpu latency;
+use Redis for numbers comparable to production.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from celery import Celery
+
+app = Celery("queue_benchmark")
+app.conf.update(
+    broker_url=os.environ.get("QUEUE_BENCH_BROKER", "memory://"),
+    result_backend=os.environ.get("QUEUE_BENCH_BACKEND", "cache+memory://"),
+    broker_transport_options=json.loads(os.environ.get("QUEUE_BENCH_TRANSPORT", "{}")),
+    task_serializer="json",
+    accept_content=["json"],
+    worker_hijack_root_logger=False,
+)
+
+
+@app.task(name="bench.cpu")
+def cpu(ms: float) -> float:
+    deadline = time.process_time() + ms / 1000
+    while time.process_time() < deadline:
+        pass
+    return time.time()
+
+
+@app.task(name="bench.io")
+def io(ms: float) -> float:
+    time.sleep(ms / 1000)
+    return time.time()
+
+
+@app.task(name="bench.light")
+def light() -> float:
+    return time.time()
+
+
+# queue -> worker options, mirroring entrypoint.sh
+PROFILES = {
+    "shared": {
+        "celery": ["--pool", "prefork", "--concurrency", "{cores}", "--prefetch-multiplier", "4"],
+    },
+    "split": {
+        "parse": ["--pool", "prefork", "--concurrency", "{cores}", "--prefetch-multiplier", "1"],
+        "db":    ["--pool", "threads", "--concurrency", "8", "--prefetch-multiplier", "2"],
+        "light": ["--pool", "threads", "--concurrency", "4", "--prefetch-multiplier", "8"],
+    },
+}
+ROUTES = {"split": {"cpu": "parse", "io": "db", "light": "light"}}
+
+
+def _traffic(args) -> list[str]:
+    # interleave the kinds evenly, as concurrent users would
+    kinds = ["cpu"] * args.cpu + ["io"] * args.io + ["light"] * args.light
+    total = len(kinds)
+    weights = {kind: kinds.count(kind) / total for kind in set(kinds)}
+    sent = {kind: 0 for kind in weights}
+    order = []
+    for i in range(1, total + 1):
+        kind = max(weights, key=lambda k: weights[k] * i - sent[k])
+        sent[kind] += 1
+        order.append(kind)
+    return order
+
+
+def _start_workers(profile: str, cores: int, env: dict) -> list:
+    workers = []
+    for queue, options in PROFILES[profile].items():
+        cmd = [
+            sys.executable, "-m", "celery", "-A", "benchmarks.celery_queues", "--quiet", "worker",
+            "-Q", queue, "-n", f"{queue}@bench", "--loglevel", "warning", "--without-mingle",
+            "--without-gossip", "--without-heartbeat",
+        ] + [opt.format(cores=cores) for opt in options]
+        workers.append(subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    return workers
+
+
+def _run_profile(profile: str, args, env: dict) -> dict:
+    routes = ROUTES.get(profile, {})
+    tasks = {"cpu": (cpu, (args.cpu_ms,)), "io": (io, (args.io_ms,)), "light": (light, ())}
+
+    workers = _start_workers(profile, args.cores, env)
+    try:
+        # warm-up: wait until every worker consumes
+        for queue in PROFILES[profile]:
+            light.apply_async(queue=queue).get(timeout=60)
+
+        submitted = []
+        start = time.time()
+        for kind in _traffic(args):
+            task, task_args = tasks[kind]
+            submitted.append((kind, time.time(), task.apply_async(task_args, queue=routes.get(kind, "celery"))))
+        finished = [(kind, sent_at, result.get(timeout=args.timeout)) for kind, sent_at, result in submitted]
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait(timeout=30)
+
+    row = {"profile": profile, "tasks": len(finished)}
+    row["wall_s"] = round(max(done for _, _, done in finished) - start, 2)
+    row["throughput_per_s"] = round(len(finished) / row["wall_s"], 1)
+    for kind in ("cpu", "io", "light"):
+        latencies = sorted((done - sent_at) * 1000 for k, sent_at, done in finished if k == kind)
+        if latencies:
+            row[kind] = {
+                "p50_ms": round(statistics.median(latencies), 1),
+                "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 1),
+            }
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cpu", type=int, default=24, help="number of CPU-bound tasks")
+    parser.add_argument("--io", type=int, default=80, help="number of I/O-bound tasks")
+    parser.add_argument("--light", type=int, default=120, help="number of light tasks")
+    parser.add_argument("--cpu-ms", type=float, default=200)
+    parser.add_argument("--io-ms", type=float, default=300)
+    parser.add_argument("--cores", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--broker", default="", help="defaults to REDIS_URL")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    broker = args.broker or os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+    spool = None
+    env = dict(os.environ)
+    if broker.startswith("filesystem://"):
+        spool = tempfile.mkdtemp(prefix="queue-bench-")
+        os.makedirs(os.path.join(spool, "results"))
+        env["QUEUE_BENCH_TRANSPORT"] = json.dumps(
+            {"data_folder_in": spool, "data_folder_out": spool, "polling_interval": 0.05}
+        )
+        env["QUEUE_BENCH_BACKEND"] = f"file://{os.path.join(spool, 'results')}"
+    else:
+        env["QUEUE_BENCH_BACKEND"] = broker
+    env["QUEUE_BENCH_BROKER"] = broker
+    app.conf.update(
+        broker_url=broker,
+        result_backend=env["QUEUE_BENCH_BACKEND"],
+        broker_transport_options=json.loads(env.get("QUEUE_BENCH_TRANSPORT", "{}")),
+    )
+
+    results = []
+    try:
+        for profile in args.profiles:
+            row = _run_profile(profile, args, env)
+            results.append(row)
+            print(
+                f"{profile:>6}: {row['tasks']} tasks in {row['wall_s']:>6.2f}s "
+                f"({row['throughput_per_s']:>6.1f}/s)  " + "  ".join(
+                    f"{kind} p50 {row[kind]['p50_ms']:>7.1f} / p95 {row[kind]['p95_ms']:>7.1f} ms"
+                    for kind in ("cpu", "io", "light") if kind in row
+                )
+            )
+    finally:
+        if spool:
+            shutil.rmtree(spool, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# backend/benchmarks/import_time.py
+"""
+Cold-start import time of the processes the app runs as, each measured in a
+fresh interpreter:
+
+    web     - django.setup() and config.urls, what runserver / gunicorn load
+              before serving the first request
+    worker  - config.celery and the autodiscovered task modules, what a
+              Celery worker loads before consuming
+    parsers - every partner parser and calculator of the registry, the
+              one-off cost a worker now pays on its first evaluation
+
+For each it prints the median time and which heavy libraries were imported.
+Run it on two checkouts and compare the --output files.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --repeat 10 --output after.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY = [
+    "pandas", "numpy", "sqlalchemy", "pdfplumber", "fitz", "openpyxl",
+    "gspread", "oauth2client", "slack_sdk", "requests",
+]
+
+_PROLOGUE = """
+import os, sys, time
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+start = time.perf_counter()
+"""
+
+_EPILOGUE = """
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in HEAVY if m in sys.modules]}))
+"""
+
+TARGETS = {
+    "web": """
+import django
+django.setup()
+import config.urls
+""",
+    "worker": """
+from config.celery import app
+import django
+django.setup()
+app.loader.import_default_modules()
+""",
+    "parsers": """
+import django
+django.setup()
+from logistics.services.partner_registry import partner_registry
+for spec in partner_registry:
+    spec.parser_cls, spec.calculator_cls
+""",
+}
+
+
+def _measure(target: str) -> dict:
+    code = (
+        "import json\n"
+        f"HEAVY = {HEAVY!r}\n"
+        + _PROLOGUE + TARGETS[target] + _EPILOGUE
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH", "")]))
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    # the last line is ours; settings / dotenv may print before it
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for target in args.targets:
+        runs = [_measure(target) for _ in range(args.repeat)]
+        seconds = sorted(run["seconds"] for run in runs)
+        row = {
+            "target": target,
+            "median_s": round(statistics.median(seconds), 3),
+            "min_s": round(seconds[0], 3),
+            "loaded": runs[-1]["loaded"],
+        }
+        results.append(row)
+        print(
+            f"{target:>7}: median {row['median_s']:.3f}s  min {row['min_s']:.3f}s  "
+            f"loaded: {', '.join(row['loaded']) or '-'}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# backend/benchmarks/orders_query.py
+"""
+Compare the fetchall and server-side cursor paths of
+DatabaseService.execute_query_with_retries (wall time and peak RSS).
+
+Every mode runs in its own subprocess so peak RSS is measured in isolation:
+
+    python -m benchmarks.orders_query                     # real orders window
+    python -m benchmarks.orders_query --synthetic 500000  # generate_series rows
+    python -m benchmarks.orders_query --url postgresql+psycopg2://u:p@host/db --synthetic 500000
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks import setup_django
+
+# shaped like the orders window: uuids, text, numerics, dates, countries
+SYNTHETIC_QUERY = """
+SELECT
+    'paid'                                         AS status,
+    CAST(md5(g::text)::uuid AS TEXT)               AS order_id,
+    DATE(now() - g * interval '1 minute')          AS order_creation_date,
+    substr(md5((g * 7)::text), 1, 6)               AS tracking_id,
+    'Product ' || g                                AS product_name,
+    CAST((g % 400) / 4.0 AS numeric(10, 2))        AS weight,
+    'libero_logistics'                             AS external_courier_provider,
+    'sofas'                                        AS cat_level_1_and_2,
+    '2-seaters'                                    AS cat_level_2_and_3,
+    1 + g % 4                                      AS number_of_items,
+    CAST(g % 300 AS numeric(10, 2))                AS shipping_excl_vat,
+    lpad((1000 + g % 9000)::text, 4, '0') || 'AB'  AS buyer_post_code,
+    'NL'                                           AS buyer_country,
+    'BE'                                           AS seller_country,
+    g % 250 AS height, g % 180 AS width, g % 90 AS depth,
+    lpad((1000 + g % 8000)::text, 4, '0')          AS seller_post_code
+FROM generate_series(1, :rows) AS g
+"""
+
+MODES = ("fetchall", "stream")
+
+
+def _run_child(args):
+    setup_django()
+    from sqlalchemy import create_engine
+    from logistics.services.database_service import DatabaseService, ORDERS_SELECT
+
+    service = DatabaseService()
+    if args.url:
+        service.engine = create_engine(args.url)
+
+    if args.synthetic:
+        query, params = SYNTHETIC_QUERY, {"rows": args.synthetic}
+    else:
+        query = ORDERS_SELECT + """
+        WHERE sales_order.state NOT IN ('expired', 'canceled')
+        AND sales_order.created >= NOW() - INTERVAL '6 months'
+        """
+        params = None
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    df = service.execute_query_with_retries(
+        query,
+        params=params,
+        max_retries=1,
+        stream=args.child == "stream",
+        chunk_size=args.chunk_size,
+    )
+    wall = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(json.dumps({
+        "mode":            args.child,
+        "rows":            len(df),
+        "wall_s":          round(wall, 3),
+        "baseline_rss_mb": round(baseline_kb / 1024, 1),
+        "peak_rss_mb":     round(peak_kb / 1024, 1),
+        "frame_mb":        round(df.memory_usage(deep=True).sum() / 2**20, 1),
+    }))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="benchmark N generate_series rows instead of the orders window")
+    parser.add_argument("--url", default="",
+                        help="SQLAlchemy URL to use instead of DATABASES['external']")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return _run_child(args)
+
+    results = []
+    for mode in args.modes:
+        cmd = [
+            sys.executable, "-m", "benchmarks.orders_query", "--child", mode,
+            "--synthetic", str(args.synthetic), "--chunk-size", str(args.chunk_size),
+        ]
+        if args.url:
+            cmd += ["--url", args.url]
+        out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        results.append(result)
+        print(
+            f"{result['mode']:>9}: {result['rows']:>9} rows  {result['wall_s']:>8.3f}s  "
+            f"peak RSS {result['peak_rss_mb']:>8.1f} MB (baseline {result['baseline_rss_mb']} MB)"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
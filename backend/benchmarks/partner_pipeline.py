@@ -0,0 +1,220 @@
+# backend/benchmarks/partner_pipeline.py
+"""
+How each partner's parser and delta calculator scale with invoice size.
+
+For every partner and size a synthetic invoice and matching orders window
+are generated (benchmarks.synthetic), then the pipeline stages are run the
+way DeltaChecker runs them and timed one by one:
+
+    parse    - parser.parse() on the uploaded bytes (no parse cache)
+    price    - calculator.compute() against the orders window
+    persist  - InvoiceRun + InvoiceLineWriter + AnalyticsRollups in one
+               transaction, rolled back afterwards
+
+Peak memory per stage is measured in a second, traced pass (tracemalloc,
+so Python and NumPy allocations of this process; PDF pages extracted in
+the process pool are not included). Results are written as JSON with the
+commit they were measured on; pass an earlier file to --compare to see
+the change per stage.
+
+    python -m benchmarks.partner_pipeline                                # 100 .. 100k lines
+    python -m benchmarks.partner_pipeline --partners brenger libero --sizes 100 1000
+    python -m benchmarks.partner_pipeline --output after.json --compare before.json
+
+Large PDF invoices take minutes to parse; persist uses the default
+database (COPY on PostgreSQL, batched inserts elsewhere).
+"""
+import argparse
+import contextlib
+import io
+import json
+import subprocess
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+
+from benchmarks import setup_django
+
+SIZES = [100, 1_000, 10_000, 100_000]
+STAGES = ("parse", "price", "persist")
+
+
+def _quiet():
+    # parsers and calculators print whole frames
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def _persist(partner: str, df_merged) -> int:
+    from django.db import transaction
+    from logistics.models import InvoiceRun
+    from logistics.services.analytics_rollups import AnalyticsRollups
+    from logistics.services.line_writer import InvoiceLineWriter
+
+    df_merged = df_merged.copy()
+    for col in ("Delta", "Delta_sum"):
+        df_merged[col] = df_merged[col].astype(float)
+    df_merged["partner"] = partner
+    invoice_number = f"benchmark-{uuid.uuid4().hex[:12]}"
+
+    with transaction.atomic():
+        run = InvoiceRun.objects.create(
+            partner=partner, invoice_number=invoice_number,
+            delta_sum=float(df_merged["Delta"].sum()), parsed_ok=True, num_rows=len(df_merged),
+        )
+        written = InvoiceLineWriter().write(run, df_merged, partner, invoice_number)
+        AnalyticsRollups().rebuild(run)
+        transaction.set_rollback(True)
+    return written
+
+
+def _stages(invoice):
+    """(name, fn) per stage; each fn takes the previous stage's output."""
+    from logistics.services.partner_registry import partner_registry
+
+    spec = partner_registry.get(invoice.partner)
+
+    def parse(_):
+        parser = spec.parser_cls()
+        if spec.needs_pdf:
+            return parser.parse(invoice.invoice_bytes, context={"pdf_bytes": invoice.pdf_bytes})
+        return parser.parse(invoice.invoice_bytes)
+
+    def price(df_invoice):
+        return spec.calculator_cls(df_invoice, invoice.df_order).compute()[0]
+
+    def persist(df_merged):
+        _persist(invoice.partner, df_merged)
+        return df_merged
+
+    return [("parse", parse), ("price", price), ("persist", persist)]
+
+
+def _run_stages(invoice, trace: bool) -> dict:
+    results = {}
+    value = None
+    for name, fn in _stages(invoice):
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            with _quiet():
+                value = fn(value)
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+            break
+        finally:
+            elapsed = time.perf_counter() - start
+            if trace:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        results[name] = {"seconds": round(elapsed, 4), "rows": len(value)}
+        if trace:
+            results[name]["peak_mb"] = round(peak / 2**20, 1)
+    return results
+
+
+def _measure(partner: str, rows: int, args) -> dict:
+    from benchmarks.synthetic import generate
+
+    start = time.perf_counter()
+    invoice = generate(partner, rows, seed=args.seed)
+    row = {
+        "partner":      partner,
+        "rows":         rows,
+        "input_bytes":  invoice.size_bytes,
+        "orders":       len(invoice.df_order),
+        "generate_s":   round(time.perf_counter() - start, 2),
+    }
+    runs = [_run_stages(invoice, trace=False) for _ in range(args.repeat)]
+    stages = {}
+    for name in STAGES:
+        measured = [run[name] for run in runs if name in run]
+        if not measured:
+            continue
+        if any("error" in m for m in measured):
+            stages[name] = next(m for m in measured if "error" in m)
+            continue
+        stages[name] = min(measured, key=lambda m: m["seconds"])
+    if args.memory:
+        for name, measured in _run_stages(invoice, trace=True).items():
+            if "peak_mb" in measured and "error" not in stages.get(name, {}):
+                stages[name]["peak_mb"] = measured["peak_mb"]
+    row["stages"] = stages
+    return row
+
+
+def _print_row(row: dict, baseline: dict) -> None:
+    parts = []
+    for name in STAGES:
+        stage = row["stages"].get(name)
+        if stage is None:
+            continue
+        if "error" in stage:
+            parts.append(f"{name} ERROR ({stage['error'][:60]})")
+            continue
+        text = f"{name} {stage['seconds']:>8.3f}s"
+        if "peak_mb" in stage:
+            text += f" {stage['peak_mb']:>7.1f}MB"
+        before = baseline.get((row["partner"], row["rows"]), {}).get(name, {})
+        if before.get("seconds"):
+            text += f" (x{stage['seconds'] / before['seconds']:.2f})"
+        parts.append(text)
+    print(f"{row['partner']:>12} {row['rows']:>7}:  " + "  ".join(parts))
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--partners", nargs="+", default=None, help="defaults to every registered partner")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="invoice lines")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per size (the fastest is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the traced memory pass")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="earlier --output file to compare timings with")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from logistics.services.partner_registry import partner_registry
+
+    partners = args.partners or partner_registry.names()
+    unknown = [p for p in partners if p not in partner_registry]
+    if unknown:
+        parser.error(f"unknown partners: {', '.join(unknown)}")
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            for row in json.load(f)["results"]:
+                baseline[(row["partner"], row["rows"])] = row["stages"]
+
+    results = []
+    for partner in partners:
+        # imports, price lists and the PDF pool warm up outside the measurements
+        from benchmarks.synthetic import generate
+        _run_stages(generate(partner, 20, seed=args.seed), trace=False)
+        for rows in args.sizes:
+            row = _measure(partner, rows, args)
+            results.append(row)
+            _print_row(row, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "commit":  _commit(),
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+# backend/benchmarks/synthetic.py
+"""
+Synthetic invoices and order windows for every partner, shaped after what
+the parsers and delta calculators read: the same PDF line layouts, XLSX
+sheets and header rows, and an orders frame with the columns of
+DatabaseService.get_orders_dataframe (after _prepare_orders).
+
+    invoice = generate("brenger", rows=1000, seed=0)
+    parser.parse(invoice.invoice_bytes)        # + context for libero
+    calculator(df_invoice, invoice.df_order)
+
+Categories and weight classes are drawn from the priced rows of the
+partner's price list, so pricing hits real prices. Generation is deterministic for a given seed.
+"""
+import io
+import json
+import os
+import random
+import string
+import uuid
+from datetime import date, timedelta
+
+import pandas as pd
+from django.conf import settings
+
+PAGE_LINES = 70
+FONT = "china-s"  # built-in font with the € glyph; base-14 Helvetica drops it
+
+NAMES = ["Jan Jansen", "Eva de Vries", "Sophie Peeters", "Lucas Dubois", "Emma Bakker", "Noah Maes"]
+CITIES = ["Amsterdam", "Utrecht", "Rotterdam", "Den Haag", "Antwerpen", "Gent", "Eindhoven", "Brussel"]
+POSTCODES = {
+    "NL": lambda rng: f"{rng.randint(1000, 9999)}{rng.choice(string.ascii_uppercase)}{rng.choice(string.ascii_uppercase)}",
+    "BE": lambda rng: f"{rng.randint(1000, 9999)}",
+    "DE": lambda rng: f"{rng.randint(10000, 99999)}",
+    "FR": lambda rng: f"{rng.randint(10000, 95999)}",
+    "IT": lambda rng: f"{rng.randint(10000, 98999)}",
+}
+BENELUX = ["NL-NL", "NL-BE", "BE-NL", "BE-BE"]
+
+# partner -> price list the categories / weights come from, routes, and the
+# external_courier_provider of its orders. Magic Movers stays inside the
+# Benelux so no geocoding requests are made.
+PROFILES = {
+    "brenger":      ("prijslijst_brenger.json",        BENELUX, "brenger"),
+    "wuunder":      ("prijslijst_other_partners.json", BENELUX, "wuunder"),
+    "libero":       ("prijslijst_other_partners.json", BENELUX + ["DE-NL", "NL-DE"], "libero_logistics"),
+    "swdevries":    ("prijslijst_other_partners.json", BENELUX, "swdevries"),
+    "tadde":        ("prijslijst_tadde.json",          ["FR-FR", "FR-BE", "FR-DE", "FR-NL", "FR-IT"], "tadde"),
+    "magic_movers": ("prijslijst_other_partners.json", ["NL-NL", "BE-NL"], "magic_movers"),
+}
+
+
+class SyntheticInvoice:
+    """One generated invoice: the uploaded file(s) and the matching orders window."""
+
+    def __init__(self, partner: str, rows: int, invoice_bytes: bytes, df_order: pd.DataFrame, pdf_bytes: bytes = None):
+        self.partner = partner
+        self.rows = rows
+        self.invoice_bytes = invoice_bytes
+        self.pdf_bytes = pdf_bytes
+        self.df_order = df_order
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.invoice_bytes) + len(self.pdf_bytes or b"")
+
+    def __repr__(self):
+        return f"SyntheticInvoice({self.partner!r}, rows={self.rows}, {self.size_bytes} bytes)"
+
+
+def _price_keys(filename: str) -> list[tuple[str, float]]:
+    """
+    (CMS category, Weightclass) of the price-list rows priced in every
+    column; rows left blank ("on request") would price to NaN.
+    """
+    with open(os.path.join(settings.PRICING_DATA_PATH, filename), "r", encoding="utf-8") as f:
+        df = pd.read_json(f, orient="columns")
+    keys = ["CMS category", "Weightclass"]
+    prices = df.drop(columns=keys).apply(pd.to_numeric, errors="coerce")
+    prices = prices.loc[:, prices.notna().any()]  # skip text columns
+    df = df[prices.notna().all(axis=1)]
+    return list(df[keys].itertuples(index=False, name=None))
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _shipments(partner: str, rows: int, rng: random.Random) -> list[dict]:
+    """One order per invoice line, with the price the partner charges for it."""
+    price_file, routes, provider = PROFILES[partner]
+    keys = _price_keys(price_file)
+    tracking_ids = set()
+    shipments = []
+    for _ in range(rows):
+        category, weight = rng.choice(keys)
+        route = rng.choice(routes)
+        buyer, seller = route.split("-")
+        # unique 6-char Brenger tracking ids, as printed (upper case) on the invoice
+        tracking_id = "".join(rng.choices(string.ascii_lowercase + string.digits, k=6))
+        while tracking_id in tracking_ids:
+            tracking_id = "".join(rng.choices(string.ascii_lowercase + string.digits, k=6))
+        tracking_ids.add(tracking_id)
+        shipments.append({
+            "Order ID":                  _uuid(rng),
+            "tracking_id":               tracking_id,
+            "order_creation_date":       pd.Timestamp(date(2024, 11, 1) + timedelta(days=rng.randint(0, 150))),
+            "product_name":              f"{category} {rng.randint(1, 999)}",
+            "weight":                    format(float(weight), ".2f"),
+            "external_courier_provider": provider,
+            "cat_level_1_and_2":         category.split("-")[-1],
+            "cat_level_2_and_3":         category,
+            "number_of_items":           rng.choice([1, 1, 1, 2, 4, 6, 8]),
+            "shipping_excl_vat":         round(rng.uniform(20, 300), 2),
+            "buyer_post_code":           POSTCODES[buyer](rng),
+            "buyer_country":             buyer,
+            "seller_country":            seller,
+            "seller_post_code":          POSTCODES[seller](rng),
+            "height":                    rng.randint(20, 260),
+            "width":                     rng.randint(20, 200),
+            "depth":                     rng.randint(20, 120),
+            "subtotal_excl_vat":         round(rng.uniform(100, 2500), 2),
+            "buyer_country-seller_country": route,
+            # what the partner bills: mostly whole euros, some with cents
+            "invoice_price":             float(rng.randint(35, 450)) if rng.random() < 0.7 else round(rng.uniform(35, 450), 2),
+            "name":                      rng.choice(NAMES),
+            "pickup_city":               rng.choice(CITIES),
+            "dropoff_city":              rng.choice(CITIES),
+        })
+    return shipments
+
+
+ORDER_COLUMNS = [
+    "Order ID", "order_creation_date", "tracking_id", "product_name", "weight",
+    "external_courier_provider", "cat_level_1_and_2", "cat_level_2_and_3", "number_of_items",
+    "shipping_excl_vat", "buyer_post_code", "buyer_country", "seller_country", "height",
+    "width", "depth", "seller_post_code", "subtotal_excl_vat", "buyer_country-seller_country",
+]
+
+
+def orders_frame(shipments: list[dict], rng: random.Random, unrelated: float = 1.0) -> pd.DataFrame:
+    """
+    The orders window get_orders_dataframe would return: the invoiced orders
+    plus `unrelated` times as many orders of other couriers, shuffled.
+    """
+    others = []
+    for shipment in rng.sample(shipments, min(len(shipments), int(len(shipments) * unrelated))):
+        other = dict(shipment)
+        other["Order ID"] = _uuid(rng)
+        other["tracking_id"] = None
+        other["external_courier_provider"] = rng.choice(["pickup", "Postal Delivery", "Whoppah-Courier"])
+        others.append(other)
+    rows = shipments + others
+    rng.shuffle(rows)
+    return pd.DataFrame(rows, columns=ORDER_COLUMNS)
+
+
+# ─── file writers ─────────────────────────────────────────────────────────────
+
+def _pdf(pages: list[list[str]]) -> bytes:
+    import pymupdf
+
+    doc = pymupdf.open()
+    for lines in pages:
+        page = doc.new_page()
+        page.insert_text((36, 40), "\n".join(lines), fontsize=8, fontname=FONT)
+    return doc.tobytes(garbage=0, deflate=True)
+
+
+def _paginate(header: list[str], blocks: list[list[str]], footer: list[str]) -> list[list[str]]:
+    """Lay out entry blocks on pages (never splitting a block), header on every page."""
+    pages, page = [], list(header)
+    for block in blocks:
+        if len(page) + len(block) > PAGE_LINES:
+            pages.append(page)
+            page = list(header)
+        page.extend(block)
+    if len(page) + len(footer) > PAGE_LINES:
+        pages.append(page)
+        page = list(header)
+    page.extend(footer)
+    pages.append(page)
+    return pages
+
+
+def _xlsx(sheet: str, rows: list[list]) -> bytes:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet)
+    for row in rows:
+        worksheet.append(row)
+    out = io.BytesIO()
+    workbook.save(out)
+    return out.getvalue()
+
+
+def _nl_amount(value: float, thousands: bool = True) -> str:
+    """1234.5 -> "1.234,50" (or "1234,50") """
+    text = f"{value:,.2f}" if thousands else f"{value:.2f}"
+    return text.replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+# ─── partners ─────────────────────────────────────────────────────────────────
+
+def _brenger(shipments, rng):
+    header = ["Brenger B.V.", "Factuurdatum: 2025-03-01", "Factuurnummer: BR2025031"]
+    blocks = []
+    total = 0.0
+    for s in shipments:
+        incl = round(s["invoice_price"] * 1.21, 2)
+        total += incl
+        blocks.append([
+            f"{s['tracking_id'].upper()} {s['order_creation_date']:%Y-%m-%d}: "
+            f"{s['pickup_city']} - {s['dropoff_city']} ({s['name']}) "
+            f"€ {_nl_amount(incl, False)} € {_nl_amount(s['invoice_price'], False)}",
+        ])
+    footer = [f"BTW (21%): € {_nl_amount(total - total / 1.21)}", f"TOTAAL: € {_nl_amount(total)}"]
+    return _pdf(_paginate(header, blocks, footer)), None
+
+
+def _wuunder(shipments, rng):
+    header = ["Wuunder", "Factuurnummer: 202503001", "Factuurdatum: 1 maart 2025"]
+    blocks = []
+    total = 0.0
+    for i, s in enumerate(shipments):
+        fuel = round(s["invoice_price"] * 0.08, 2)
+        total += s["invoice_price"] + fuel
+        shipped = s["order_creation_date"] + timedelta(days=2)
+        blocks.append([
+            f"{shipped:%d-%m-%Y} WH{i:07d} {s['name']} package PostNL {_nl_amount(s['invoice_price'], False)}",
+            f"Referentie {s['Order ID']}",
+            f"Fuel surcharge {_nl_amount(fuel, False)}",
+            rng.choice(["Standard delivery", "Pakket op pallet", "Drop At Parcelshop"]),
+        ])
+    footer = [f"Totaal excl. BTW + toeslagen € {_nl_amount(total)}"]
+    return _pdf(_paginate(header, blocks, footer)), None
+
+
+def _tadde(shipments, rng):
+    header = ["Tadde SAS", "Invoice number F-2025-031", "Issue date 01-03-2025"]
+    blocks = []
+    total = 0.0
+    for i, s in enumerate(shipments):
+        total += s["invoice_price"]
+        blocks.append([
+            f"whoppah{100000 + i}",
+            f"Transport {s['cat_level_2_and_3']} {s['Order ID']}",
+            f"1 unit € {s['invoice_price']:.2f} 20 % € {s['invoice_price']:.2f}",
+        ])
+    footer = [f"Total excl. VAT € {total:,.2f}"]
+    return _pdf(_paginate(header, blocks, footer)), None
+
+
+def _libero(shipments, rng):
+    # whole euros, written as "85,-" like the real sheet
+    prices = [int(round(s["invoice_price"])) for s in shipments]
+    total = sum(prices)
+    rows = [["#", "LL Bumbal ref.", "Leverdatum", "Omschrijving", "Bedrag", "BTW 21%", "Totaal"]]
+    for i, (s, price) in enumerate(zip(shipments, prices), start=1):
+        delivered = s["order_creation_date"] + timedelta(days=rng.randint(2, 10))
+        rows.append([i, f"LL{400000 + i}", f"{delivered:%d-%m-%Y}", s["Order ID"], f"{price},-",
+                     f"{price * 0.21:.2f}", f"{price * 1.21:.2f}"])
+    amount = f"{total:,}".replace(",", ".") + ",-"
+    rows += [
+        ["Subtotaal", amount],
+        ["Korting", "0,-"],
+        ["Totaal excl. BTW", amount],
+        ["BTW 21%", _nl_amount(total * 0.21)],
+        ["Totaal incl. BTW", _nl_amount(total * 1.21)],
+    ]
+    pdf = _pdf([["Libero Logistics", "Factuurnummer: LL-2025-031 Factuurdatum: 01-03-2025"]])
+    return _xlsx("factuur 14-03", rows), pdf
+
+
+def _swdevries(shipments, rng):
+    total = round(sum(s["invoice_price"] for s in shipments), 2)
+    rows = [
+        ["Factuur SW de Vries"],
+        ["01-03-2025", "SW-2025-031"],
+        ["Order ID", "Pick-up date", "Drop-off date", "Price"],
+    ]
+    for s in shipments:
+        pickup = s["order_creation_date"] + timedelta(days=rng.randint(1, 5))
+        rows.append([s["Order ID"], f"{pickup:%d-%m-%Y}", f"{pickup + timedelta(days=1):%d-%m-%Y}", s["invoice_price"]])
+    rows.append(["Totaal", None, None, total])
+    return _xlsx("Blad1", rows), None
+
+
+def _magic_movers(shipments, rng):
+    total = round(sum(s["invoice_price"] for s in shipments), 2)
+    rows = [["Faktura", "MM/2025/03"], [None, None, None, "Order ID"]]
+    for i, s in enumerate(shipments, start=1):
+        kind = "W/" if rng.random() < 0.3 else "M/"
+        rows.append([i, f"{kind}{s['order_creation_date']:%Y%m%d}/{i}", s["invoice_price"], s["Order ID"]])
+    rows += [[None, "Suma", total, None], [None, "Do zapłaty", total, None]]
+    return _xlsx("Arkusz1", rows), None
+
+
+WRITERS = {
+    "brenger":      _brenger,
+    "wuunder":      _wuunder,
+    "libero":       _libero,
+    "swdevries":    _swdevries,
+    "tadde":        _tadde,
+    "magic_movers": _magic_movers,
+}
+PARTNERS = list(WRITERS)
+
+
+def generate(partner: str, rows: int, seed: int = 0, unrelated: float = 1.0) -> SyntheticInvoice:
+    """A `rows`-line invoice for `partner` and the orders window it is priced against."""
+    if partner not in WRITERS:
+        raise ValueError(f"Unsupported partner: {partner}")
+    rng = random.Random(f"{partner}:{rows}:{seed}")
+    shipments = _shipments(partner, rows, rng)
+    invoice_bytes, pdf_bytes = WRITERS[partner](shipments, rng)
+    return SyntheticInvoice(partner, rows, invoice_bytes, orders_frame(shipments, rng, unrelated), pdf_bytes)
+
+
+def main(argv=None):
+    """Write generated invoices to disk, e.g. to upload them by hand."""
+    import argparse
+    from benchmarks import setup_django
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("partner", choices=PARTNERS)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=".", help="directory to write the invoice (and orders CSV) to")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    invoice = generate(args.partner, args.rows, args.seed)
+    ext = "xlsx" if args.partner in ("libero", "swdevries", "magic_movers") else "pdf"
+    base = os.path.join(args.out, f"{args.partner}_{args.rows}")
+    with open(f"{base}.{ext}", "wb") as f:
+        f.write(invoice.invoice_bytes)
+    if invoice.pdf_bytes:
+        with open(f"{base}.pdf", "wb") as f:
+            f.write(invoice.pdf_bytes)
+    invoice.df_order.to_csv(f"{base}_orders.csv", index=False)
+    print(json.dumps({"partner": args.partner, "rows": args.rows, "bytes": invoice.size_bytes, "path": base}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# backend/benchmarks/task_pipeline.py
+"""
+Broker / result-backend traffic and latency per upload of the old
+chain(load_invoice_bytes, evaluate_delta) against the single
+evaluate_invoice task.
+
+Both flows are replayed message by message with Celery's JSON serializer
+(bytes become base64) against Redis, the broker and result backend in
+production: every message is LPUSHed and BRPOPed, every result SET and GET.
+Parsing and pricing are identical in both flows and left out.
+
+    python -m benchmarks.task_pipeline                        # REDIS_URL
+    python -m benchmarks.task_pipeline --sizes 1 5 20 --repeat 10
+    python -m benchmarks.task_pipeline --no-redis             # serialization only
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+import uuid
+
+from benchmarks import setup_django
+
+QUEUE = "benchmark:task_pipeline"
+SUMMARY = {
+    "delta_ok": True, "parsed_ok": True, "delta_sum": 12.5, "run_id": 1,
+    "partner": "brenger", "invoice_number": "INV-1", "num_rows": 1200,
+}
+
+
+class Transport:
+    """Counts the bytes written to the broker / result backend."""
+
+    def __init__(self, client=None):
+        self.client = client
+        self.sent = 0
+
+    def message(self, body: bytes) -> bytes:
+        self.sent += len(body)
+        if self.client is not None:
+            self.client.lpush(QUEUE, body)
+            body = self.client.brpop(QUEUE, timeout=5)[1]
+        return body
+
+    def result(self, body: bytes) -> bytes:
+        self.sent += len(body)
+        if self.client is not None:
+            key = f"benchmark:celery-task-meta-{uuid.uuid4()}"
+            self.client.set(key, body, ex=60)
+            body = self.client.get(key)
+            self.client.delete(key)
+        return body
+
+
+def _encode(obj) -> bytes:
+    from kombu.serialization import dumps
+    return dumps(obj, serializer="json")[2].encode()
+
+
+def _decode(body: bytes):
+    from kombu.serialization import loads
+    return loads(body, "application/json", "utf-8")
+
+
+def _task_message(args) -> bytes:
+    # Celery protocol 2 body: (args, kwargs, embed)
+    return _encode([args, {}, {"callbacks": None, "errbacks": None, "chain": None, "chord": None}])
+
+
+def _result_meta(result) -> bytes:
+    return _encode({"status": "SUCCESS", "result": result, "traceback": None, "children": []})
+
+
+def legacy_chain(transport, invoice: bytes, pdf: bytes) -> None:
+    keys = ["invoice-key", "pdf-key"]
+    # 1) load_invoice_bytes(keys) -> the raw bytes as its result
+    _decode(transport.message(_task_message(keys)))
+    ctx = {"invoice_bytes": invoice, "pdf_bytes": pdf}
+    _decode(transport.result(_result_meta(ctx)))
+    # 2) the chain hands the result to evaluate_delta as its first argument
+    args = _decode(transport.message(_task_message([ctx, "brenger", 20.0])))[0]
+    assert args[0]["invoice_bytes"] == invoice
+    _decode(transport.result(_result_meta(SUMMARY)))
+
+
+def single_task(transport, invoice: bytes, pdf: bytes) -> None:
+    # evaluate_invoice(partner, keys...) opens the uploads itself
+    _decode(transport.message(_task_message(["brenger", "invoice-key", "pdf-key", 20.0])))
+    _decode(transport.result(_result_meta(SUMMARY)))
+
+
+FLOWS = {"chain": legacy_chain, "single": single_task}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 5, 20],
+                        help="invoice sizes in MB (a PDF of the same size is added)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--redis-url", default="", help="defaults to settings.REDIS_URL")
+    parser.add_argument("--no-redis", action="store_true",
+                        help="count bytes and time the serializer without Redis round trips")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    client = None
+    if not args.no_redis:
+        import redis
+        from django.conf import settings
+        client = redis.from_url(args.redis_url or settings.REDIS_URL)
+        client.ping()
+
+    results = []
+    for size_mb in args.sizes:
+        # incompressible bytes, like a compressed PDF stream
+        invoice = os.urandom(int(size_mb * 2**20))
+        pdf = os.urandom(int(size_mb * 2**20))
+        row = {"size_mb": size_mb}
+        for name, flow in FLOWS.items():
+            timings = []
+            for _ in range(args.repeat):
+                transport = Transport(client)
+                start = time.perf_counter()
+                flow(transport, invoice, pdf)
+                timings.append(time.perf_counter() - start)
+            row[name] = {
+                "broker_kb":  round(transport.sent / 1024, 1),
+                "median_ms":  round(statistics.median(timings) * 1000, 2),
+            }
+        results.append(row)
+        chain, single = row["chain"], row["single"]
+        print(
+            f"{size_mb:>6.1f} MB x2:  chain {chain['broker_kb']:>10.1f} KB {chain['median_ms']:>9.1f} ms   "
+            f"single {single['broker_kb']:>5.1f} KB {single['median_ms']:>7.1f} ms   "
+            f"saved {(chain['broker_kb'] - single['broker_kb']) / 1024:.2f} MB, "
+            f"{chain['median_ms'] - single['median_ms']:.1f} ms per upload"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 #backend/config/settings.py
 import os
+import tempfile
 import dj_database_url
 from pathlib import Path
 from decouple import config
+from corsheaders.defaults import default_headers
 
 # === FIXED DIR ===
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -50,6 +52,9 @@ CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOWED_ORIGINS = [
     "https://logistic-app-20-or-frontend-production.up.railway.app",
 ]
+# conditional GETs (ETag / If-None-Match) from the frontend
+CORS_ALLOW_HEADERS = (*default_headers, "if-none-match")
+CORS_EXPOSE_HEADERS = ["ETag"]
 
 # Root URL config
 ROOT_URLCONF = "config.urls"
@@ -91,6 +96,29 @@ DATABASES = {
 # Redis 
 REDIS_URL = config("REDIS_URL", default="redis://localhost:6379/0")
 
+# Orders snapshot of the external DB (see logistics/services/order_snapshot.py)
+ORDERS_SNAPSHOT_REFRESH_SECONDS = config("ORDERS_SNAPSHOT_REFRESH_SECONDS", default=300, cast=int)
+ORDERS_SNAPSHOT_REBUILD_SECONDS = config("ORDERS_SNAPSHOT_REBUILD_SECONDS", default=6 * 3600, cast=int)
+
+# Uploaded invoice files (see logistics/services/upload_store.py)
+UPLOAD_STORE = config("UPLOAD_STORE", default="redis")  # "redis" or "spool"
+UPLOAD_SPOOL_DIR = config("UPLOAD_SPOOL_DIR", default=str(Path(tempfile.gettempdir()) / "logistics-uploads"))
+UPLOAD_TTL = config("UPLOAD_TTL", default=600, cast=int)
+
+# Invoice parsing
+PDF_EXTRACT_WORKERS = config("PDF_EXTRACT_WORKERS", default=min(4, os.cpu_count() or 1), cast=int)
+
+# Parsed invoice cache (see logistics/services/invoice_cache.py)
+PARSED_INVOICE_CACHE_MAX_ENTRIES = config("PARSED_INVOICE_CACHE_MAX_ENTRIES", default=200, cast=int)
+PARSED_INVOICE_CACHE_TTL = config("PARSED_INVOICE_CACHE_TTL", default=7 * 24 * 3600, cast=int)
+
+# Geocoding / distances (see logistics/services/geo_service.py)
+GEO_PROVIDER = config("GEO_PROVIDER", default="google")  # "google" or "offline"
+GEO_FALLBACK_OFFLINE = config("GEO_FALLBACK_OFFLINE", default=True, cast=bool)
+GEO_LRU_SIZE = config("GEO_LRU_SIZE", default=10000, cast=int)
+GEO_BREAKER_SECONDS = config("GEO_BREAKER_SECONDS", default=60, cast=int)  # skip the provider after a quota error
+GEO_CENTROIDS_FILE = BASE_DIR / "logistics" / "geo_data" / "postcode_centroids.json"
+
 # Celery 
 CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = REDIS_URL
@@ -98,6 +126,24 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_TASK_TIME_LIMIT = 600        # hard limit
 CELERY_TASK_SOFT_TIME_LIMIT = 550   # soft limit
+# Queues per workload (workers per queue in entrypoint.sh):
+#   parse - CPU-bound invoice evaluation (pdfplumber, pandas), prefork
+#   db    - I/O-bound external DB work, thread pool
+#   light - coordination and notifications, thread pool
+CELERY_TASK_DEFAULT_QUEUE = "light"
+CELERY_TASK_ROUTES = {
+    "logistics.tasks.evaluate_invoice":         {"queue": "parse"},
+    "logistics.tasks.warm_order_snapshot":      {"queue": "db"},
+    "logistics.tasks.summarize_batch":          {"queue": "light"},
+    "logistics.tasks.process_invoice_pipeline": {"queue": "light"},
+}
+# Batch evaluation (see CheckDeltaBatchView)
+BATCH_MAX_INVOICES = config("BATCH_MAX_INVOICES", default=100, cast=int)
+# Task progress stream (see logistics/services/task_events.py)
+TASK_EVENTS_STREAM_TIMEOUT = config("TASK_EVENTS_STREAM_TIMEOUT", default=CELERY_TASK_TIME_LIMIT, cast=int)
+TASK_EVENTS_HEARTBEAT = config("TASK_EVENTS_HEARTBEAT", default=10, cast=float)
+# Stage timing metrics window (see logistics/services/stage_metrics.py)
+STAGE_METRICS_WINDOW_HOURS = config("STAGE_METRICS_WINDOW_HOURS", default=24 * 7, cast=int)
 # Cache
 CACHES = {
     "default": {
@@ -157,3 +203,7 @@ SECURE_REFERRER_POLICY = "strict-origin-when-cross-origin"
 # === SLACK ===
 SLACK_BOT_TOKEN = config("SLACK_BOT_TOKEN", default="")
 SLACK_CHANNEL_ID = config("SLACK_CHANNEL_ID", default="C08HZ13JDC5")
+# Local Slack message store (see logistics/services/slack_store.py)
+SLACK_SYNC_SECONDS = config("SLACK_SYNC_SECONDS", default=30, cast=int)
+SLACK_RESYNC_SECONDS = config("SLACK_RESYNC_SECONDS", default=15 * 60, cast=int)
+SLACK_STORE_MAX_MESSAGES = config("SLACK_STORE_MAX_MESSAGES", default=200, cast=int)
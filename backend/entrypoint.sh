@@ -15,17 +15,48 @@ case "$1" in
     exec gunicorn config.wsgi:application \
       --bind 0.0.0.0:"${PORT:-8000}" \
       --workers 2 \
+      --worker-class gthread \
+      --threads "${GUNICORN_THREADS:-8}" \
       --timeout 300 \
       --log-level info
     ;;
   worker)
-    exec celery -A config.celery_app worker --loglevel=info
+    # every queue in one worker (small deployments); "celery" drains tasks
+    # queued before the queues were split
+    exec celery -A config.celery_app worker --loglevel=info \
+      -Q parse,db,light,celery
+    ;;
+  worker-parse)
+    # CPU-bound: one process per core, no prefetch so long parses don't
+    # hold tasks another idle process could take
+    exec celery -A config.celery_app worker --loglevel=info \
+      -Q parse -n parse@%h \
+      --pool prefork \
+      --concurrency "${CELERY_PARSE_CONCURRENCY:-$(nproc)}" \
+      --prefetch-multiplier 1 \
+      --max-tasks-per-child "${CELERY_PARSE_MAX_TASKS_PER_CHILD:-50}"
+    ;;
+  worker-db)
+    # I/O-bound: threads waiting on the external DB
+    exec celery -A config.celery_app worker --loglevel=info \
+      -Q db -n db@%h \
+      --pool threads \
+      --concurrency "${CELERY_DB_CONCURRENCY:-8}" \
+      --prefetch-multiplier 2
+    ;;
+  worker-light)
+    # coordination and notifications: short tasks, many in flight
+    exec celery -A config.celery_app worker --loglevel=info \
+      -Q light,celery -n light@%h \
+      --pool threads \
+      --concurrency "${CELERY_LIGHT_CONCURRENCY:-4}" \
+      --prefetch-multiplier 8
     ;;
   beat)
     exec celery -A config.celery_app beat --loglevel=info
     ;;
   *)
-    echo "Usage: $0 {web|worker|beat}"
+    echo "Usage: $0 {web|worker|worker-parse|worker-db|worker-light|beat}"
     exit 1
     ;;
 esac
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LogisticsConfig(AppConfig):
     name = "logistics"
     verbose_name = "Logistics"
+
+    def ready(self):
+        from logistics import signals  # noqa: F401
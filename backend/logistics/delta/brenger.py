@@ -2,6 +2,7 @@
 import os
 import pandas as pd
 from django.conf import settings
+from logistics.services.pricing_registry import pricing_registry
 
 
 class BrengerDeltaCalculator:
@@ -17,16 +18,7 @@ class BrengerDeltaCalculator:
             settings.PRICING_DATA_PATH,
             "prijslijst_brenger.json"
         )
-        self.df_price = self._load_price_list()
-
-    def _load_price_list(self) -> pd.DataFrame:
-        try:
-            with open(self.price_file, "r", encoding="utf-8") as f:
-                return pd.read_json(f, orient="columns")
-        except Exception as e:
-            raise FileNotFoundError(
-                f"Could not load pricing file: {self.price_file}"
-            ) from e
+        self.price_table = pricing_registry.get_table(self.price_file)
 
     def compute(self) -> tuple[pd.DataFrame, float, bool]:
         # merge invoice against order/tracking
@@ -38,28 +30,16 @@ class BrengerDeltaCalculator:
         )
         df_merged["weight"] = df_merged["weight"].astype(float).round(2)
 
-        prices = []
-        
         ALLOWED_ROUTES = ["NL-NL","BE-NL","NL-BE","BE-BE"]
-        for _, row in df_merged.iterrows():
-            category = row["cat_level_2_and_3"]
-            if not category:
-                category = row["cat_level_1_and_2"]
-            weight   = row["weight"]
-            route    = row["buyer_country-seller_country"]
-            if route not in ALLOWED_ROUTES:
-                route = "NL-NL" #hard-coded
-            matched_price = 0
-           
-            for _, price_row in self.df_price.iterrows():
-                if (
-                    price_row["CMS category"] == category
-                    and price_row["Weightclass"] == weight
-                ):
-                    matched_price = price_row.get(route, 0)
-                    break
-
-            prices.append(matched_price)
+        category = df_merged["cat_level_2_and_3"].where(
+            df_merged["cat_level_2_and_3"].astype(bool),
+            df_merged["cat_level_1_and_2"],
+        )
+        route = df_merged["buyer_country-seller_country"].where(
+            df_merged["buyer_country-seller_country"].isin(ALLOWED_ROUTES),
+            "NL-NL",  #hard-coded
+        )
+        prices = self.price_table.lookup(category, df_merged["weight"], route)
 
         df_merged["price"] = prices
         df_merged["Delta"] = df_merged["price_brenger"] - df_merged["price"]
@@ -1,147 +1,103 @@
 # backend/logistics/delta/magic_movers.py
-import os
+import numpy as np
 import pandas as pd
-import requests
+from logistics.services.geo_service import geo_service
 from .base import BaseDeltaCalculator
 
+# €20 per extra chair after 2 for these categories
+CHAIRS_AFTER_2 = [
+    "armchairs", "folding-chairs", "rocking-chairs", "side-chairs",
+    "swivel-chairs", "conference-chairs", "office-chairs", "adjustable-recliner-chair",
+]
+
+
+def _numeric(df: pd.DataFrame, column: str, default) -> pd.Series:
+    if column not in df.columns:
+        return pd.Series(default, index=df.index, dtype=float)
+    return pd.to_numeric(df[column], errors="coerce").fillna(default)
+
+
 class MagicMoversDeltaCalculator(BaseDeltaCalculator):
 
-    @staticmethod
-    def get_coordinates(postal_code, country):
-        """API connection to Google Geocode get coordinates out of postal code."""
-        API_KEY = os.getenv("GOOGLE_GEOCODE_API_KEY")
-        url = "https://maps.googleapis.com/maps/api/geocode/json"
-        params = {
-            "address": postal_code,
-            "components": f"country:{country}",
-            "key": API_KEY
-        }
-        response = requests.get(url, params=params)
-        data = response.json()
-        if data["status"] == "OK":
-            loc = data["results"][0]["geometry"]["location"]
-            return loc["lat"], loc["lng"]
-        else:
-            print("Error geocoding:", data["status"])
-            return None
-
-    @staticmethod
-    def get_distance_coords(orig_coords, dest_coords):
-        """API connection to Google Maps Distance Matrix to get distance in km."""
-        API_KEY = os.getenv("GOOGLE_DISTANCE_API_KEY")
-        url = "https://maps.googleapis.com/maps/api/distancematrix/json"
-        params = {
-            'origins':      f"{orig_coords[0]},{orig_coords[1]}",
-            'destinations': f"{dest_coords[0]},{dest_coords[1]}",
-            'key':          API_KEY,
-        }
-        resp = requests.get(url, params=params).json()
-        elem = resp.get("rows", [{}])[0].get("elements", [{}])[0]
-        if elem.get("status") == "OK":
-            return elem["distance"]["value"] / 1000.0
-        else:
-            print("No valid route:", elem.get("status"))
-            return 0.0
-
-    def calculate_transport_cost(self, row):
+    geo = geo_service
+
+    def _route_distances(self, df: pd.DataFrame, needed: pd.Series) -> np.ndarray:
+        """
+        Seller→buyer distance in km for the rows in `needed` (0 elsewhere or
+        when no route is known), resolved once per unique postcode pair.
+        """
+        distances = np.zeros(len(df))
+        if not needed.any():
+            return distances
+
+        cols = ["seller_country", "seller_post_code", "buyer_country", "buyer_post_code"]
+        routes = list(df.loc[needed, cols].astype(str).itertuples(index=False, name=None))
+        km = self.geo.route_distances(routes)
+        distances[needed.to_numpy()] = [km[route] or 0.0 for route in routes]
+        return distances
+
+    def calculate_transport_cost(self, df: pd.DataFrame) -> np.ndarray:
         """Calculate transport cost based on seller/buyer country & distance."""
-        sc, bc = row["seller_country"], row["buyer_country"]
-        sp, bp = row["seller_post_code"], row["buyer_post_code"]
-
-        sc_coords = self.get_coordinates(sc, sp)
-        bc_coords = self.get_coordinates(bc, bp)
-        dist = 0.0
-        if sc_coords and bc_coords:
-            dist = self.get_distance_coords(sc_coords, bc_coords)
-
-        if sc == "NL" and bc == "NL":
-            return 70
-        if sc == "NL" and bc == "BE":
-            return 100
-        if sc == "NL" and bc == "DE":
-            if dist <= 300:
-                return 120
-            if dist <= 500:
-                return 150
-            return 200
-        if sc == "NL" and bc == "FR":
-            if dist <= 300:
-                return 120
-            if dist <= 500:
-                return 150
-            if dist <= 900:
-                return 180
-            return 240
-
-        return 0  # or None if you prefer
-
-    def calculate_surcharge(self, row):
+        sc, bc = df["seller_country"], df["buyer_country"]
+        from_nl = sc == "NL"
+        dist = self._route_distances(df, from_nl & bc.isin(["DE", "FR"]))
+
+        de_cost = np.select([dist <= 300, dist <= 500], [120, 150], 200)
+        fr_cost = np.select([dist <= 300, dist <= 500, dist <= 900], [120, 150, 180], 240)
+        return np.select(
+            [from_nl & (bc == "NL"), from_nl & (bc == "BE"), from_nl & (bc == "DE"), from_nl & (bc == "FR")],
+            [70, 100, de_cost, fr_cost],
+            0,
+        )
+
+    def calculate_surcharge(self, df: pd.DataFrame) -> np.ndarray:
         """Calculate any special, item‐level surcharges."""
-        surcharge = 0
-        cat = (row.get("cat_level_2_and_3") or "").lower()
-        n   = row.get("number_of_items", 1)
-        dims = [row.get(c, 0) for c in ("height", "width", "depth")]
-        max_dim = max(dims)
-
-        # Surcharge for specific item types over stools, 2-seaters, armchairs, consoles, dining-chairs, double-beds, vases, dining-tables, sideboard, dressing-tables, liquor-cabinets, decorative-objects, shelving-unit, sideboard-cabinet, wall-cabinet, coffee-tables, modular-sofas, bookcases, table-lamps, swivel-chairs, mirrors, side-chairs, filing-cabinets, chest-of-drawers, floor-lights, side-tables, nightstands, desk, frames
-        chairs_after2=[ "armchairs", "folding-chairs","rocking-chairs","side-chairs", "swivel-chairs","conference-chairs","office-chairs", "adjustable-recliner-chair"]
-
-        # example: dining chairs beyond 6
-        if "dining-chairs" in cat:
-            extra = max(n - 6, 0)
-            surcharge += extra * 20
-
-        for chair in chairs_after2:
-            if chair in category:
-                extra_chairs = max(n - 2, 0)
-                surcharge += extra_chairs * 20  #  €20 per extra chair after 2
-
-        if "garden-chairs":
-            extra_garden_chairs = max(n -6,0)
-            if extra_garden_chairs !=0:
-                if extra_garden_chairs < 3:
-                    surcharge += extra_garden_chairs *20 
-                elif extra_garden_chairs <4:
-                    surcharge += (extra_garden_chairs -1)*20 +40
-                else:
-                    surcharge += 20+20+40+(extra_garden_chairs-3)*20 # €20 per extra chair after 2, €40 per extra chair nb 3, then €20 per extra chairs
+        cat = df["cat_level_2_and_3"].fillna("").astype(str).str.lower()
+        n = _numeric(df, "number_of_items", 1)
+        max_dim = pd.concat([_numeric(df, c, 0) for c in ("height", "width", "depth")], axis=1).max(axis=1)
+
+        # dining chairs beyond 6
+        surcharge = cat.str.contains("dining-chairs", regex=False) * (n - 6).clip(lower=0) * 20
+
+        # €20 per extra chair after 2
+        chair_matches = sum(cat.str.contains(chair, regex=False).astype(int) for chair in CHAIRS_AFTER_2)
+        surcharge += chair_matches * (n - 2).clip(lower=0) * 20
+
+        # garden chairs after 6: €20 each, except €40 for the 3rd extra one
+        extra_garden = (n - 6).clip(lower=0)
+        garden = np.select(
+            [extra_garden < 3, extra_garden < 4],
+            [extra_garden * 20, (extra_garden - 1) * 20 + 40],
+            20 + 20 + 40 + (extra_garden - 3) * 20,
+        )
+        surcharge += np.where(cat.str.contains("garden-chairs", regex=False), garden, 0)
 
         # dimension‐based
-        if 200 < max_dim <= 240:
-            surcharge += 70
-        elif 240 < max_dim <= 300:
-            surcharge += 150
-        elif max_dim > 300:
-            print(f"Item {row.get('order_id')} >300 cm, surcharge on request")
+        surcharge += np.select(
+            [(max_dim > 200) & (max_dim <= 240), (max_dim > 240) & (max_dim <= 300)],
+            [70, 150],
+            0,
+        )
+        for order_id in df.loc[max_dim > 300, "Order ID"]:
+            print(f"Item {order_id} >300 cm, surcharge on request")
 
-        return surcharge
+        return surcharge.to_numpy()
 
-    def calculate_packing_cost(self, row):
+    def calculate_packing_cost(self, df: pd.DataFrame) -> np.ndarray:
         """Calculate packing/wooden crate cost."""
-        subtotal = row.get("subtotal_excl_vat", 0)
-        items    = row.get("number_of_items", 1)
-        dims     = [row.get(c, 0) for c in ("height", "width", "depth")]
-        max_dim  = max(dims)
-
-        if subtotal <= 750:
-            return 0
-        cost = 50
+        subtotal = _numeric(df, "subtotal_excl_vat", 0)
+        items = _numeric(df, "number_of_items", 1)
+        max_dim = pd.concat([_numeric(df, c, 0) for c in ("height", "width", "depth")], axis=1).max(axis=1)
+        is_wooden = df["is_wooden"].fillna(False).astype(bool) if "is_wooden" in df.columns else False
+
         # crate size tiers
-        if max_dim < 100:
-            cost += 170
-        elif max_dim <= 130:
-            cost += 190
-        elif max_dim <= 160:
-            cost += 220
-        elif max_dim <= 200:
-            cost += 240
-        elif max_dim <= 220:
-            cost += 280
-
-        if row.get("is_wooden"):
-            cost += items * 20
-
-        return cost
+        crate = np.select(
+            [max_dim < 100, max_dim <= 130, max_dim <= 160, max_dim <= 200, max_dim <= 220],
+            [170, 190, 220, 240, 280],
+            0,
+        )
+        cost = 50 + crate + np.where(is_wooden, items * 20, 0)
+        return np.where(subtotal <= 750, 0, cost)
 
     def compute(self):
         partner_key = "magic_movers"
@@ -154,10 +110,9 @@ class MagicMoversDeltaCalculator(BaseDeltaCalculator):
               )
         )
 
-        # now all of these will be called correctly
-        df["transport_cost"] = df.apply(self.calculate_transport_cost, axis=1)
-        df["surcharge"]       = df.apply(self.calculate_surcharge, axis=1)
-        df["packing_cost"]    = df.apply(self.calculate_packing_cost, axis=1)
+        df["transport_cost"] = self.calculate_transport_cost(df)
+        df["surcharge"]       = self.calculate_surcharge(df)
+        df["packing_cost"]    = self.calculate_packing_cost(df)
 
         df["price"]           = df["transport_cost"] + df["surcharge"] + df["packing_cost"]
         df["Delta"]           = df[f"price_{partner_key}"] - df["price"]
@@ -0,0 +1,99 @@
+#backend/logistics/delta/postal_zones.py
+import json
+import numpy as np
+import pandas as pd
+
+ANY_COUNTRY = "*"
+
+
+class PostalZone:
+    """
+    A postal zone as sorted, non-overlapping intervals of postcode numbers
+    per country ("*" for any country), so a whole postcode column is
+    classified with one binary search instead of set lookups per row.
+
+    With match="prefix" the first `digits` characters of a postcode are
+    compared (NL "1012AB" -> 10); with match="whole" only postcodes of
+    exactly `digits` digits are. Anything else is outside the zone.
+    """
+
+    MATCHES = ("prefix", "whole")
+
+    def __init__(self, name: str, ranges: dict, digits: int, match: str = "prefix"):
+        if match not in self.MATCHES:
+            raise ValueError(f"Unknown match {match!r} for postal zone {name}")
+        self.name = name
+        self.digits = digits
+        self.match = match
+        self._intervals = {country: self._merge(spec) for country, spec in ranges.items()}
+
+    @staticmethod
+    def _merge(spec: list) -> tuple[np.ndarray, np.ndarray]:
+        """[[start, end], single, ...] -> (starts, ends), inclusive and merged."""
+        bounds = sorted((item, item) if isinstance(item, int) else tuple(item) for item in spec)
+        merged = []
+        for start, end in bounds:
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        intervals = np.array(merged, dtype=np.int64).reshape(-1, 2)
+        return intervals[:, 0], intervals[:, 1]
+
+    def _numbers(self, postcodes) -> np.ndarray:
+        """The postcode number compared per row, -1 where it has none."""
+        codes = pd.Series(postcodes, dtype=object).reset_index(drop=True)
+        codes = codes.where(codes.notna(), "").astype(str)
+        if self.match == "prefix":
+            codes = codes.str[:self.digits]
+        valid = codes.str.fullmatch(rf"\d{{{self.digits}}}").to_numpy(dtype=bool)
+        numbers = np.full(len(codes), -1, dtype=np.int64)
+        numbers[valid] = codes[valid].astype(np.int64).to_numpy()
+        return numbers
+
+    def contains(self, countries, postcodes) -> np.ndarray:
+        """Vectorized `(country, postcode) in zone`."""
+        numbers = self._numbers(postcodes)
+        countries = pd.Series(countries, dtype=object).reset_index(drop=True).fillna("").astype(str).to_numpy()
+        inside = np.zeros(len(numbers), dtype=bool)
+        for country, (starts, ends) in self._intervals.items():
+            rows = numbers >= 0
+            if country != ANY_COUNTRY:
+                rows &= countries == country
+            values = numbers[rows]
+            pos = np.searchsorted(starts, values, side="right") - 1
+            hit = pos >= 0
+            hit[hit] = values[hit] <= ends[pos[hit]]
+            inside[rows] |= hit
+        return inside
+
+    def __repr__(self):
+        return f"PostalZone({self.name!r})"
+
+
+class PostalZones:
+    """
+    Named postal zones loaded from a JSON data file, so zone boundaries can
+    be updated without a code change:
+
+        {"<zone>": {"match": "prefix", "digits": 2,
+                    "ranges": {"NL": [[10, 30], 33, ...], "*": [...]}}}
+    """
+
+    def __init__(self, zones: dict):
+        self.zones = zones
+
+    @classmethod
+    def from_json(cls, path: str) -> "PostalZones":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return cls({
+                name: PostalZone(name, spec["ranges"], spec["digits"], spec.get("match", "prefix"))
+                for name, spec in data.items()
+            })
+        except Exception as e:
+            raise FileNotFoundError(f"Could not load postal zones: {path}") from e
+
+    def __getitem__(self, name: str) -> PostalZone:
+        return self.zones[name]
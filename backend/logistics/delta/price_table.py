@@ -0,0 +1,80 @@
+#backend/logistics/delta/price_table.py
+import numpy as np
+import pandas as pd
+
+
+def format_weight(weights) -> pd.Series:
+    """
+    Normalize weights to the "12.00" string form used as price-list key.
+    """
+    return pd.Series(weights).astype(float).apply(lambda x: format(x, ".2f"))
+
+
+class PriceTable:
+    """
+    A partner price list indexed by (CMS category, Weightclass).
+
+    Every price column (route, route-OLD, route-<partner>, ...) is kept in a
+    single float matrix so a whole invoice can be priced with one index lookup
+    instead of scanning the price list for every invoice row.
+    """
+
+    KEY_COLUMNS = ["CMS category", "Weightclass"]
+
+    def __init__(self, df_price: pd.DataFrame):
+        df = df_price.copy()
+        df["Weightclass"] = format_weight(df["Weightclass"]).values
+        # the first matching row wins, like the old row-by-row scan
+        df = df.drop_duplicates(subset=self.KEY_COLUMNS, keep="first")
+
+        self.df_price = df.reset_index(drop=True)
+        self.columns = pd.Index([c for c in df.columns if c not in self.KEY_COLUMNS])
+        self._index = pd.MultiIndex.from_frame(self.df_price[self.KEY_COLUMNS])
+        self._values = (
+            self.df_price[self.columns]
+            .apply(pd.to_numeric, errors="coerce")
+            .to_numpy(dtype=float)
+        )
+
+    @classmethod
+    def from_json(cls, path: str) -> "PriceTable":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(pd.read_json(f, orient="columns"))
+        except Exception as e:
+            raise FileNotFoundError(f"Could not load pricing file: {path}") from e
+
+    def has_column(self, columns) -> np.ndarray:
+        """
+        Vectorized `column in price_row` check.
+        """
+        return pd.Series(columns).isin(self.columns).to_numpy()
+
+    def lookup(self, categories, weights, columns, default: float = 0.0) -> np.ndarray:
+        """
+        Price every row in one pass.
+
+        Args:
+            categories: CMS category per row.
+            weights: weight per row (float or "12.00" string).
+            columns: price column to read per row (e.g. "NL-NL-swdevries").
+            default: price used when no row or column matches.
+
+        Returns:
+            np.ndarray: matched price per row.
+        """
+        categories = pd.Series(categories).reset_index(drop=True)
+        if categories.empty:
+            return np.array([], dtype=float)
+
+        keys = pd.MultiIndex.from_arrays([
+            categories,
+            format_weight(weights).reset_index(drop=True),
+        ])
+        row_pos = self._index.get_indexer(keys)
+        col_pos = self.columns.get_indexer(pd.Series(columns).reset_index(drop=True))
+
+        found = (row_pos >= 0) & (col_pos >= 0)
+        prices = np.full(len(categories), default, dtype=float)
+        prices[found] = self._values[row_pos[found], col_pos[found]]
+        return prices
@@ -1,9 +1,8 @@
 #backend/logistics/delta/swdevries.py
-import os
 import pandas as pd
 import numpy as np
 from .base import BaseDeltaCalculator
-from django.conf import settings
+from logistics.services.pricing_registry import pricing_registry
 
 
 class SwdevriesDeltaCalculator(BaseDeltaCalculator):
@@ -18,33 +17,21 @@ class SwdevriesDeltaCalculator(BaseDeltaCalculator):
         )
         
         # Load pricing file
-        json_path = os.path.join(settings.PRICING_DATA_PATH, "prijslijst_other_partners.json")
-        df_price = pd.read_json(json_path)
-        df_price["Weightclass"] = df_price["Weightclass"].astype(float).apply(lambda x: format(x, '.2f'))
+        price_table = pricing_registry.get_table("prijslijst_other_partners.json")
 
         # Compute matched prices
-        prices = []
-        for _, row in df_merged.iterrows():
-            category_23 = row.get("cat_level_2_and_3")
-            weight = row.get("weight")
-            creation_date = row.get("order_creation_date")
-            buyer_seller_country = row.get("buyer_country-seller_country")
-            matched_price = 0
-
-            change_price_date = pd.Timestamp("2025-02-01")
-
-            for _, price_row in df_price.iterrows():
-                if price_row["CMS category"] == category_23 and price_row["Weightclass"] == weight:
-                    if creation_date < change_price_date:
-                        if f"{buyer_seller_country}-OLD" in price_row:
-                            column_key = f"{buyer_seller_country}-OLD-{partner_value}"
-                        else:
-                            column_key = f"{buyer_seller_country}-{partner_value}"
-                    else:
-                        column_key = f"{buyer_seller_country}-{partner_value}"
-                    matched_price = price_row.get(column_key, matched_price)
-                    break
-            prices.append(matched_price)
+        change_price_date = pd.Timestamp("2025-02-01")
+        route = df_merged["buyer_country-seller_country"]
+        is_old = (df_merged["order_creation_date"] < change_price_date).to_numpy()
+        old_columns = np.where(
+            price_table.has_column(route + "-OLD"),
+            route + f"-OLD-{partner_value}",
+            route + f"-{partner_value}",
+        )
+        price_columns = np.where(is_old, old_columns, route + f"-{partner_value}")
+        prices = price_table.lookup(
+            df_merged["cat_level_2_and_3"], df_merged["weight"], price_columns
+        )
 
         # Assign computed prices and deltas
         df_merged["price"] = prices
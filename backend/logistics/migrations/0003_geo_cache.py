@@ -0,0 +1,48 @@
+# Generated by Django 5.2 on 2026-10-17 22:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logistics', '0002_alter_invoiceline_options_alter_invoicerun_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DistanceCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origin_country', models.CharField(max_length=2)),
+                ('origin_postal_code', models.CharField(max_length=20)),
+                ('dest_country', models.CharField(max_length=2)),
+                ('dest_postal_code', models.CharField(max_length=20)),
+                ('distance_km', models.FloatField()),
+                ('provider', models.CharField(max_length=20)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Distance Cache Entry',
+                'verbose_name_plural': 'Distance Cache',
+                'constraints': [models.UniqueConstraint(fields=('origin_country', 'origin_postal_code', 'dest_country', 'dest_postal_code', 'provider'), name='unique_distance_per_provider')],
+            },
+        ),
+        migrations.CreateModel(
+            name='GeocodeCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('country', models.CharField(max_length=2)),
+                ('postal_code', models.CharField(max_length=20)),
+                ('lat', models.FloatField()),
+                ('lng', models.FloatField()),
+                ('provider', models.CharField(max_length=20)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Geocode Cache Entry',
+                'verbose_name_plural': 'Geocode Cache',
+                'constraints': [models.UniqueConstraint(fields=('country', 'postal_code', 'provider'), name='unique_geocode_per_provider')],
+            },
+        ),
+    ]
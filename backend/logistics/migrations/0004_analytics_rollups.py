@@ -0,0 +1,216 @@
+# Generated by Django 5.2 on 2026-10-17 22:17
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_rollups(apps, schema_editor):
+    # Same aggregation as AnalyticsRollups.rebuild() when this migration was
+    # written, for every run at once. Kept here so later changes to the
+    # service cannot change what this migration does.
+    InvoiceRun           = apps.get_model("logistics", "InvoiceRun")
+    InvoiceLine          = apps.get_model("logistics", "InvoiceLine")
+    RollupPartnerMonth   = apps.get_model("logistics", "RollupPartnerMonth")
+    RollupRoute          = apps.get_model("logistics", "RollupRoute")
+    RollupBuyerCountry   = apps.get_model("logistics", "RollupBuyerCountry")
+    RollupCategoryWeight = apps.get_model("logistics", "RollupCategoryWeight")
+
+    partners = dict(InvoiceRun.objects.values_list("id", "partner"))
+    pos = InvoiceLine.objects.filter(delta__gt=0).order_by()
+    totals = {"total_over": Sum("delta"), "over_count": Count("id")}
+
+    RollupPartnerMonth.objects.bulk_create([
+        RollupPartnerMonth(run_id=rec["run"], partner=partners[rec["run"]], month=rec["month"],
+                           total_over=rec["total_over"], over_count=rec["over_count"])
+        for rec in pos.annotate(month=TruncMonth("invoice_date")).values("run", "month").annotate(**totals)
+    ], batch_size=1000)
+
+    routes = list(pos.values("run", "route").annotate(**totals))
+    RollupRoute.objects.bulk_create([
+        RollupRoute(run_id=rec["run"], route=rec["route"],
+                    total_over=rec["total_over"], over_count=rec["over_count"])
+        for rec in routes
+    ], batch_size=1000)
+
+    countries = defaultdict(lambda: [0, 0])
+    for rec in routes:
+        route = rec["route"]
+        buyer = route.split("-", 1)[0] if route and "-" in route else route
+        acc = countries[(rec["run"], buyer or "Unknown")]
+        acc[0] += rec["total_over"]
+        acc[1] += rec["over_count"]
+    RollupBuyerCountry.objects.bulk_create([
+        RollupBuyerCountry(run_id=run_id, buyer_country=country,
+                           total_over=total_over, over_count=over_count)
+        for (run_id, country), (total_over, over_count) in countries.items()
+    ], batch_size=1000)
+
+    RollupCategoryWeight.objects.bulk_create([
+        RollupCategoryWeight(run_id=rec["run"], category=rec["category_lvl_1_and_2"], weight=rec["weight"],
+                             total_over=rec["total_over"], over_count=rec["over_count"])
+        for rec in pos.values("run", "category_lvl_1_and_2", "weight").annotate(**totals)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0003_geo_cache"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RollupBuyerCountry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("buyer_country", models.CharField(max_length=31)),
+                ("total_over", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("over_count", models.IntegerField()),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rollup_buyer_countries",
+                        to="logistics.invoicerun",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["buyer_country"], name="logistics_r_buyer_c_5bec14_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="RollupCategoryWeight",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("category", models.CharField(max_length=100)),
+                ("weight", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("total_over", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("over_count", models.IntegerField()),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rollup_category_weights",
+                        to="logistics.invoicerun",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["category", "weight"],
+                        name="logistics_r_categor_6d5ea6_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="RollupPartnerMonth",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "partner",
+                    models.CharField(
+                        choices=[
+                            ("brenger", "Brenger"),
+                            ("libero", "Libero"),
+                            ("swdevries", "Sw De Vries"),
+                            ("transpoksi", "Transpoksi"),
+                            ("wuunder", "Wuunder"),
+                            ("magic_movers", "Magic Movers"),
+                            ("tadde", "Tadde"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("month", models.DateField(help_text="First day of the invoice month")),
+                ("total_over", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("over_count", models.IntegerField()),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rollup_partner_months",
+                        to="logistics.invoicerun",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["partner", "month"],
+                        name="logistics_r_partner_67aace_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="RollupRoute",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "route",
+                    models.CharField(
+                        max_length=31, verbose_name="buyer_country-seller_country"
+                    ),
+                ),
+                ("total_over", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("over_count", models.IntegerField()),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rollup_routes",
+                        to="logistics.invoicerun",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["route"], name="logistics_r_route_371a73_idx")
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-17 22:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0004_analytics_rollups"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="invoiceline",
+            index=models.Index(
+                fields=["invoice_date", "run"], name="invoiceline_date_run_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invoiceline",
+            index=models.Index(
+                condition=models.Q(("delta__gt", 0)),
+                fields=["route"],
+                name="invoiceline_pos_route_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-17 22:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0005_invoiceline_analytics_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="invoiceline",
+            name="buyer_country",
+            field=models.CharField(
+                blank=True, db_index=True, default="", max_length=31
+            ),
+        ),
+        migrations.AddField(
+            model_name="invoiceline",
+            name="seller_country",
+            field=models.CharField(
+                blank=True, db_index=True, default="", max_length=31
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+def split_route(route):
+    # frozen copy of logistics.services.analytics_rollups.split_route
+    if route and "-" in route:
+        buyer, seller = route.split("-", 1)
+        return buyer, seller
+    return route or "", ""
+
+
+def backfill_countries(apps, schema_editor):
+    InvoiceLine = apps.get_model("logistics", "InvoiceLine")
+    # one UPDATE per distinct route (a handful) instead of per line
+    for route in InvoiceLine.objects.values_list("route", flat=True).distinct():
+        buyer, seller = split_route(route)
+        InvoiceLine.objects.filter(route=route).update(
+            buyer_country=buyer, seller_country=seller
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0006_invoiceline_countries"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_countries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2 on 2026-10-17 22:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0007_backfill_invoiceline_countries"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InvoiceRunStage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "stage",
+                    models.CharField(
+                        choices=[
+                            ("parse", "Parse invoice"),
+                            ("fetch_orders", "Fetch orders"),
+                            ("price", "Merge & price"),
+                            ("persist", "Persist lines"),
+                            ("total", "Total"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("seconds", models.FloatField()),
+                ("rows", models.IntegerField(blank=True, null=True)),
+                (
+                    "max_rss_mb",
+                    models.FloatField(
+                        blank=True,
+                        help_text="Peak resident memory of the worker process during the stage",
+                        null=True,
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stages",
+                        to="logistics.invoicerun",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Invoice Run Stage",
+                "verbose_name_plural": "Invoice Run Stages",
+                "ordering": ["run", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["created", "stage"],
+                        name="logistics_i_created_5825fc_idx",
+                    )
+                ],
+            },
+        ),
+    ]
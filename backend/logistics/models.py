@@ -64,6 +64,8 @@ class InvoiceLine(models.Model):
     order_id                 = models.CharField("Order ID", max_length=100, db_index=True)
     weight                   = models.DecimalField(max_digits=10, decimal_places=2)
     route                    = models.CharField("buyer_country-seller_country", max_length=31)
+    buyer_country            = models.CharField(max_length=31, blank=True, default="", db_index=True)
+    seller_country           = models.CharField(max_length=31, blank=True, default="", db_index=True)
     category_lvl_1_and_2     = models.CharField(max_length=100)
     category_lvl_2_and_3     = models.CharField(max_length=100)
 
@@ -97,9 +99,155 @@ class InvoiceLine(models.Model):
         indexes = [
             models.Index(fields=["order_id"]),
             models.Index(fields=["invoice_number"]),
+            # filtered analytics (see logistics/services/analytics_queries.py)
+            models.Index(fields=["invoice_date", "run"], name="invoiceline_date_run_idx"),
+            models.Index(fields=["route"], condition=Q(delta__gt=0), name="invoiceline_pos_route_idx"),
         ]
         verbose_name = "Invoice Line"
         verbose_name_plural = "Invoice Lines"
 
     def __str__(self):
         return f"{self.order_creation_date:%Y-%m-%d} | {self.order_id} | Δ={self.delta:+.2f}"
+
+
+STAGE_CHOICES = [
+    ("parse",        "Parse invoice"),
+    ("fetch_orders", "Fetch orders"),
+    ("price",        "Merge & price"),
+    ("persist",      "Persist lines"),
+    ("total",        "Total"),
+]
+
+
+class InvoiceRunStage(models.Model):
+    """
+    Duration, row count and memory high-water mark of one pipeline stage of
+    an InvoiceRun evaluation (see logistics/services/stage_metrics.py).
+    Every evaluation adds its own rows, so a re-evaluated run keeps its
+    earlier timings as separate samples.
+    """
+    run        = models.ForeignKey(InvoiceRun, related_name="stages", on_delete=models.CASCADE)
+    stage      = models.CharField(max_length=20, choices=STAGE_CHOICES)
+    seconds    = models.FloatField()
+    rows       = models.IntegerField(null=True, blank=True)
+    max_rss_mb = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Peak resident memory of the worker process during the stage"
+    )
+    created    = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["run", "id"]
+        indexes = [models.Index(fields=["created", "stage"])]
+        verbose_name = "Invoice Run Stage"
+        verbose_name_plural = "Invoice Run Stages"
+
+    def __str__(self):
+        return f"run {self.run_id} | {self.stage} | {self.seconds:.3f}s"
+
+
+class GeocodeCache(models.Model):
+    """
+    Coordinates of a (country, postal code), as returned by a geo provider.
+    """
+    country     = models.CharField(max_length=2)
+    postal_code = models.CharField(max_length=20)
+    lat         = models.FloatField()
+    lng         = models.FloatField()
+    provider    = models.CharField(max_length=20)
+    updated     = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["country", "postal_code", "provider"],
+                name="unique_geocode_per_provider"
+            )
+        ]
+        verbose_name = "Geocode Cache Entry"
+        verbose_name_plural = "Geocode Cache"
+
+    def __str__(self):
+        return f"{self.country}-{self.postal_code} | ({self.lat:.4f}, {self.lng:.4f})"
+
+
+class DistanceCache(models.Model):
+    """
+    Road distance in km between two (country, postal code) places.
+    """
+    origin_country      = models.CharField(max_length=2)
+    origin_postal_code  = models.CharField(max_length=20)
+    dest_country        = models.CharField(max_length=2)
+    dest_postal_code    = models.CharField(max_length=20)
+    distance_km         = models.FloatField()
+    provider            = models.CharField(max_length=20)
+    updated             = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=[
+                    "origin_country", "origin_postal_code",
+                    "dest_country", "dest_postal_code", "provider",
+                ],
+                name="unique_distance_per_provider"
+            )
+        ]
+        verbose_name = "Distance Cache Entry"
+        verbose_name_plural = "Distance Cache"
+
+    def __str__(self):
+        return (
+            f"{self.origin_country}-{self.origin_postal_code} → "
+            f"{self.dest_country}-{self.dest_postal_code} | {self.distance_km:.1f} km"
+        )
+
+
+# Analytics rollups.
+#
+# Positive-delta (over-charged) lines of one InvoiceRun, pre-aggregated per
+# dimension. They are rebuilt whenever a run is created or replaced (see
+# logistics/services/analytics_rollups.py) and deleted with their run, so
+# AnalyticsView only sums these rows instead of scanning InvoiceLine.
+
+class RollupPartnerMonth(models.Model):
+    run        = models.ForeignKey(InvoiceRun, related_name="rollup_partner_months", on_delete=models.CASCADE)
+    partner    = models.CharField(max_length=50, choices=PARTNER_CHOICES)
+    month      = models.DateField(help_text="First day of the invoice month")
+    total_over = models.DecimalField(max_digits=14, decimal_places=2)
+    over_count = models.IntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=["partner", "month"])]
+
+
+class RollupRoute(models.Model):
+    run        = models.ForeignKey(InvoiceRun, related_name="rollup_routes", on_delete=models.CASCADE)
+    route      = models.CharField("buyer_country-seller_country", max_length=31)
+    total_over = models.DecimalField(max_digits=14, decimal_places=2)
+    over_count = models.IntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=["route"])]
+
+
+class RollupBuyerCountry(models.Model):
+    run           = models.ForeignKey(InvoiceRun, related_name="rollup_buyer_countries", on_delete=models.CASCADE)
+    buyer_country = models.CharField(max_length=31)
+    total_over    = models.DecimalField(max_digits=14, decimal_places=2)
+    over_count    = models.IntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=["buyer_country"])]
+
+
+class RollupCategoryWeight(models.Model):
+    run        = models.ForeignKey(InvoiceRun, related_name="rollup_category_weights", on_delete=models.CASCADE)
+    category   = models.CharField(max_length=100)
+    weight     = models.DecimalField(max_digits=10, decimal_places=2)
+    total_over = models.DecimalField(max_digits=14, decimal_places=2)
+    over_count = models.IntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=["category", "weight"])]
@@ -1,9 +1,56 @@
 #backend/logistics/parsers/base_parser.py
+import io
+import mmap
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any
 import pandas as pd
 
 
+class MappedStream(io.RawIOBase):
+    """Read-only, seekable file object over a buffer (e.g. an mmap), without copying it."""
+
+    def __init__(self, buffer):
+        super().__init__()
+        self._buffer = buffer
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._buffer)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._buffer) if size is None or size < 0 else min(self._pos + size, len(self._buffer))
+        data = self._buffer[self._pos:end] if end > self._pos else b""
+        self._pos = max(self._pos, end)
+        return data
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+
+def byte_stream(file_bytes) -> io.RawIOBase:
+    """
+    A seekable stream over an upload: a BytesIO around bytes, or a
+    MappedStream over a memory-mapped upload, so spooled files are not
+    copied into memory.
+    """
+    if isinstance(file_bytes, mmap.mmap):
+        return MappedStream(file_bytes)
+    return io.BytesIO(file_bytes)
+
+
 class BaseParser(ABC):
     """
     Abstract base class for all invoice parsers.
@@ -15,8 +62,13 @@ class BaseParser(ABC):
     You can optionally override:
     - extract_metadata(): to extract summary info like invoice number/date
     - validate(): to ensure data integrity
+
+    Bump `version` whenever a parser's output changes, so cached parse
+    results of earlier versions are no longer used.
     """
 
+    version: str = "1"
+
     def __init__(self):
         self.metadata: Dict[str, Any] = {}
 
@@ -26,7 +78,8 @@ class BaseParser(ABC):
         Main method to parse file bytes into a structured DataFrame.
 
         Args:
-            file_bytes (bytes): Raw content of the file (PDF, XLSX, CSV)
+            file_bytes (bytes): Raw content of the file (PDF, XLSX, CSV), or a
+                read-only mmap of it; open it with byte_stream()
             context (dict, optional): Additional inputs such as a second file or config flags
 
         Returns:
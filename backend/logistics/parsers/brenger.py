@@ -1,109 +1,103 @@
 #backend/logistics/parsers/brenger.py
 import pandas as pd
-import pdfplumber
 import re
-import io
 from .base_parser import BaseParser
+from .pdf_text import extract_page_lines
 
 
 class BrengerParser(BaseParser):
     def parse(self, file_bytes: bytes) -> pd.DataFrame:
         data = []
-        pdf_stream = io.BytesIO(file_bytes)
         total_value = None
         invoice_date, invoice_num = "", ""
         start_extraction = False
         skip_line = False
 
-        with pdfplumber.open(pdf_stream) as pdf:
-            for num_page, page in enumerate(pdf.pages):
-                text = page.extract_text()
-                text_next = pdf.pages[num_page + 1].extract_text() if num_page + 1 < len(pdf.pages) else ""
+        pages = extract_page_lines(file_bytes)
+        for num_page, lines in enumerate(pages):
+            if not lines:
+                continue
 
-                if not text:
+            lines_next = pages[num_page + 1] if num_page + 1 < len(pages) else []
+
+            columns_value = None
+            for i, line in enumerate(lines):
+                line = line.strip()
+                line = re.sub(r"[\u2013\u2014\u2212]", "-", line)
+
+                # Invoice metadata
+                if "Factuurdatum" in line:
+                    match = re.match(r"Factuurdatum:\s*(\d{4}-\d{2}-\d{2})", line)
+                    if match:
+                        invoice_date = match.group(1)
+
+                if "Factuurnummer" in line:
+                    match = re.match(r"Factuurnummer:\s*(\w+)", line)
+                    if match:
+                        invoice_num = match.group(1)
+
+                if "BTW (21%):" in line:
+                    start_extraction = False
                     continue
 
-                lines = text.split("\n")
-                lines_next = text_next.split("\n") if text_next else []
-
-                columns_value = None
-                for i, line in enumerate(lines):
-                    line = line.strip()
-                    line = re.sub(r"[\u2013\u2014\u2212]", "-", line)
-
-                    # Invoice metadata
-                    if "Factuurdatum" in line:
-                        match = re.match(r"Factuurdatum:\s*(\d{4}-\d{2}-\d{2})", line)
-                        if match:
-                            invoice_date = match.group(1)
-
-                    if "Factuurnummer" in line:
-                        match = re.match(r"Factuurnummer:\s*(\w+)", line)
-                        if match:
-                            invoice_num = match.group(1)
-
-                    if "BTW (21%):" in line:
-                        start_extraction = False
-                        continue
-
-                    if "TOTAAL:" in line:
-                        total_match = re.search(r"\u20ac\s*([\d,.]+)", line)
-                        if total_match:
-                            total_value = total_match.group(1)
-                        break
-
-                    if skip_line:
-                        skip_line = False
-                        continue
-
-                    is_canceled = ". Cancelled." in line
-                    line = line.replace(". Cancelled.", "").strip()
-
-                    # Look ahead
-                    next_line = lines[i + 1].strip() if i + 1 < len(lines) else ""
-                    next_next_line = lines[i + 2].strip() if i + 2 < len(lines) else (lines_next[1].strip() if len(lines_next) > 1 else "")
-
-                    # Start of entry
-                    id_match = re.match(r"^(\w{6})\s([\d-]+: .*)", line)
-                    if id_match:
-                        if columns_value:
-                            data.append(columns_value)
-
-                        columns_value = {
-                            "Invoice date": invoice_date,
-                            "Invoice number": invoice_num,
-                            "id": id_match.group(1),
-                            "date": "",
-                            "pickup_city": "",
-                            "dropoff_city": "",
-                            "name_pickup": "",
-                            "name_dropoff": "",
-                            "status": "Cancelled" if is_canceled else "Active",
-                            "ordernummer": "",
-                            "bedrag_incl_btw": "",
-                            "bedrag": ""
-                        }
-                        line = re.sub(r"^\w{6}\s*", "", line)
-
-                    # Prices
-                    bedrag_match = re.search(r"\u20ac\s*([\d,.]+)\s*\u20ac\s*([\d,.]+)", line)
-                    if bedrag_match and columns_value:
-                        columns_value["bedrag_incl_btw"] = bedrag_match.group(1)
-                        columns_value["bedrag"] = bedrag_match.group(2)
-                        line = re.sub(r"\u20ac\s*[\d,.]+\s*\u20ac\s*[\d,.]+", "", line).strip()
-
-                    # Trip matching
-                    if columns_value:
-                        trip_line = self._combine_trip_line(line, next_line, next_next_line)
-                        self._extract_trip_details(trip_line, columns_value, disjoint_fallback=(next_line, next_next_line))
+                if "TOTAAL:" in line:
+                    total_match = re.search(r"\u20ac\s*([\d,.]+)", line)
+                    if total_match:
+                        total_value = total_match.group(1)
+                    break
 
-                    if "Ordernummer:" in line and columns_value:
-                        match = re.match(r"Ordernummer:\s*(\w+)?", line)
-                        if match and match.group(1):
-                            columns_value["ordernummer"] = match.group(1)
+                if skip_line:
+                    skip_line = False
+                    continue
 
+                is_canceled = ". Cancelled." in line
+                line = line.replace(". Cancelled.", "").strip()
+
+                # Look ahead
+                next_line = lines[i + 1].strip() if i + 1 < len(lines) else ""
+                next_next_line = lines[i + 2].strip() if i + 2 < len(lines) else (lines_next[1].strip() if len(lines_next) > 1 else "")
+
+                # Start of entry
+                id_match = re.match(r"^(\w{6})\s([\d-]+: .*)", line)
+                if id_match:
+                    if columns_value:
+                        data.append(columns_value)
+
+                    columns_value = {
+                        "Invoice date": invoice_date,
+                        "Invoice number": invoice_num,
+                        "id": id_match.group(1),
+                        "date": "",
+                        "pickup_city": "",
+                        "dropoff_city": "",
+                        "name_pickup": "",
+                        "name_dropoff": "",
+                        "status": "Cancelled" if is_canceled else "Active",
+                        "ordernummer": "",
+                        "bedrag_incl_btw": "",
+                        "bedrag": ""
+                    }
+                    line = re.sub(r"^\w{6}\s*", "", line)
+
+                # Prices
+                bedrag_match = re.search(r"\u20ac\s*([\d,.]+)\s*\u20ac\s*([\d,.]+)", line)
+                if bedrag_match and columns_value:
+                    columns_value["bedrag_incl_btw"] = bedrag_match.group(1)
+                    columns_value["bedrag"] = bedrag_match.group(2)
+                    line = re.sub(r"\u20ac\s*[\d,.]+\s*\u20ac\s*[\d,.]+", "", line).strip()
+
+                # Trip matching
                 if columns_value:
-                    data.append(columns_value)
+                    trip_line = self._combine_trip_line(line, next_line, next_next_line)
+                    self._extract_trip_details(trip_line, columns_value, disjoint_fallback=(next_line, next_next_line))
+
+                if "Ordernummer:" in line and columns_value:
+                    match = re.match(r"Ordernummer:\s*(\w+)?", line)
+                    if match and match.group(1):
+                        columns_value["ordernummer"] = match.group(1)
+
+            if columns_value:
+                data.append(columns_value)
 
         df = pd.DataFrame(data)
         if df.empty:
@@ -1,9 +1,8 @@
 #backend/logistics/parsers/libero.py
 import pandas as pd
-import pdfplumber
-import io
 import re
-from .base_parser import BaseParser
+from .base_parser import BaseParser, byte_stream
+from .pdf_text import iter_page_lines
 
 
 class LiberoParser(BaseParser):
@@ -19,7 +18,7 @@ class LiberoParser(BaseParser):
 
         invoice_date, invoice_num = self._parse_pdf(context["pdf_bytes"])
 
-        excel_stream = io.BytesIO(file_bytes)
+        excel_stream = byte_stream(file_bytes)
         df = pd.read_excel(excel_stream, sheet_name="factuur 14-03")
 
         total_value = float(df.iloc[-3, 1].replace(".", "").replace(",-", "."))
@@ -50,13 +49,10 @@ class LiberoParser(BaseParser):
         return df
 
     def _parse_pdf(self, pdf_bytes: bytes):
-        stream = io.BytesIO(pdf_bytes)
-        with pdfplumber.open(stream) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                for line in text.split("\n"):
-                    line = line.strip()
-                    match = re.search(r"Factuurnummer:\s*(\S+)\s+Factuurdatum:\s*(\d{2}-\d{2}-\d{4})", line)
-                    if match:
-                        return match.group(2), match.group(1)  # (date, number)
+        for page_lines in iter_page_lines(pdf_bytes):
+            for line in page_lines:
+                line = line.strip()
+                match = re.search(r"Factuurnummer:\s*(\S+)\s+Factuurdatum:\s*(\d{2}-\d{2}-\d{4})", line)
+                if match:
+                    return match.group(2), match.group(1)  # (date, number)
         return "", ""
@@ -1,12 +1,13 @@
 #backend/logistics/parsers/magic_movers.py
 import pandas as pd
-import io
-from .base_parser import BaseParser
+from .base_parser import BaseParser, byte_stream
 
 
 class MagicMoversParser(BaseParser):
+    version = "2"
+
     def parse(self, file_bytes: bytes) -> pd.DataFrame:
-        excel_stream = io.BytesIO(file_bytes)
+        excel_stream = byte_stream(file_bytes)
         df = pd.read_excel(excel_stream, sheet_name="Arkusz1", header=1)
 
         invoice_value = df.iloc[1, 1]
@@ -22,8 +23,7 @@ class MagicMoversParser(BaseParser):
         df = df.drop(columns=['wooden'])
         df['date'] = pd.to_datetime(df['date'], format='%Y%m%d')
         df = df.iloc[:-2]
-        return df
-        
+
         # Add metadata
         df["Invoice number"] = invoice_value
         df["Invoice date"] = pd.to_datetime(date_value, dayfirst=True, errors='coerce')
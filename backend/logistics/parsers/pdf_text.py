@@ -0,0 +1,73 @@
+#backend/logistics/parsers/pdf_text.py
+from typing import Iterator
+import pdfplumber
+from billiard.pool import Pool
+from django.conf import settings
+from .base_parser import byte_stream
+
+# below this many pages per worker the pool start-up costs more than it saves
+MIN_PAGES_PER_WORKER = 8
+
+
+def _page_lines(page) -> list[str]:
+    text = page.extract_text()
+    return text.split("\n") if text else []
+
+
+def _extract_range(file_bytes: bytes, start: int, stop: int) -> list[list[str]]:
+    with pdfplumber.open(byte_stream(file_bytes)) as pdf:
+        return [_page_lines(pdf.pages[i]) for i in range(start, stop)]
+
+
+def iter_page_lines(file_bytes: bytes) -> Iterator[list[str]]:
+    """
+    Extract page by page, in-process, for lookups that stop early (e.g. an
+    invoice header on the first page); pages after the caller stops are
+    never extracted.
+    """
+    with pdfplumber.open(byte_stream(file_bytes)) as pdf:
+        for page in pdf.pages:
+            yield _page_lines(page)
+
+
+def extract_page_lines(file_bytes: bytes, max_workers: int = None) -> list[list[str]]:
+    """
+    Extract the text of every page exactly once.
+
+    Large documents are split into contiguous page ranges that are extracted
+    in a process pool; small ones (or environments that cannot fork) are
+    extracted in-process. The pool is billiard's (Celery's multiprocessing
+    fork): this runs inside daemonic prefork worker children, where the
+    stdlib refuses to start processes.
+
+    Args:
+        file_bytes (bytes): Raw PDF content, or a read-only mmap of it.
+        max_workers (int, optional): Pool size, defaults to PDF_EXTRACT_WORKERS.
+
+    Returns:
+        list[list[str]]: The raw text lines of each page, [] for empty pages.
+    """
+    with pdfplumber.open(byte_stream(file_bytes)) as pdf:
+        num_pages = len(pdf.pages)
+        workers = min(
+            max_workers or settings.PDF_EXTRACT_WORKERS,
+            num_pages // MIN_PAGES_PER_WORKER,
+        )
+        if workers <= 1:
+            return [_page_lines(page) for page in pdf.pages]
+
+    step = -(-num_pages // workers)  # ceil division
+    ranges = [(start, min(start + step, num_pages)) for start in range(0, num_pages, step)]
+    try:
+        # workers get their own copy; an mmap cannot be pickled
+        payload = file_bytes if isinstance(file_bytes, bytes) else bytes(file_bytes)
+        pool = Pool(processes=len(ranges))
+        try:
+            chunks = pool.starmap(_extract_range, [(payload, start, stop) for start, stop in ranges])
+        finally:
+            pool.terminate()
+            pool.join()
+        return [lines for chunk in chunks for lines in chunk]
+    except (AssertionError, OSError) as e:
+        print(f"⚠️ Parallel PDF extraction unavailable ({e}), extracting serially")
+        return _extract_range(file_bytes, 0, num_pages)
@@ -1,12 +1,11 @@
 #backend/logistics/parsers/swdevries.py
 import pandas as pd
-import io
-from .base_parser import BaseParser
+from .base_parser import BaseParser, byte_stream
 
 
 class SwdevriesParser(BaseParser):
     def parse(self, file_bytes: bytes) -> pd.DataFrame:
-        excel_stream = io.BytesIO(file_bytes)
+        excel_stream = byte_stream(file_bytes)
         df = pd.read_excel(excel_stream, sheet_name="Blad1", header=None)
 
         invoice_value = df.iloc[1, 1]
@@ -1,10 +1,9 @@
 # backend/logistics/parsers/tadde.py
-import io
 import re
 import pandas as pd
-import pdfplumber
 from datetime import datetime
 from .base_parser import BaseParser
+from .pdf_text import extract_page_lines
 
 
 class TaddeParser(BaseParser):
@@ -14,12 +13,10 @@ class TaddeParser(BaseParser):
         """
         # ─── 1) Read every page and collect lines ─────────────────────────────
         lines_per_page = []
-        with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-            for page_num, page in enumerate(pdf.pages, start=1):
-                text = page.extract_text() or ""
-                page_lines = [ln.strip() for ln in text.split("\n") if ln.strip()]
-                print(f"[DEBUG] Page {page_num}: {len(page_lines)} lines")
-                lines_per_page.append(page_lines)
+        for page_num, raw_lines in enumerate(extract_page_lines(file_bytes), start=1):
+            page_lines = [ln.strip() for ln in raw_lines if ln.strip()]
+            print(f"[DEBUG] Page {page_num}: {len(page_lines)} lines")
+            lines_per_page.append(page_lines)
 
         # ─── 2) Extract metadata from all lines ───────────────────────────────
         all_lines = [ln for pg in lines_per_page for ln in pg]
@@ -1,10 +1,9 @@
 # backend/logistics/parsers/wuunder.py
-import io
 import re
 import pandas as pd
-import pdfplumber
 from datetime import datetime, date
 from .base_parser import BaseParser
+from .pdf_text import extract_page_lines
 
 # Map Dutch month names → month number
 _DUTCH_MONTHS = {
@@ -53,16 +52,8 @@ class WuunderParser(BaseParser):
           - price_wuunder (sum)
           - shipment_tags, delivery_method
         """
-        pdf_stream = io.BytesIO(file_bytes)
         data = []
-        lines = []
-
- 
-        with pdfplumber.open(pdf_stream) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    lines.extend(text.split("\n"))
+        lines = [line for page_lines in extract_page_lines(file_bytes) for line in page_lines]
 
 
         invoice_number = None
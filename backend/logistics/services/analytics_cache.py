@@ -0,0 +1,74 @@
+#backend/logistics/services/analytics_cache.py
+import hashlib
+import time
+from typing import Optional
+from django.core.cache import cache
+
+
+class AnalyticsCache:
+    """
+    Versioned cache of the AnalyticsView payloads in the default cache.
+
+    Each payload (one per filter combination, the "variant") is stored
+    under the current version, which is bumped when
+    an InvoiceRun is created, updated or deleted (see logistics/signals.py).
+    Versions start from the current time in ms, so a lost version key never
+    resurrects an old payload. The version also serves as the response
+    ETag. Cache errors are logged and treated as misses.
+    """
+
+    VERSION_KEY = "analytics:version"
+    PAYLOAD_KEY = "analytics:payload:v{version}:{variant}"
+    PAYLOAD_TTL = 24 * 3600
+
+    def version(self) -> Optional[int]:
+        try:
+            cache.add(self.VERSION_KEY, self._initial_version(), timeout=None)
+            return cache.get(self.VERSION_KEY)
+        except Exception as e:
+            print(f"⚠️ Analytics cache unavailable: {e}")
+            return None
+
+    def bump(self) -> None:
+        try:
+            cache.incr(self.VERSION_KEY)
+        except ValueError:
+            # version key missing (evicted / never read)
+            cache.add(self.VERSION_KEY, self._initial_version(), timeout=None)
+        except Exception as e:
+            print(f"⚠️ Could not bump analytics cache version: {e}")
+
+    @staticmethod
+    def _initial_version() -> int:
+        return int(time.time() * 1000)
+
+    @staticmethod
+    def _digest(variant: str) -> str:
+        return hashlib.sha1(variant.encode()).hexdigest()[:16]
+
+    def etag(self, version: Optional[int], variant: str = "") -> Optional[str]:
+        return f'"analytics-v{version}-{self._digest(variant)}"' if version is not None else None
+
+    def get(self, version: Optional[int], variant: str = "") -> Optional[dict]:
+        if version is None:
+            return None
+        try:
+            return cache.get(self.PAYLOAD_KEY.format(version=version, variant=self._digest(variant)))
+        except Exception as e:
+            print(f"⚠️ Analytics cache unavailable: {e}")
+            return None
+
+    def set(self, version: Optional[int], payload: dict, variant: str = "") -> None:
+        if version is None:
+            return
+        try:
+            cache.set(
+                self.PAYLOAD_KEY.format(version=version, variant=self._digest(variant)),
+                payload,
+                timeout=self.PAYLOAD_TTL,
+            )
+        except Exception as e:
+            print(f"⚠️ Could not cache analytics payload: {e}")
+
+
+analytics_cache = AnalyticsCache()
@@ -0,0 +1,263 @@
+#backend/logistics/services/analytics_queries.py
+from collections import defaultdict
+from datetime import date
+from typing import Optional
+from django.db.models import Avg, Count, ExpressionWrapper, F, FloatField, Sum
+from django.db.models.functions import Cast, TruncMonth
+from logistics.models import (
+    InvoiceRun, InvoiceLine,
+    RollupPartnerMonth, RollupRoute, RollupBuyerCountry, RollupCategoryWeight,
+)
+from logistics.services.analytics_rollups import UNKNOWN_COUNTRY
+
+TOP_ROUTES_DEFAULT_LIMIT = 5
+MAX_LIMIT = 1000
+
+
+class AnalyticsQuery:
+    """
+    The AnalyticsView payload for an optional invoice-date range, partner
+    and route, with limit/offset on the list sections (top_routes,
+    category_weight).
+
+    Unfiltered and partner-only queries are answered from the per-run
+    rollup tables. Date-range and route filters need line granularity, so
+    they aggregate the matching positive-delta InvoiceLine rows in SQL
+    (served by the (invoice_date, run), partial positive-route and
+    buyer_country indexes).
+    """
+
+    def __init__(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        partner: Optional[str] = None,
+        route: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ):
+        self.date_from = date_from
+        self.date_to = date_to
+        self.partner = partner
+        self.route = route
+        self.limit = limit
+        self.offset = offset
+
+    @classmethod
+    def from_params(cls, params) -> "AnalyticsQuery":
+        """
+        Build from request query params (from, to, partner, route, limit,
+        offset). Raises ValueError for malformed values.
+        """
+        def parse_date(name):
+            value = params.get(name)
+            if not value:
+                return None
+            try:
+                return date.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f"Invalid '{name}' date, expected YYYY-MM-DD: {value}")
+
+        def parse_int(name, default):
+            value = params.get(name)
+            if value in (None, ""):
+                return default
+            try:
+                number = int(value)
+            except ValueError:
+                raise ValueError(f"Invalid '{name}', expected an integer: {value}")
+            if number < 0:
+                raise ValueError(f"'{name}' must not be negative")
+            return number
+
+        limit = parse_int("limit", None)
+        return cls(
+            date_from = parse_date("from"),
+            date_to   = parse_date("to"),
+            partner   = (params.get("partner") or "").strip().lower() or None,
+            route     = (params.get("route") or "").strip() or None,
+            limit     = min(limit, MAX_LIMIT) if limit is not None else None,
+            offset    = parse_int("offset", 0),
+        )
+
+    @property
+    def cache_variant(self) -> str:
+        """Stable identifier of these parameters for cache keys / ETags."""
+        parts = (self.date_from, self.date_to, self.partner, self.route, self.limit, self.offset)
+        return "|".join("" if p is None else str(p) for p in parts)
+
+    @property
+    def uses_lines(self) -> bool:
+        return bool(self.date_from or self.date_to or self.route)
+
+    def _page(self, default_limit: int) -> slice:
+        limit = self.limit if self.limit is not None else default_limit
+        return slice(self.offset, self.offset + limit)
+
+    # querysets
+
+    def _lines(self):
+        lines = InvoiceLine.objects.all()
+        if self.date_from:
+            lines = lines.filter(invoice_date__gte=self.date_from)
+        if self.date_to:
+            lines = lines.filter(invoice_date__lte=self.date_to)
+        if self.partner:
+            lines = lines.filter(run__partner=self.partner)
+        if self.route:
+            lines = lines.filter(route=self.route)
+        return lines
+
+    def _runs(self):
+        runs = InvoiceRun.objects.all()
+        if self.partner:
+            runs = runs.filter(partner=self.partner)
+        if self.uses_lines:
+            runs = runs.filter(id__in=self._lines().values("run_id"))
+        return runs
+
+    def _sources(self) -> dict:
+        """
+        Querysets exposing the same names (month, partner, route, category,
+        weight) and aggregates (total_over, order_count) for both paths.
+        """
+        if self.uses_lines:
+            pos = self._lines().filter(delta__gt=0).annotate(
+                month=TruncMonth("invoice_date"),
+                partner=F("run__partner"),
+                category=F("category_lvl_1_and_2"),
+            )
+            over = {"total_over": Sum("delta"), "order_count": Count("id")}
+            return {
+                "over": over, "partner_month": pos, "route": pos,
+                "country": pos, "category_weight": pos,
+            }
+
+        sources = {
+            "partner_month":   RollupPartnerMonth.objects.all(),
+            "route":           RollupRoute.objects.all(),
+            "country":         RollupBuyerCountry.objects.all(),
+            "category_weight": RollupCategoryWeight.objects.all(),
+        }
+        if self.partner:
+            sources = {name: qs.filter(run__partner=self.partner) for name, qs in sources.items()}
+        sources["over"] = {"total_over": Sum("total_over"), "order_count": Sum("over_count")}
+        return sources
+
+    # payload
+
+    def payload(self) -> dict:
+        src = self._sources()
+        over = src["over"]
+        avg_over = ExpressionWrapper(
+            Cast("total_over", FloatField()) / F("order_count"),
+            output_field=FloatField()
+        )
+
+        # 1) Totals & averages
+        runs              = self._runs()
+        total_runs        = runs.count()
+        avg_delta_per_run = runs.aggregate(avg=Avg("delta_sum"))["avg"] or 0.0
+
+        # 2) Top partner
+        top = (
+            runs.values("partner")
+                .annotate(cnt=Count("id"))
+                .order_by("-cnt")
+                .first()
+        )
+        top_partner = top["partner"] if top else ""
+
+        # 3) Average over-charge per positive-delta line
+        totals = src["partner_month"].aggregate(**over)
+        avg_over_per_order = (
+            float(totals["total_over"]) / totals["order_count"] if totals["order_count"] else 0.0
+        )
+
+        # 4) Over‐charge by partner
+        over_per_partner = {
+            rec["partner"]: float(rec["total_over"])
+            for rec in src["partner_month"].values("partner")
+                                           .annotate(**over)
+                                           .order_by("-total_over")
+        }
+
+        # 5) Over‐charge by buyer country
+        over_per_country = {
+            (rec["buyer_country"] or UNKNOWN_COUNTRY): float(rec["total_over"])
+            for rec in src["country"].values("buyer_country")
+                                     .annotate(**over)
+                                     .order_by("-total_over")
+        }
+
+        # 6) Monthly trend
+        trend_dict, partners = defaultdict(dict), set()
+        for rec in src["partner_month"].values("month", "partner").annotate(**over):
+            m = rec["month"].strftime("%Y-%m")
+            p = rec["partner"]
+            trend_dict[m][p] = float(rec["total_over"])
+            partners.add(p)
+
+        trend_data    = [{"month": m, **trend_dict[m]} for m in sorted(trend_dict)]
+        partners_list = sorted(partners)
+
+        # 7) Lossy routes by **average** over-charge per order (top 5 by default)
+        route_qs = (
+            src["route"].values("route")
+               .annotate(**over)
+               .filter(order_count__gt=0)
+               .annotate(avg_over=avg_over)
+               .order_by("-avg_over", "route")[self._page(TOP_ROUTES_DEFAULT_LIMIT)]
+        )
+        top_routes = [
+            {
+                "route":     rec["route"],
+                "avg_over":  round(rec["avg_over"], 2),
+                "total_over": float(rec["total_over"]),
+                "orders":    rec["order_count"],
+            }
+            for rec in route_qs
+        ]
+
+        # 8) Over-charge by category & weight (average per item)
+        cat_wt_qs = (
+            src["category_weight"].values("category", "weight")
+               .annotate(**over)
+               .annotate(avg_over=avg_over)
+               .order_by("-total_over", "category", "weight")
+        )
+        category_weight_count = cat_wt_qs.count()
+
+        # Build a list of { category, weight, avg_over, total_over, count }
+        category_weight = [
+            {
+                "category":    rec["category"],
+                "weight":      float(rec["weight"]),
+                "total_over":  float(rec["total_over"]),
+                "count":       rec["order_count"],
+                "avg_over":    round(rec["avg_over"], 2),
+            }
+            for rec in cat_wt_qs[self._page(MAX_LIMIT)]
+        ]
+
+        return {
+            "total_runs":            total_runs,
+            "avg_delta_per_run":     round(avg_delta_per_run, 2),
+            "top_partner":           top_partner,
+            "avg_over_per_order":    round(avg_over_per_order, 2),
+            "over_per_partner":      over_per_partner,
+            "over_per_country":      over_per_country,
+            "trend_data":            trend_data,
+            "partners_list":         partners_list,
+            "top_routes":            top_routes,
+            "category_weight":       category_weight,
+            "category_weight_count": category_weight_count,
+            "filters": {
+                "from":    self.date_from.isoformat() if self.date_from else None,
+                "to":      self.date_to.isoformat() if self.date_to else None,
+                "partner": self.partner,
+                "route":   self.route,
+                "limit":   self.limit,
+                "offset":  self.offset,
+            },
+        }
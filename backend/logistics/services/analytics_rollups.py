@@ -0,0 +1,67 @@
+#backend/logistics/services/analytics_rollups.py
+from collections import defaultdict
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from logistics.models import InvoiceLine, RollupBuyerCountry, RollupCategoryWeight, RollupPartnerMonth, RollupRoute
+
+
+UNKNOWN_COUNTRY = "Unknown"
+
+
+def split_route(route: str) -> tuple[str, str]:
+    """(buyer, seller) country of a 'buyer_country-seller_country' route."""
+    if route and "-" in route:
+        buyer, seller = route.split("-", 1)
+        return buyer, seller
+    return route or "", ""
+
+
+class AnalyticsRollups:
+    """
+    Maintains the Rollup* tables behind AnalyticsView.
+
+    `rebuild(run)` replaces the rollups of one run by aggregating its
+    positive-delta InvoiceLine rows, so creating or replacing a run only
+    touches that run's lines. Migration 0004 carries its own copy of this
+    logic for the backfill, so changes here do not alter that migration.
+    """
+
+    def rebuild(self, run) -> None:
+        self.delete(run)
+
+        pos = InvoiceLine.objects.filter(run_id=run.pk, delta__gt=0)
+        totals = {"total_over": Sum("delta"), "over_count": Count("id")}
+
+        RollupPartnerMonth.objects.bulk_create([
+            RollupPartnerMonth(run_id=run.pk, partner=run.partner, month=rec["month"],
+                               total_over=rec["total_over"], over_count=rec["over_count"])
+            for rec in pos.annotate(month=TruncMonth("invoice_date")).values("month").annotate(**totals)
+        ])
+
+        routes = list(pos.values("route").annotate(**totals))
+        RollupRoute.objects.bulk_create([
+            RollupRoute(run_id=run.pk, route=rec["route"],
+                        total_over=rec["total_over"], over_count=rec["over_count"])
+            for rec in routes
+        ])
+
+        countries = defaultdict(lambda: [0, 0])
+        for rec in routes:
+            acc = countries[split_route(rec["route"])[0] or UNKNOWN_COUNTRY]
+            acc[0] += rec["total_over"]
+            acc[1] += rec["over_count"]
+        RollupBuyerCountry.objects.bulk_create([
+            RollupBuyerCountry(run_id=run.pk, buyer_country=country,
+                               total_over=total_over, over_count=over_count)
+            for country, (total_over, over_count) in countries.items()
+        ])
+
+        RollupCategoryWeight.objects.bulk_create([
+            RollupCategoryWeight(run_id=run.pk, category=rec["category_lvl_1_and_2"], weight=rec["weight"],
+                                 total_over=rec["total_over"], over_count=rec["over_count"])
+            for rec in pos.values("category_lvl_1_and_2", "weight").annotate(**totals)
+        ])
+
+    def delete(self, run) -> None:
+        for model in (RollupPartnerMonth, RollupRoute, RollupBuyerCountry, RollupCategoryWeight):
+            model.objects.filter(run_id=run.pk).delete()
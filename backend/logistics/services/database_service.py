@@ -4,50 +4,17 @@ import pandas as pd
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import URL
 from sqlalchemy.exc import OperationalError
+from typing import Iterator
 from django.conf import settings
 
+# rows per server-side cursor fetch when streaming query results
+STREAM_CHUNK_SIZE = 5000
 
-class DatabaseService:
-    def __init__(self):
-        self.engine = self._build_engine()
 
-    def _build_engine(self):
-        """
-        Use Django's DATABASES['external'] settings to configure the SQLAlchemy engine
-        """
-        db = settings.DATABASES["external"]
-
-        db_url = URL.create(
-            drivername="postgresql+psycopg2",
-            username=db["USER"],
-            password=db["PASSWORD"],
-            host=db["HOST"],
-            port=db["PORT"],
-            database=db["NAME"]
-        )
-        return create_engine(db_url, pool_pre_ping=True)
-
-    def execute_query_with_retries(self, query, max_retries=5, delay=15):
-        attempt = 0
-        while attempt < max_retries:
-            try:
-                with self.engine.connect() as connection:
-                    result = connection.execute(text(query))
-                    return pd.DataFrame(result.fetchall(), columns=result.keys())
-            except OperationalError as e:
-                print(f"⛔ Attempt {attempt + 1} failed: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(delay)
-                else:
-                    print("❌ Max retries reached. Query failed.")
-            attempt += 1
-        return pd.DataFrame()
-
-    def get_orders_dataframe(self, partner_value: str) -> pd.DataFrame:
-        """Query and return a DataFrame of recent orders related to a logistics partner."""
-        query = """
+ORDERS_SELECT = """
         SELECT 
             CAST(sales_order.state AS TEXT) AS status,
+            sales_order.modified AS modified,
             CAST(sales_order.id AS TEXT) AS order_id,
             DATE(sales_order.created AT TIME ZONE 'CET') AS order_creation_date,
             CAST(brenger_brengershipment.tracking_id AS TEXT) AS tracking_id,
@@ -89,17 +56,167 @@ class DatabaseService:
         LEFT JOIN category_level_and_brand ON category_level_and_brand.product_id = sales_order.product_id
         LEFT JOIN brenger_brengerappointment ON brenger_brengerappointment.order_id = sales_order.id
         LEFT JOIN brenger_brengershipment ON brenger_brengershipment.brenger_appointment_id = brenger_brengerappointment.id
+"""
+
+# result columns of ORDERS_SELECT, for results that come back without any
+ORDERS_COLUMNS = [
+    "status", "modified", "order_id", "order_creation_date", "tracking_id",
+    "product_name", "product_id", "weight", "external_courier_provider",
+    "cat_level_1_and_2", "cat_level_2_and_3", "number_of_items", "shipping_excl_vat",
+    "buyer_id", "buyer_post_code", "shipment_id", "buyer_country", "seller_country",
+    "height", "width", "depth", "seller_post_code",
+]
+
+
+class DatabaseService:
+    def __init__(self):
+        self.engine = self._build_engine()
+
+    def _build_engine(self):
+        """
+        Use Django's DATABASES['external'] settings to configure the SQLAlchemy engine
+        """
+        db = settings.DATABASES["external"]
+
+        db_url = URL.create(
+            drivername="postgresql+psycopg2",
+            username=db["USER"],
+            password=db["PASSWORD"],
+            host=db["HOST"],
+            port=db["PORT"],
+            database=db["NAME"]
+        )
+        return create_engine(db_url, pool_pre_ping=True)
+
+    def execute_query_with_retries(
+        self, query, params=None, max_retries=5, delay=15, stream=False, chunk_size=STREAM_CHUNK_SIZE
+    ):
+        """
+        Run `query` and return the result as a DataFrame, retrying on
+        connection errors.
+
+        With stream=True rows are read through a server-side cursor and
+        turned into DataFrame chunks of `chunk_size` rows, so the full list
+        of Row objects never sits in memory next to the DataFrame, and the
+        chunks are joined column by column (see `_concat_chunks`).
+        """
+        attempt = 0
+        while attempt < max_retries:
+            try:
+                if stream:
+                    return self._concat_chunks(self.iter_query_chunks(query, params, chunk_size))
+                with self.engine.connect() as connection:
+                    result = connection.execute(text(query), params or {})
+                    return pd.DataFrame(result.fetchall(), columns=result.keys())
+            except OperationalError as e:
+                print(f"⛔ Attempt {attempt + 1} failed: {e}")
+                if attempt < max_retries - 1:
+                    time.sleep(delay)
+                else:
+                    print("❌ Max retries reached. Query failed.")
+            attempt += 1
+        return pd.DataFrame()
+
+    def iter_query_chunks(self, query, params=None, chunk_size=STREAM_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+        """
+        Yield the result of `query` as DataFrames of at most `chunk_size` rows,
+        fetched through a named server-side cursor. Always yields at least one
+        (possibly empty) frame so callers keep the column names.
+        """
+        with self.engine.connect() as connection:
+            result = connection.execution_options(
+                stream_results=True, yield_per=chunk_size
+            ).execute(text(query), params or {})
+            columns = list(result.keys())
+            empty = True
+            for rows in result.partitions(chunk_size):
+                empty = False
+                yield pd.DataFrame.from_records(rows, columns=columns)
+            if empty:
+                yield pd.DataFrame(columns=columns)
+
+    @staticmethod
+    def _concat_chunks(chunks: Iterator[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Same result as pd.concat(list(chunks), ignore_index=True), without
+        holding every chunk next to the concatenated frame. Each chunk is
+        split into per-column copies as it arrives, and each column's pieces
+        are dropped as soon as that column is joined, so the peak stays near
+        the size of the result plus one chunk.
+        """
+        columns, pieces, rows = None, None, 0
+        for chunk in chunks:
+            if columns is None:
+                columns = list(chunk.columns)
+                pieces = [[] for _ in columns]
+            for i, column in enumerate(pieces):
+                # copy: a column of a 2-D block is a view that keeps the whole chunk alive
+                column.append(chunk.iloc[:, i].copy())
+            rows += len(chunk)
+            del chunk
+
+        df = pd.DataFrame(index=pd.RangeIndex(rows))
+        for i, name in enumerate(columns or []):
+            joined = pd.concat(pieces[i], ignore_index=True)
+            pieces[i] = None
+            df.insert(i, name, joined, allow_duplicates=True)
+            del joined
+        return df
+
+    def get_orders_dataframe(self, partner_value: str) -> pd.DataFrame:
+        """Query and return a DataFrame of recent orders related to a logistics partner."""
+        query = ORDERS_SELECT + """
+        WHERE sales_order.state NOT IN ('expired', 'canceled')
+        AND sales_order.created >= NOW() - INTERVAL '6 months'
+        AND whoppah_sale_services.product_id IS NULL
+        ORDER BY order_creation_date DESC;
+        """
+        return self._prepare_orders(self.execute_query_with_retries(query, stream=True))
+
+    def get_orders_for_keys(self, order_ids=None, tracking_ids=None) -> pd.DataFrame:
+        """
+        Same rows as `get_orders_dataframe`, restricted server-side to the
+        given order UUIDs and/or Brenger tracking ids of a parsed invoice.
+        """
+        keys = []
+        params = {}
+        if order_ids:
+            keys.append("sales_order.id = ANY(CAST(:order_ids AS uuid[]))")
+            params["order_ids"] = list(order_ids)
+        if tracking_ids:
+            keys.append("CAST(brenger_brengershipment.tracking_id AS TEXT) = ANY(:tracking_ids)")
+            params["tracking_ids"] = list(tracking_ids)
+        if not keys:
+            raise ValueError("get_orders_for_keys needs order_ids or tracking_ids")
+
+        query = ORDERS_SELECT + f"""
         WHERE sales_order.state NOT IN ('expired', 'canceled')
         AND sales_order.created >= NOW() - INTERVAL '6 months'
         AND whoppah_sale_services.product_id IS NULL
+        AND ({" OR ".join(keys)})
         ORDER BY order_creation_date DESC;
         """
+        return self._prepare_orders(self.execute_query_with_retries(query, params=params))
+
+    def get_orders_modified_since(self, since) -> pd.DataFrame:
+        """
+        Orders created or modified at/after `since`, whatever their state, so
+        a cached snapshot can also drop orders that were canceled meanwhile.
+        """
+        query = ORDERS_SELECT + """
+        WHERE sales_order.modified >= :since
+        AND whoppah_sale_services.product_id IS NULL;
+        """
+        df = self.execute_query_with_retries(query, params={"since": since}, stream=True)
+        return self._prepare_orders(df)
 
-        df = self.execute_query_with_retries(query)
-        if not df.empty:
-            df.rename(columns={"order_id": "Order ID"}, inplace=True)
-            df['order_creation_date'] = pd.to_datetime(df['order_creation_date'], errors='coerce')
-            df[['height', 'width', 'depth']] = df[['height', 'width', 'depth']].fillna(0)
-            df["weight"] = df["weight"].astype(float).apply(lambda x: format(x, '.2f'))
-            df["buyer_country-seller_country"] = df["buyer_country"].fillna("") + "-" + df["seller_country"].fillna("")
+    def _prepare_orders(self, df: pd.DataFrame) -> pd.DataFrame:
+        # also for empty results: calculators select these columns either way
+        if df.columns.empty:  # query failed after its retries
+            df = pd.DataFrame(columns=ORDERS_COLUMNS)
+        df.rename(columns={"order_id": "Order ID"}, inplace=True)
+        df['order_creation_date'] = pd.to_datetime(df['order_creation_date'], errors='coerce')
+        df[['height', 'width', 'depth']] = df[['height', 'width', 'depth']].fillna(0)
+        df["weight"] = df["weight"].astype(float).apply(lambda x: format(x, '.2f'))
+        df["buyer_country-seller_country"] = df["buyer_country"].fillna("") + "-" + df["seller_country"].fillna("")
         return df
@@ -1,23 +1,37 @@
 # backend/logistics/services/delta_checker.py
+import re
 import pandas as pd
 from typing import Optional,Tuple
 from django.conf import settings
 from django.db import transaction
-from logistics.parsers.registry import parser_registry
-from logistics.services.spreadsheet_exporter import SpreadsheetExporter
+from logistics.services.partner_registry import partner_registry
 from logistics.services.database_service import DatabaseService
-from logistics.delta.brenger import BrengerDeltaCalculator
-from logistics.delta.wuunder import WuunderDeltaCalculator
-from logistics.delta.libero import LiberoDeltaCalculator
-from logistics.delta.swdevries import SwdevriesDeltaCalculator
-from logistics.delta.magic_movers import MagicMoversDeltaCalculator
-from logistics.delta.tadde import TaddeDeltaCalculator
-from logistics.models import InvoiceRun, InvoiceLine
+from logistics.services.order_snapshot import OrderSnapshot
+from logistics.services.invoice_cache import ParsedInvoiceCache
+from logistics.services.line_writer import InvoiceLineWriter
+from logistics.services.analytics_rollups import AnalyticsRollups
+from logistics.services.stage_metrics import StageTimer
+from logistics.models import InvoiceRun
+
+UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE)
 
 
 class DeltaChecker:
-    def __init__(self, db_service=None, spreadsheet_exporter=None):
+    def __init__(self, db_service=None, spreadsheet_exporter=None, order_snapshot=None, invoice_cache=None, line_writer=None, rollups=None, progress=None, prefer_snapshot=False):
         self.db_service = db_service or DatabaseService()
+        self.order_snapshot = order_snapshot or OrderSnapshot(self.db_service)
+        self.invoice_cache = invoice_cache or ParsedInvoiceCache()
+        self.line_writer = line_writer or InvoiceLineWriter()
+        self.rollups = rollups or AnalyticsRollups()
+        # progress(event, **data) callback, e.g. TaskEvents.reporter(task_id)
+        self.progress = progress or (lambda event, **data: None)
+        # batch runs share one orders snapshot instead of per-invoice queries
+        self.prefer_snapshot = prefer_snapshot
+        # InvoiceRun written by the last evaluate() call (None if it failed)
+        self.last_run = None
+        # stage timings of the current evaluate() call, stored with its run
+        self.timer = StageTimer()
+        # SpreadsheetExporter (gspread, oauth2client) is slow to import: import it here when re-enabled
         # self.spreadsheet_exporter = spreadsheet_exporter or SpreadsheetExporter()
 
     def evaluate(
@@ -36,57 +50,94 @@ class DeltaChecker:
             - parsed_ok: True if any invoice rows were parsed
             - df_merged: the merged DataFrame (or None on failure)
         """
+        self.last_run = None
+        self.timer = StageTimer()
         try:
             partner = partner.strip().lower()
-            df_order = self.db_service.get_orders_dataframe(partner)
 
-            parser_cls = parser_registry.get(partner)
-            if not parser_cls:
+            spec = partner_registry.get(partner)
+            if spec is None:
                 raise ValueError(f"Unsupported partner: {partner}")
 
-            parser = parser_cls()
-
-            # Parse invoice bytes and select appropriate calculator
-            if partner == "libero":
+            parser = spec.parser_cls()
+            context = None
+            if spec.needs_pdf:
                 if pdf_bytes is None:
-                    raise ValueError("Libero requires both invoice & PDF bytes")
-                df_invoice = parser.parse(invoice_bytes, context={"pdf_bytes": pdf_bytes})
-                calculator = LiberoDeltaCalculator(df_invoice, df_order)
+                    raise ValueError(f"{partner} requires both invoice & PDF bytes")
+                context = {"pdf_bytes": pdf_bytes}
+            df_invoice = self._parse(partner, parser, invoice_bytes, context=context)
 
-            elif partner == "swdevries":
-                df_invoice = parser.parse(invoice_bytes)
-                calculator = SwdevriesDeltaCalculator(df_invoice, df_order)
+            with self.timer.span("fetch_orders") as span:
+                df_order = self._fetch_orders(partner, df_invoice)
+                span["rows"] = len(df_order)
+            self.progress("matched", orders=len(df_order))
+            calculator = spec.calculator_cls(df_invoice, df_order)
 
-            elif partner == "wuunder":
-                df_invoice = parser.parse(invoice_bytes)
-                calculator = WuunderDeltaCalculator(df_invoice, df_order)
+            return self._process(df_invoice, calculator.compute, partner, df_list, delta_threshold)
 
-            elif partner == "brenger":
-                df_invoice = parser.parse(invoice_bytes)
-                calculator = BrengerDeltaCalculator(df_invoice, df_order)
-                
-            elif partner == "tadde":
-                df_invoice = parser.parse(invoice_bytes)
-                calculator = TaddeDeltaCalculator(df_invoice, df_order)
+        except Exception as e:
+            print(f"❌ Error in DeltaChecker.evaluate: {e}")
+            return False, False, None
 
-            elif partner == "magic_movers":
+    def _parse(self, partner: str, parser, invoice_bytes: bytes, context: Optional[dict] = None) -> pd.DataFrame:
+        """
+        Parse the invoice, reusing the cached result for identical uploads.
+        """
+        pdf_bytes = context.get("pdf_bytes") if context else None
+        key = self.invoice_cache.make_key(partner, parser.version, invoice_bytes, pdf_bytes)
+
+        df_invoice = self.invoice_cache.get(key)
+        if df_invoice is not None:
+            print(f"♻️ Reusing parsed {partner} invoice from cache")
+            self.progress("parsed", rows=len(df_invoice), cached=True)
+            return df_invoice
+
+        # a cache hit is not timed: it would skew the parse percentiles
+        with self.timer.span("parse") as span:
+            if context:
+                df_invoice = parser.parse(invoice_bytes, context=context)
+            else:
                 df_invoice = parser.parse(invoice_bytes)
-                calculator = MagicMoversDeltaCalculator(df_invoice, df_order)
+            span["rows"] = len(df_invoice)
+        self.invoice_cache.set(key, df_invoice)
+        self.progress("parsed", rows=len(df_invoice), cached=False)
+        return df_invoice
 
-            else:
-                raise NotImplementedError(f"No calculator configured for partner '{partner}'")
+    def _fetch_orders(self, partner: str, df_invoice: pd.DataFrame) -> pd.DataFrame:
+        """
+        Orders matching the parsed invoice.
 
-            return self._process(df_invoice, calculator.compute, partner, df_list, delta_threshold)
+        A fresh shared snapshot is reused as-is; otherwise only the orders
+        referenced by the invoice are queried. Falls back to the full window
+        when the invoice has no usable keys. With prefer_snapshot the shared
+        snapshot is always used (refreshed once if stale).
+        """
+        if self.prefer_snapshot:
+            return self.order_snapshot.get()
 
-        except Exception as e:
-            print(f"❌ Error in DeltaChecker.evaluate: {e}")
-            return False, False, None
+        df_order = self.order_snapshot.get_if_fresh()
+        if df_order is not None:
+            return df_order
+
+        key_kind, key_column = partner_registry.get(partner).order_keys
+        keys = []
+        if key_column in df_invoice.columns:
+            keys = df_invoice[key_column].dropna().astype(str).str.strip().unique().tolist()
+        if key_kind == "order_ids":
+            keys = [k for k in keys if UUID_RE.fullmatch(k)]
+
+        if not keys:
+            return self.order_snapshot.get()
+        return self.db_service.get_orders_for_keys(**{key_kind: keys})
 
     def _process(self, df_invoice, compute_fn, partner, df_list, delta_threshold):
         # 1. Compute the delta
-        df_merged, raw_delta_sum, raw_parsed_flag = compute_fn()
+        with self.timer.span("price") as span:
+            df_merged, raw_delta_sum, raw_parsed_flag = compute_fn()
+            span["rows"] = len(df_merged) if df_merged is not None else 0
         if df_merged is None:
             return False, False, None
+        self.progress("priced", rows=len(df_merged), delta_sum=round(float(raw_delta_sum), 2))
 
         # 2. Normalize results
         delta_sum   = float(raw_delta_sum)
@@ -117,7 +168,8 @@ class DeltaChecker:
             invoice_number = df_merged["Invoice number"].iloc[0] or ""
 
         # 6. Create or update InvoiceRun and its lines
-        with transaction.atomic():
+        with self.timer.span("persist") as span, transaction.atomic():
+            span["rows"] = len(df_merged)
             run, created = InvoiceRun.objects.get_or_create(
                 partner        = partner,
                 invoice_number = invoice_number,
@@ -133,28 +185,22 @@ class DeltaChecker:
                 run.parsed_ok = parsed_flag
                 run.num_rows  = len(df_merged)
                 run.save()
-                InvoiceLine.objects.filter(run=run).delete()
-
-            # build and bulk‐create new InvoiceLine rows
-            key_actual = f"price_{partner}"
-            lines = []
-            for rec in df_merged.to_dict(orient="records"):
-                lines.append(InvoiceLine(
-                    run                   = run,
-                    order_creation_date   = rec["order_creation_date"],
-                    order_id              = rec["Order ID"],
-                    weight                = rec["weight"],
-                    route                 = rec["buyer_country-seller_country"],
-                    category_lvl_1_and_2  = rec["cat_level_1_and_2"],
-                    category_lvl_2_and_3  = rec["cat_level_2_and_3"],
-                    price_expected        = rec["price"],
-                    delta                 = rec["Delta"],
-                    delta_sum             = rec["Delta_sum"],
-                    invoice_date          = rec["Invoice date"],
-                    invoice_number        = invoice_number,
-                    **{ key_actual: rec.get(key_actual) }
-                ))
-            InvoiceLine.objects.bulk_create(lines)
+                self.line_writer.delete(run)
+
+            # write the new InvoiceLine rows straight from the DataFrame
+            self.line_writer.write(run, df_merged, partner, invoice_number)
+
+            # refresh this run's analytics rollups
+            self.rollups.rebuild(run)
+
+        try:
+            self.timer.save(run)
+            print(f"⏱️ {partner} run {run.pk}: {self.timer.summary()}")
+        except Exception as e:
+            print(f"⚠️ Could not store stage timings for run {run.pk}: {e}")
+
+        self.last_run = run
+        self.progress("persisted", run_id=run.pk, lines=len(df_merged))
 
         # 7.  Export to Google Sheets
         #try:
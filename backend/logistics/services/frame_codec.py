@@ -0,0 +1,37 @@
+#backend/logistics/services/frame_codec.py
+import pandas as pd
+import pyarrow as pa
+
+
+def dump_frame(df: pd.DataFrame) -> bytes:
+    """
+    Serialize a DataFrame for Redis/disk caches.
+
+    Arrow IPC keeps columns, dtypes and the index (through the pandas
+    metadata) and, unlike pickle, decoding it never runs code, so a blob
+    planted in the shared Redis cannot execute anything in a worker. LZ4
+    keeps the blob small without costing much CPU.
+
+    Raises ValueError for frames Arrow cannot represent, e.g. an object
+    column mixing numbers and strings.
+    """
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        sink = pa.BufferOutputStream()
+        options = pa.ipc.IpcWriteOptions(compression="lz4")
+        with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    except (pa.ArrowException, TypeError) as e:
+        raise ValueError(f"Cannot encode DataFrame: {e}") from e
+
+
+def load_frame(blob: bytes) -> pd.DataFrame:
+    """
+    Inverse of `dump_frame`. Raises ValueError for anything that is not an
+    Arrow stream, including pickled frames cached by older releases.
+    """
+    try:
+        return pa.ipc.open_stream(blob).read_all().to_pandas()
+    except pa.ArrowException as e:
+        raise ValueError(f"Not an encoded DataFrame: {e}") from e
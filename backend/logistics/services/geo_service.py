@@ -0,0 +1,376 @@
+#backend/logistics/services/geo_service.py
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+import requests
+from django.conf import settings
+from django.db import DatabaseError
+from logistics.models import DistanceCache, GeocodeCache
+
+Coords = tuple[float, float]
+Place = tuple[str, str]               # (country, postal code)
+Route = tuple[str, str, str, str]     # (origin country, origin postal code, dest country, dest postal code)
+
+
+class GeoQuotaExceeded(Exception):
+    """The provider refused the request because the API quota is used up."""
+
+
+class GoogleGeoProvider:
+    """
+    Google Geocoding + Distance Matrix over one pooled session, with a
+    timeout and retries on connection errors.
+    """
+
+    name = "google"
+    GEOCODE_URL  = "https://maps.googleapis.com/maps/api/geocode/json"
+    DISTANCE_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+    QUOTA_STATUSES = {"OVER_QUERY_LIMIT", "OVER_DAILY_LIMIT"}
+    # Distance Matrix accepts at most 25 destinations per request
+    MAX_DESTINATIONS = 25
+
+    def __init__(self, session=None, timeout=10, max_retries=3, delay=2):
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.delay = delay
+
+    def _get(self, url: str, params: dict) -> dict:
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                data = self.session.get(url, params=params, timeout=self.timeout).json()
+                break
+            except (requests.RequestException, ValueError) as e:
+                print(f"⚠️ Google Maps request failed (attempt {attempt}/{self.max_retries}): {e}")
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.delay * attempt)
+        if data.get("status") in self.QUOTA_STATUSES:
+            raise GeoQuotaExceeded(data["status"])
+        return data
+
+    def geocode(self, country: str, postal_code: str) -> Optional[Coords]:
+        data = self._get(self.GEOCODE_URL, {
+            "address": postal_code,
+            "components": f"country:{country}",
+            "key": os.getenv("GOOGLE_GEOCODE_API_KEY"),
+        })
+        if data["status"] == "OK":
+            loc = data["results"][0]["geometry"]["location"]
+            return loc["lat"], loc["lng"]
+        print("Error geocoding:", data["status"])
+        return None
+
+    def distances(self, origin: Coords, destinations: list[Coords]) -> list[Optional[float]]:
+        result = []
+        for start in range(0, len(destinations), self.MAX_DESTINATIONS):
+            batch = destinations[start:start + self.MAX_DESTINATIONS]
+            data = self._get(self.DISTANCE_URL, {
+                "origins":      f"{origin[0]},{origin[1]}",
+                "destinations": "|".join(f"{lat},{lng}" for lat, lng in batch),
+                "key":          os.getenv("GOOGLE_DISTANCE_API_KEY"),
+            })
+            elems = data.get("rows", [{}])[0].get("elements", [])
+            for i in range(len(batch)):
+                elem = elems[i] if i < len(elems) else {}
+                if elem.get("status") == "OK":
+                    result.append(elem["distance"]["value"] / 1000.0)
+                else:
+                    print("No valid route:", elem.get("status"))
+                    result.append(None)
+        return result
+
+
+class OfflineGeoProvider:
+    """
+    Static postcode-centroid table (longest matching postcode prefix, else
+    the country centroid) and haversine distance scaled by ROAD_FACTOR to
+    approximate road km. Used in tests and when the Google quota is hit.
+    """
+
+    name = "offline"
+    ROAD_FACTOR = 1.3
+    EARTH_RADIUS_KM = 6371.0
+
+    def __init__(self, path=None):
+        self.path = path
+        self._centroids = None
+
+    @property
+    def centroids(self) -> dict:
+        if self._centroids is None:
+            with open(self.path or settings.GEO_CENTROIDS_FILE, encoding="utf-8") as f:
+                self._centroids = json.load(f)
+        return self._centroids
+
+    def geocode(self, country: str, postal_code: str) -> Optional[Coords]:
+        table = self.centroids.get(country)
+        if not table:
+            return None
+        for length in range(len(postal_code), -1, -1):
+            coords = table.get(postal_code[:length])
+            if coords:
+                return coords[0], coords[1]
+        return None
+
+    def distances(self, origin: Coords, destinations: list[Coords]) -> list[Optional[float]]:
+        return [self.haversine_km(origin, dest) * self.ROAD_FACTOR for dest in destinations]
+
+    @classmethod
+    def haversine_km(cls, a: Coords, b: Coords) -> float:
+        lat1, lng1, lat2, lng2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+        h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+        return 2 * cls.EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+PROVIDERS = {
+    GoogleGeoProvider.name:  GoogleGeoProvider,
+    OfflineGeoProvider.name: OfflineGeoProvider,
+}
+
+
+def normalize_place(country, postal_code) -> Place:
+    country = str(country or "").strip().upper()
+    postal_code = "".join(str(postal_code or "").split()).upper()
+    if postal_code in ("NAN", "NONE"):
+        postal_code = ""
+    return country, postal_code
+
+
+class GeoService:
+    """
+    Geocoding and route distances with three layers:
+
+    1. an in-process LRU (GEO_LRU_SIZE entries),
+    2. the GeocodeCache / DistanceCache tables, keyed per provider,
+    3. the configured provider (GEO_PROVIDER).
+
+    When the provider fails or its quota is exhausted, lookups fall back to
+    the offline provider (GEO_FALLBACK_OFFLINE). Fallback results are not
+    cached, so exact values are fetched again once the API is available;
+    routes with a fallback-geocoded end are priced by the fallback too.
+    After a quota error the provider is skipped for GEO_BREAKER_SECONDS
+    instead of being retried for every remaining place.
+    """
+
+    def __init__(self, provider=None, fallback=None, lru_size=None, breaker_seconds=None):
+        self.provider = provider or PROVIDERS[settings.GEO_PROVIDER]()
+        if fallback is None and settings.GEO_FALLBACK_OFFLINE and self.provider.name != OfflineGeoProvider.name:
+            fallback = OfflineGeoProvider()
+        self.fallback = fallback
+        self.lru_size = lru_size or settings.GEO_LRU_SIZE
+        self.breaker_seconds = settings.GEO_BREAKER_SECONDS if breaker_seconds is None else breaker_seconds
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._provider_down_until = 0.0
+
+    # circuit breaker
+
+    def _provider_down(self) -> bool:
+        return self.fallback is not None and time.monotonic() < self._provider_down_until
+
+    def _provider_failed(self, e: Exception) -> None:
+        if isinstance(e, GeoQuotaExceeded):
+            self._provider_down_until = time.monotonic() + self.breaker_seconds
+            print(f"⚠️ {self.provider.name} quota exceeded, using {self.fallback.name} provider for {self.breaker_seconds}s")
+
+    # in-process LRU
+
+    def _lru_get(self, key):
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                return True, self._lru[key]
+        return False, None
+
+    def _lru_set(self, key, value) -> None:
+        with self._lock:
+            self._lru[key] = value
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+
+    # geocoding
+
+    def geocode(self, country, postal_code) -> Optional[Coords]:
+        place = normalize_place(country, postal_code)
+        return self.geocode_many([place])[place]
+
+    def geocode_many(self, places: Iterable[Place]) -> dict[Place, Optional[Coords]]:
+        return self._geocode_many(places)[0]
+
+    def _geocode_many(self, places: Iterable[Place]) -> tuple[dict[Place, Optional[Coords]], set[Place]]:
+        """(coords per place, places resolved by the fallback provider)."""
+        result, missing, approximate = {}, [], set()
+        for place in set(places):
+            hit, coords = self._lru_get(("geo",) + place)
+            if hit:
+                result[place] = coords
+            elif not place[0] or not place[1]:
+                result[place] = None
+            else:
+                missing.append(place)
+        if not missing:
+            return result, approximate
+
+        stored = self._load_geocodes(missing)
+        for place in missing:
+            if place in stored:
+                result[place] = stored[place]
+                self._lru_set(("geo",) + place, stored[place])
+                continue
+            if self._provider_down():
+                result[place] = self.fallback.geocode(*place)
+                approximate.add(place)
+                continue
+            try:
+                coords = self.provider.geocode(*place)
+            except (GeoQuotaExceeded, requests.RequestException, ValueError) as e:
+                if not self.fallback:
+                    raise
+                print(f"⚠️ Geocoding {place} via {self.fallback.name} provider: {e}")
+                self._provider_failed(e)
+                result[place] = self.fallback.geocode(*place)
+                approximate.add(place)
+                continue
+            result[place] = coords
+            self._lru_set(("geo",) + place, coords)
+            if coords:
+                self._store_geocode(place, coords)
+        return result, approximate
+
+    def _load_geocodes(self, places: list[Place]) -> dict[Place, Coords]:
+        try:
+            rows = GeocodeCache.objects.filter(
+                provider=self.provider.name,
+                country__in={country for country, _ in places},
+                postal_code__in={postal_code for _, postal_code in places},
+            ).values_list("country", "postal_code", "lat", "lng")
+            wanted = set(places)
+            return {(c, p): (lat, lng) for c, p, lat, lng in rows if (c, p) in wanted}
+        except DatabaseError as e:
+            print(f"⚠️ Geocode cache unavailable: {e}")
+            return {}
+
+    def _store_geocode(self, place: Place, coords: Coords) -> None:
+        try:
+            GeocodeCache.objects.update_or_create(
+                country=place[0], postal_code=place[1], provider=self.provider.name,
+                defaults={"lat": coords[0], "lng": coords[1]},
+            )
+        except DatabaseError as e:
+            print(f"⚠️ Could not cache geocode: {e}")
+
+    # distances
+
+    def route_distances(self, routes: Iterable[Route]) -> dict[Route, Optional[float]]:
+        """
+        Road distance in km for every (origin country, origin postal code,
+        dest country, dest postal code), None when a place cannot be
+        geocoded or no route exists. Each unique route is resolved once and
+        uncached routes are requested per origin in batches.
+        """
+        routes = {r: normalize_place(r[0], r[1]) + normalize_place(r[2], r[3]) for r in routes}
+        result, missing = {}, set()
+        for route, key in routes.items():
+            hit, km = self._lru_get(("dist",) + key)
+            if hit:
+                result[route] = km
+            else:
+                missing.add(key)
+
+        if missing:
+            resolved = self._load_distances(missing)
+            for key, km in resolved.items():
+                self._lru_set(("dist",) + key, km)
+            todo = missing - resolved.keys()
+            if todo:
+                resolved.update(self._fetch_distances(todo))
+            for route, key in routes.items():
+                if route not in result:
+                    result[route] = resolved.get(key)
+        return result
+
+    def _fetch_distances(self, keys: set) -> dict[Route, Optional[float]]:
+        coords, approximate = self._geocode_many([k[:2] for k in keys] + [k[2:] for k in keys])
+        by_origin = {}
+        for key in keys:
+            by_origin.setdefault(key[:2], []).append(key)
+
+        resolved, fresh = {}, []
+        for origin, group in by_origin.items():
+            routable = [k for k in group if coords.get(origin) and coords.get(k[2:])]
+            for key in group:
+                resolved[key] = None
+            # routes with a fallback-geocoded end (never sent to the provider),
+            # or all of them while it is down, are priced by the fallback
+            if self._provider_down():
+                approx, routable = routable, []
+            else:
+                approx = [k for k in routable if origin in approximate or k[2:] in approximate]
+                routable = [k for k in routable if origin not in approximate and k[2:] not in approximate]
+            if approx:
+                dests = [coords[k[2:]] for k in approx]
+                resolved.update(zip(approx, self.fallback.distances(coords[origin], dests)))
+            if not routable:
+                continue
+            dests = [coords[k[2:]] for k in routable]
+            try:
+                kms = self.provider.distances(coords[origin], dests)
+            except (GeoQuotaExceeded, requests.RequestException, ValueError) as e:
+                if not self.fallback:
+                    raise
+                print(f"⚠️ Distances from {origin} via {self.fallback.name} provider: {e}")
+                self._provider_failed(e)
+                resolved.update(zip(routable, self.fallback.distances(coords[origin], dests)))
+                continue
+            for key, km in zip(routable, kms):
+                resolved[key] = km
+                self._lru_set(("dist",) + key, km)
+                if km is not None:
+                    fresh.append((key, km))
+
+        if fresh:
+            self._store_distances(fresh)
+        return resolved
+
+    def _load_distances(self, keys: set) -> dict[Route, float]:
+        try:
+            rows = DistanceCache.objects.filter(
+                provider=self.provider.name,
+                origin_country__in={k[0] for k in keys},
+                origin_postal_code__in={k[1] for k in keys},
+                dest_country__in={k[2] for k in keys},
+                dest_postal_code__in={k[3] for k in keys},
+            ).values_list("origin_country", "origin_postal_code", "dest_country", "dest_postal_code", "distance_km")
+            return {tuple(row[:4]): row[4] for row in rows if tuple(row[:4]) in keys}
+        except DatabaseError as e:
+            print(f"⚠️ Distance cache unavailable: {e}")
+            return {}
+
+    def _store_distances(self, entries: list) -> None:
+        try:
+            DistanceCache.objects.bulk_create(
+                [
+                    DistanceCache(
+                        origin_country=key[0], origin_postal_code=key[1],
+                        dest_country=key[2], dest_postal_code=key[3],
+                        distance_km=km, provider=self.provider.name,
+                    )
+                    for key, km in entries
+                ],
+                ignore_conflicts=True,
+            )
+        except DatabaseError as e:
+            print(f"⚠️ Could not cache distances: {e}")
+
+
+geo_service = GeoService()
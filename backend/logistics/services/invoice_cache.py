@@ -0,0 +1,74 @@
+#backend/logistics/services/invoice_cache.py
+import hashlib
+import time
+from typing import Optional
+import redis
+import pandas as pd
+from django.conf import settings
+from logistics.services.frame_codec import dump_frame, load_frame
+
+redis_client = redis.from_url(settings.REDIS_URL)
+
+
+class ParsedInvoiceCache:
+    """
+    Content-addressed cache of parsed invoice DataFrames.
+
+    Entries are keyed by (partner, parser version, SHA-256 of the uploaded
+    bytes), so re-uploading an identical invoice skips PDF/XLSX parsing.
+    A sorted set of last-access times gives LRU eviction once more than
+    PARSED_INVOICE_CACHE_MAX_ENTRIES invoices are stored. Cache errors are
+    logged and never fail a run.
+    """
+
+    PREFIX  = "parsed_invoice"
+    LRU_KEY = "parsed_invoice:lru"
+
+    def __init__(self, client=None, max_entries=None, ttl=None):
+        self.client = client or redis_client
+        self.max_entries = max_entries or settings.PARSED_INVOICE_CACHE_MAX_ENTRIES
+        self.ttl = ttl or settings.PARSED_INVOICE_CACHE_TTL
+
+    @classmethod
+    def make_key(cls, partner: str, parser_version: str, invoice_bytes: bytes, pdf_bytes: Optional[bytes] = None) -> str:
+        digest = hashlib.sha256()
+        for blob in (invoice_bytes or b"", pdf_bytes or b""):
+            digest.update(len(blob).to_bytes(8, "big"))
+            digest.update(blob)
+        return f"{cls.PREFIX}:{partner}:v{parser_version}:{digest.hexdigest()}"
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        try:
+            blob = self.client.get(key)
+            if blob is None:
+                self.client.zrem(self.LRU_KEY, key)
+                return None
+            self.client.zadd(self.LRU_KEY, {key: time.time()})
+            return load_frame(blob)
+        except redis.RedisError as e:
+            print(f"⚠️ Parsed invoice cache unavailable: {e}")
+            return None
+        except ValueError as e:
+            # written by an older release or not ours: parse again and overwrite
+            print(f"⚠️ Ignoring unreadable parsed invoice cache entry {key}: {e}")
+            return None
+
+    def set(self, key: str, df: pd.DataFrame) -> None:
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(key, dump_frame(df), ex=self.ttl)
+            pipe.zadd(self.LRU_KEY, {key: time.time()})
+            pipe.zcard(self.LRU_KEY)
+            size = pipe.execute()[-1]
+            if size > self.max_entries:
+                self._evict(size - self.max_entries)
+        except (redis.RedisError, ValueError) as e:
+            print(f"⚠️ Could not cache parsed invoice: {e}")
+
+    def _evict(self, count: int) -> None:
+        oldest = self.client.zrange(self.LRU_KEY, 0, count - 1)
+        if oldest:
+            pipe = self.client.pipeline()
+            pipe.delete(*oldest)
+            pipe.zrem(self.LRU_KEY, *oldest)
+            pipe.execute()
@@ -0,0 +1,115 @@
+#backend/logistics/services/line_writer.py
+import io
+import pandas as pd
+from django.db import connections, router
+from logistics.models import InvoiceLine
+from logistics.services.partner_registry import partner_registry
+
+# DataFrame column -> InvoiceLine field; the partner's price is added per run
+# (see PartnerSpec.price_column)
+LINE_COLUMNS = {
+    "order_creation_date":          "order_creation_date",
+    "Order ID":                     "order_id",
+    "weight":                       "weight",
+    "buyer_country-seller_country": "route",
+    "cat_level_1_and_2":            "category_lvl_1_and_2",
+    "cat_level_2_and_3":            "category_lvl_2_and_3",
+    "price":                        "price_expected",
+    "Delta":                        "delta",
+    "Delta_sum":                    "delta_sum",
+    "Invoice date":                 "invoice_date",
+}
+COPY_NULL = r"\N"
+
+
+class InvoiceLineWriter:
+    """
+    Writes the lines of an InvoiceRun straight from the delta DataFrame,
+    without building InvoiceLine instances.
+
+    Values are converted column-wise, then loaded with COPY ... FROM STDIN
+    on PostgreSQL, or with batched executemany on other backends (SQLite in
+    tests). Replaced runs are cleared with one DELETE statement. Must be
+    called inside the caller's transaction.
+    """
+
+    def __init__(self, using=None, batch_size=2000):
+        self.using = using or router.db_for_write(InvoiceLine)
+        self.batch_size = batch_size
+
+    def delete(self, run) -> None:
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {InvoiceLine._meta.db_table} WHERE run_id = %s", [run.pk])
+
+    def write(self, run, df: pd.DataFrame, partner: str, invoice_number: str) -> int:
+        if df.empty:
+            return 0
+        frame = self._frame(run, df, partner, invoice_number)
+        connection = connections[self.using]
+        if connection.vendor == "postgresql":
+            self._copy(connection, frame)
+        else:
+            self._executemany(connection, frame)
+        return len(frame)
+
+    def _frame(self, run, df: pd.DataFrame, partner: str, invoice_number: str) -> pd.DataFrame:
+        price_column, price_field = partner_registry.price_columns(partner)
+        columns = dict(LINE_COLUMNS)
+        if price_column in df.columns:
+            columns[price_column] = price_field
+
+        frame = df[list(columns)].rename(columns=columns)
+        frame.insert(0, "run_id", run.pk)
+        frame["invoice_number"] = invoice_number
+
+        # buyer/seller country columns, split from "buyer-seller" routes
+        route = frame["route"].fillna("").astype(str)
+        parts = route.str.split("-", n=1, expand=True)
+        frame["buyer_country"] = parts[0].fillna("")
+        frame["seller_country"] = parts[1].fillna("") if 1 in parts.columns else ""
+
+        for field in frame.columns:
+            if field == "run_id":
+                continue
+            internal = InvoiceLine._meta.get_field(field).get_internal_type()
+            if internal == "DateTimeField":
+                values = pd.to_datetime(frame[field], errors="coerce")
+                if values.dt.tz is not None:
+                    values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+                frame[field] = values.dt.strftime("%Y-%m-%d %H:%M:%S")
+            elif internal == "DateField":
+                frame[field] = pd.to_datetime(frame[field], errors="coerce").dt.strftime("%Y-%m-%d")
+            elif internal == "DecimalField":
+                frame[field] = pd.to_numeric(frame[field], errors="coerce").round(
+                    InvoiceLine._meta.get_field(field).decimal_places
+                )
+            elif internal == "CharField":
+                values = frame[field]
+                frame[field] = values.where(values.isna(), values.astype(str))
+        return frame
+
+    def _copy(self, connection, frame: pd.DataFrame) -> None:
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False, na_rep=COPY_NULL)
+        sql = (
+            f"COPY {InvoiceLine._meta.db_table} ({', '.join(frame.columns)}) "
+            f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+        )
+        with connection.cursor() as cursor:
+            if hasattr(cursor.cursor, "copy_expert"):  # psycopg2
+                buffer.seek(0)
+                cursor.cursor.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with cursor.cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+    def _executemany(self, connection, frame: pd.DataFrame) -> None:
+        sql = (
+            f"INSERT INTO {InvoiceLine._meta.db_table} ({', '.join(frame.columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(frame.columns))})"
+        )
+        rows = frame.astype(object).where(frame.notna(), None)
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows.iloc[start:start + self.batch_size]
+                cursor.executemany(sql, list(batch.itertuples(index=False, name=None)))
@@ -0,0 +1,165 @@
+#backend/logistics/services/order_snapshot.py
+import json
+import time
+import uuid
+import redis
+import pandas as pd
+from django.conf import settings
+from logistics.services.frame_codec import dump_frame, load_frame
+
+redis_client = redis.from_url(settings.REDIS_URL)
+
+
+class OrderSnapshot:
+    """
+    Shared snapshot of the six-month orders window from the external DB.
+
+    The snapshot lives in Redis so every web/worker process reuses the same
+    data instead of re-running the orders query per evaluation. It is
+    refreshed incrementally (only orders modified since the last watermark)
+    every ORDERS_SNAPSHOT_REFRESH_SECONDS and rebuilt from scratch every
+    ORDERS_SNAPSHOT_REBUILD_SECONDS, which also picks up changes in joined
+    tables that do not touch sales_order.modified. A Redis lock makes
+    concurrent evaluations wait for one refresh rather than each querying
+    Postgres.
+    """
+
+    WINDOW     = "6months"
+    FRAME_KEY  = f"orders_snapshot:{WINDOW}:frame"
+    META_KEY   = f"orders_snapshot:{WINDOW}:meta"
+    LOCK_KEY   = f"orders_snapshot:{WINDOW}:lock"
+    DROP_STATES = ("expired", "canceled")
+
+    # last snapshot decoded in this process: (version, DataFrame)
+    _local = (None, None)
+
+    def __init__(self, db_service, client=None, refresh_seconds=None, rebuild_seconds=None):
+        self.db_service = db_service
+        self.client = client or redis_client
+        self.refresh_seconds = (
+            settings.ORDERS_SNAPSHOT_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        )
+        self.rebuild_seconds = (
+            settings.ORDERS_SNAPSHOT_REBUILD_SECONDS if rebuild_seconds is None else rebuild_seconds
+        )
+
+    def get(self) -> pd.DataFrame:
+        """Return the current orders window, refreshing it if it is stale."""
+        meta = self._read_meta()
+        df = self._load(meta) if self._is_fresh(meta) else None
+        if df is not None:
+            return df.copy()
+
+        try:
+            with self.client.lock(self.LOCK_KEY, timeout=600, blocking_timeout=300):
+                # another process may have refreshed while we waited
+                meta = self._read_meta()
+                df = self._load(meta) if self._is_fresh(meta) else None
+                if df is None:
+                    df = self._refresh(meta)
+        except redis.exceptions.LockError:
+            print("⚠️ Orders snapshot lock timed out, using stale data")
+            df = self._load(meta)
+            if df is None:
+                df = self.db_service.get_orders_dataframe("")
+        return df.copy()
+
+    def get_if_fresh(self):
+        """Return the snapshot if it is fresh, without ever hitting Postgres."""
+        meta = self._read_meta()
+        df = self._load(meta) if self._is_fresh(meta) else None
+        return None if df is None else df.copy()
+
+    def invalidate(self):
+        self.client.delete(self.META_KEY, self.FRAME_KEY)
+
+    def _is_fresh(self, meta) -> bool:
+        return bool(meta) and time.time() - meta["refreshed_at"] < self.refresh_seconds
+
+    def _read_meta(self):
+        raw = self.client.get(self.META_KEY)
+        return json.loads(raw) if raw else None
+
+    def _load(self, meta):
+        if not meta:
+            return None
+        version, df = OrderSnapshot._local
+        if version == meta["version"]:
+            return df
+        blob = self.client.get(self.FRAME_KEY)
+        if blob is None:
+            return None
+        try:
+            df = load_frame(blob)
+        except ValueError as e:
+            # written by an older release or not ours: rebuild it
+            print(f"⚠️ Ignoring unreadable orders snapshot: {e}")
+            return None
+        OrderSnapshot._local = (meta["version"], df)
+        return df
+
+    def _refresh(self, meta) -> pd.DataFrame:
+        now = time.time()
+        can_increment = (
+            meta
+            and meta.get("watermark")
+            and now - meta["built_at"] < self.rebuild_seconds
+        )
+        df = self._load(meta) if can_increment else None
+
+        if df is None:
+            df = self.db_service.get_orders_dataframe("")
+            if df.empty:
+                # query failed or returned nothing: keep whatever we had
+                return df
+            built_at  = now
+            watermark = self._max_modified(df, None)
+        else:
+            changed   = self.db_service.get_orders_modified_since(meta["watermark"])
+            df        = self._apply_changes(df, changed)
+            built_at  = meta["built_at"]
+            watermark = self._max_modified(changed, meta["watermark"])
+
+        self._store(df, {
+            "version":      uuid.uuid4().hex,
+            "built_at":     built_at,
+            "refreshed_at": now,
+            "watermark":    watermark,
+            "rows":         len(df),
+        })
+        return df
+
+    def _apply_changes(self, df: pd.DataFrame, changed: pd.DataFrame) -> pd.DataFrame:
+        if changed.empty:
+            return df
+        cutoff = pd.Timestamp.now().normalize() - pd.DateOffset(months=6)
+
+        # replace every row of a changed order, dropping canceled/expired ones
+        df = df[~df["Order ID"].isin(changed["Order ID"])]
+        keep = changed[
+            ~changed["status"].isin(self.DROP_STATES)
+            & (changed["order_creation_date"] >= cutoff)
+        ]
+        df = pd.concat([keep, df], ignore_index=True)
+        df = df[df["order_creation_date"] >= cutoff]
+        return (
+            df.sort_values("order_creation_date", ascending=False, kind="stable")
+              .reset_index(drop=True)
+        )
+
+    @staticmethod
+    def _max_modified(df: pd.DataFrame, default):
+        if df.empty or "modified" not in df.columns:
+            return default
+        latest = pd.to_datetime(df["modified"], errors="coerce").max()
+        if pd.isna(latest):
+            return default
+        return max(latest.isoformat(), default) if default else latest.isoformat()
+
+    def _store(self, df: pd.DataFrame, meta: dict):
+        ttl = self.rebuild_seconds * 2
+        pipe = self.client.pipeline()
+        pipe.set(self.FRAME_KEY, dump_frame(df), ex=ttl)
+        pipe.set(self.META_KEY, json.dumps(meta), ex=ttl)
+        pipe.execute()
+        OrderSnapshot._local = (meta["version"], df)
@@ -0,0 +1,119 @@
+#backend/logistics/services/partner_registry.py
+from typing import Optional
+from django.utils.module_loading import import_string
+
+
+class PartnerSpec:
+    """
+    How to evaluate one partner's invoices: its parser and delta calculator
+    (dotted paths, imported on first use), whether the parser needs the
+    invoice PDF next to the main file, how invoice rows are matched to
+    orders (get_orders_for_keys argument, invoice column holding the key)
+    and which calculator column holds the invoiced price (stored in the
+    InvoiceLine field price_<name>).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        parser: str,
+        calculator: str,
+        needs_pdf: bool = False,
+        order_keys: tuple = ("order_ids", "Order ID"),
+        price_column: Optional[str] = None,
+    ):
+        self.name = name
+        self.parser = parser
+        self.calculator = calculator
+        self.needs_pdf = needs_pdf
+        self.order_keys = order_keys
+        self.price_column = price_column or f"price_{name}"
+        self.price_field = f"price_{name}"
+        self._resolved = {}
+
+    def _resolve(self, path: str):
+        if path not in self._resolved:
+            self._resolved[path] = import_string(path)
+        return self._resolved[path]
+
+    @property
+    def parser_cls(self):
+        return self._resolve(self.parser)
+
+    @property
+    def calculator_cls(self):
+        return self._resolve(self.calculator)
+
+    def __repr__(self):
+        return f"PartnerSpec({self.name!r})"
+
+
+class PartnerRegistry:
+    """
+    Declarative registry of the supported partners.
+
+    Only dotted paths are held here, so importing the registry (or anything
+    that imports it: views, tasks, DeltaChecker) does not import a parser,
+    a calculator or pdfplumber. Each is imported the first time a partner
+    is evaluated in the process.
+    """
+
+    def __init__(self, specs):
+        self._specs = {spec.name: spec for spec in specs}
+
+    def get(self, partner: str) -> Optional[PartnerSpec]:
+        return self._specs.get(partner)
+
+    def __contains__(self, partner: str) -> bool:
+        return partner in self._specs
+
+    def __iter__(self):
+        return iter(self._specs.values())
+
+    def names(self) -> list[str]:
+        return list(self._specs)
+
+    def price_columns(self, partner: str) -> tuple[str, str]:
+        """(calculator column, InvoiceLine field) of the partner's invoiced price."""
+        spec = self.get(partner)
+        if spec is None:
+            return f"price_{partner}", f"price_{partner}"
+        return spec.price_column, spec.price_field
+
+
+partner_registry = PartnerRegistry([
+    PartnerSpec(
+        "brenger",
+        parser="logistics.parsers.brenger.BrengerParser",
+        calculator="logistics.delta.brenger.BrengerDeltaCalculator",
+        order_keys=("tracking_ids", "id"),
+    ),
+    PartnerSpec(
+        "wuunder",
+        parser="logistics.parsers.wuunder.WuunderParser",
+        calculator="logistics.delta.wuunder.WuunderDeltaCalculator",
+        order_keys=("order_ids", "order_id"),
+    ),
+    PartnerSpec(
+        "libero",
+        parser="logistics.parsers.libero.LiberoParser",
+        calculator="logistics.delta.libero.LiberoDeltaCalculator",
+        needs_pdf=True,
+        price_column="price_libero_logistics",
+    ),
+    PartnerSpec(
+        "swdevries",
+        parser="logistics.parsers.swdevries.SwdevriesParser",
+        calculator="logistics.delta.swdevries.SwdevriesDeltaCalculator",
+    ),
+    PartnerSpec(
+        "tadde",
+        parser="logistics.parsers.tadde.TaddeParser",
+        calculator="logistics.delta.tadde.TaddeDeltaCalculator",
+    ),
+    PartnerSpec(
+        "magic_movers",
+        parser="logistics.parsers.magic_movers.MagicMoversParser",
+        calculator="logistics.delta.magic_movers.MagicMoversDeltaCalculator",
+    ),
+])
@@ -0,0 +1,82 @@
+#backend/logistics/services/pricing_registry.py
+import json
+import os
+import threading
+from typing import TYPE_CHECKING
+from django.conf import settings
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from logistics.delta.price_table import PriceTable
+    from logistics.delta.postal_zones import PostalZones
+
+
+class PricingRegistry:
+    """
+    Process-wide cache of the pricing files in PRICING_DATA_PATH.
+
+    Each file is parsed once per worker process and kept in memory in the
+    requested form (raw JSON, DataFrame, indexed PriceTable or PostalZones).
+    An entry is reloaded only when the file's mtime or size changes, so
+    editing a price list on disk is picked up without restarting the workers.
+
+    Returned objects are shared between callers and must be treated as
+    read-only. pandas is imported on the first frame / table request, so
+    processes that never price (Slack, analytics) do not load it.
+    """
+
+    def __init__(self, base_path=None):
+        self.base_path = base_path
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, filename: str) -> str:
+        base_path = self.base_path or settings.PRICING_DATA_PATH
+        return os.path.join(base_path, filename)
+
+    def _get(self, filename: str, kind: str, loader):
+        path = self._resolve(filename)
+        stat = os.stat(path)  # raises FileNotFoundError for unknown partners
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        key = (path, kind)
+        entry = self._entries.get(key)
+        if entry and entry[0] == signature:
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == signature:
+                return entry[1]
+            value = loader(path)
+            self._entries[key] = (signature, value)
+            return value
+
+    def get_json(self, filename: str) -> dict:
+        """Decoded JSON content of a pricing file."""
+        def load(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return self._get(filename, "json", load)
+
+    def get_frame(self, filename: str) -> "pd.DataFrame":
+        """Pricing file as a DataFrame, as returned by `pd.read_json`."""
+        import pandas as pd
+        return self._get(filename, "frame", pd.read_json)
+
+    def get_table(self, filename: str) -> "PriceTable":
+        """Pricing file as a PriceTable indexed by (CMS category, Weightclass)."""
+        from logistics.delta.price_table import PriceTable
+        return self._get(filename, "table", PriceTable.from_json)
+
+    def get_zones(self, filename: str) -> "PostalZones":
+        """Postal zone definitions, searchable per postcode column."""
+        from logistics.delta.postal_zones import PostalZones
+        return self._get(filename, "zones", PostalZones.from_json)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+pricing_registry = PricingRegistry()
@@ -0,0 +1,82 @@
+#backend/logistics/services/run_lines.py
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterator
+from logistics.models import InvoiceLine
+from logistics.services.partner_registry import partner_registry
+
+
+def _jsonable(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class RunLines:
+    """
+    Reads the persisted lines of one InvoiceRun back as delta records, with
+    the same keys the delta calculators produce ("Order ID", "Delta", ...).
+
+    Rows come straight from InvoiceLine in insertion order, either one page
+    at a time or as a chunked iterator for NDJSON / CSV downloads, so a
+    large result never has to sit in memory or in the Celery backend.
+    """
+
+    def __init__(self, run, chunk_size=2000):
+        # line_writer imports pandas; keep it out of the web process's imports
+        from logistics.services.line_writer import LINE_COLUMNS
+
+        self.run = run
+        self.chunk_size = chunk_size
+        price_column, price_field = partner_registry.price_columns(run.partner)
+        # (InvoiceLine field, record key)
+        self.fields = [(field, column) for column, field in LINE_COLUMNS.items()]
+        self.fields.append((price_field, price_column))
+        self.fields.append(("invoice_number", "Invoice number"))
+
+    @property
+    def columns(self) -> list[str]:
+        return [column for _, column in self.fields] + ["partner"]
+
+    def queryset(self):
+        return (
+            InvoiceLine.objects.filter(run=self.run)
+                               .order_by("id")
+                               .values_list(*(field for field, _ in self.fields))
+        )
+
+    def count(self) -> int:
+        return InvoiceLine.objects.filter(run=self.run).count()
+
+    def _record(self, row) -> dict:
+        record = {column: _jsonable(value) for (_, column), value in zip(self.fields, row)}
+        record["partner"] = self.run.partner
+        return record
+
+    def page(self, offset: int, limit: int) -> list[dict]:
+        return [self._record(row) for row in self.queryset()[offset:offset + limit]]
+
+    def iter_records(self) -> Iterator[dict]:
+        for row in self.queryset().iterator(chunk_size=self.chunk_size):
+            yield self._record(row)
+
+    def iter_ndjson(self) -> Iterator[str]:
+        for record in self.iter_records():
+            yield json.dumps(record) + "\n"
+
+    def iter_csv(self) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.columns)
+        writer.writeheader()
+        for i, record in enumerate(self.iter_records(), start=1):
+            writer.writerow(record)
+            if i % self.chunk_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
@@ -1,11 +1,33 @@
 #backend/logistics/services/slack_service.py
 import os
 import re
+import threading
 import requests
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
+from slack_sdk.http_retry.builtin_handlers import RateLimitErrorRetryHandler
 from django.conf import settings
 
+PAGE_SIZE = 200
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_web_client(token: str) -> WebClient:
+    """
+    One WebClient per token and process, shared by every SlackService.
+    WebClient keeps no per-call state, so views, tasks and threads can use
+    it concurrently; rate-limited calls wait for Retry-After and retry.
+    """
+    with _clients_lock:
+        client = _clients.get(token)
+        if client is None:
+            client = WebClient(token=token)
+            client.retry_handlers.append(RateLimitErrorRetryHandler(max_retry_count=2))
+            _clients[token] = client
+        return client
+
 
 class SlackService:
     def __init__(self, bot_token=None, channel_id=None):
@@ -15,9 +37,8 @@ class SlackService:
         self.channel = channel_id or settings.SLACK_CHANNEL_ID
         if not self.channel:
             raise RuntimeError("Missing SLACK_CHANNEL_ID in settings.")
-        self.client = WebClient(token=self.token)
+        self.client = get_web_client(self.token)
         self.save_path = os.path.join(settings.BASE_DIR, "backend", "logistics", "slack")
-        os.makedirs(self.save_path, exist_ok=True)
 
     
     def get_latest_messages(self, limit=10):
@@ -37,6 +58,56 @@ class SlackService:
                     print("Failed to list private channels:", list_err.response["error"])
             return []
 
+    def get_messages_since(self, oldest=None, limit=PAGE_SIZE):
+        """
+        Channel messages newer than `oldest` (a message ts), following the
+        cursor, or the latest ones when oldest is None. At most `limit`,
+        newest first. Raises SlackApiError.
+        """
+        messages, cursor = [], None
+        while len(messages) < limit:
+            resp = self.client.conversations_history(
+                channel=self.channel,
+                oldest=oldest,
+                cursor=cursor,
+                limit=min(PAGE_SIZE, limit - len(messages)),
+                include_all_metadata=True,
+                include_reply_count=True,
+            )
+            messages.extend(resp.get("messages", []))
+            cursor = resp.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                break
+        return messages[:limit]
+
+    def get_message(self, ts):
+        """The channel message with this ts, or None. Raises SlackApiError."""
+        resp = self.client.conversations_history(
+            channel=self.channel, latest=ts, inclusive=True, limit=1, include_reply_count=True,
+        )
+        messages = resp.get("messages", [])
+        return messages[0] if messages and messages[0].get("ts") == ts else None
+
+    def get_thread_since(self, thread_ts, oldest=None):
+        """
+        Messages of the thread newer than `oldest`, following the cursor,
+        or the whole thread when oldest is None. Chronological; Slack
+        returns the parent too when it is in range. Raises SlackApiError.
+        """
+        messages, cursor = [], None
+        while True:
+            resp = self.client.conversations_replies(
+                channel=self.channel,
+                ts=thread_ts,
+                oldest=oldest,
+                cursor=cursor,
+                limit=PAGE_SIZE,
+            )
+            messages.extend(resp.get("messages", []))
+            cursor = resp.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                return messages
+
     def download_file(self, file_id):
         try:
             file_info = self.client.files_info(file=file_id)
@@ -45,6 +116,7 @@ class SlackService:
             headers = {"Authorization": f"Bearer {self.token}"}
 
             response = requests.get(file_url, headers=headers)
+            os.makedirs(self.save_path, exist_ok=True)
             full_path = os.path.join(self.save_path, file_name)
 
             if response.status_code == 200:
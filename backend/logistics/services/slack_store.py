@@ -0,0 +1,210 @@
+#backend/logistics/services/slack_store.py
+import json
+import time
+import redis
+from django.conf import settings
+from slack_sdk.errors import SlackApiError
+from logistics.services.slack_service import SlackService
+
+redis_client = redis.from_url(settings.REDIS_URL)
+
+MESSAGE_FIELDS = ("ts", "thread_ts", "subtype", "user", "user_profile", "text", "reply_count", "latest_reply", "reactions")
+FILE_FIELDS = ("id", "name", "mimetype", "url_private")
+
+
+def _slim(message: dict) -> dict:
+    """Only the fields the Slack views use; file objects carry dozens of thumbnail URLs."""
+    slim = {key: message[key] for key in MESSAGE_FIELDS if key in message}
+    if message.get("files"):
+        slim["files"] = [{key: f.get(key) for key in FILE_FIELDS} for f in message["files"]]
+    return slim
+
+
+def _newest(timestamps):
+    timestamps = [ts for ts in timestamps if ts]
+    return max(timestamps, key=float) if timestamps else None
+
+
+class SlackStore:
+    """
+    Local copy of the Slack channel, so SlackMessagesView and SlackThreadView
+    read Redis instead of calling Slack on every page render.
+
+    The channel is synced at most every SLACK_SYNC_SECONDS with
+    conversations_history(oldest=<newest ts stored>), which only returns new
+    messages, and re-read in full (the latest SLACK_STORE_MAX_MESSAGES,
+    replacing the store) every SLACK_RESYNC_SECONDS to pick up edits,
+    deletions, reactions and reply counts of older messages. A Redis lock
+    lets one process sync while the others keep serving stored messages.
+
+    Threads are stored when first opened and re-read after
+    SLACK_SYNC_SECONDS, or as soon as the stored parent shows a newer
+    latest_reply, with conversations_replies(oldest=<thread's latest_reply>)
+    so only new replies come back.
+    """
+
+    THREAD_TTL = 7 * 24 * 3600
+
+    def __init__(self, channel_id=None, client=None, slack=None, sync_seconds=None, resync_seconds=None, max_messages=None):
+        self.channel = channel_id or settings.SLACK_CHANNEL_ID
+        self.client = client or redis_client
+        self._slack = slack
+        self.sync_seconds = settings.SLACK_SYNC_SECONDS if sync_seconds is None else sync_seconds
+        self.resync_seconds = settings.SLACK_RESYNC_SECONDS if resync_seconds is None else resync_seconds
+        self.max_messages = max_messages or settings.SLACK_STORE_MAX_MESSAGES
+
+        prefix = f"slack:{self.channel}"
+        self.messages_key = f"{prefix}:messages"   # hash ts -> message
+        self.index_key    = f"{prefix}:index"      # sorted set of ts
+        self.meta_key     = f"{prefix}:meta"
+        self.lock_key     = f"{prefix}:lock"
+        self.thread_prefix    = f"{prefix}:thread"
+        self.thread_of_prefix = f"{prefix}:thread_of"
+
+    @property
+    def slack(self) -> SlackService:
+        # built on first sync, so reading the store never needs the token
+        if self._slack is None:
+            self._slack = SlackService(channel_id=self.channel)
+        return self._slack
+
+    # --- channel ---
+
+    def messages(self, limit=50) -> list:
+        """The latest `limit` channel messages, newest first."""
+        self.sync()
+        timestamps = self.client.zrevrange(self.index_key, 0, limit - 1)
+        if not timestamps:
+            return []
+        return [json.loads(raw) for raw in self.client.hmget(self.messages_key, timestamps) if raw]
+
+    def sync(self, force=False) -> None:
+        meta = self._read_meta()
+        if not force and self._is_fresh(meta):
+            return
+        try:
+            # once messages are stored, readers never wait for another sync
+            with self.client.lock(self.lock_key, timeout=120, blocking_timeout=0 if meta else 30):
+                meta = self._read_meta()
+                if force or not self._is_fresh(meta):
+                    self._sync(meta)
+        except redis.exceptions.LockError:
+            if not meta:
+                print("⚠️ Slack store lock timed out, no messages stored yet")
+        except (SlackApiError, OSError) as e:
+            if not meta:
+                raise
+            error = e.response["error"] if isinstance(e, SlackApiError) else e
+            print(f"⚠️ Slack sync failed, serving stored messages: {error}")
+
+    def invalidate(self):
+        self.client.delete(self.meta_key)
+
+    def _is_fresh(self, meta) -> bool:
+        return bool(meta) and time.time() - meta["refreshed_at"] < self.sync_seconds
+
+    def _read_meta(self):
+        raw = self.client.get(self.meta_key)
+        return json.loads(raw) if raw else None
+
+    def _sync(self, meta) -> None:
+        now = time.time()
+        full = not meta or not meta.get("cursor") or now - meta["resynced_at"] >= self.resync_seconds
+        fetched = self.slack.get_messages_since(None if full else meta["cursor"], limit=self.max_messages)
+
+        pipe = self.client.pipeline()
+        if full:
+            pipe.delete(self.messages_key, self.index_key)
+        if fetched:
+            pipe.hset(self.messages_key, mapping={m["ts"]: json.dumps(_slim(m)) for m in fetched})
+            pipe.zadd(self.index_key, {m["ts"]: float(m["ts"]) for m in fetched})
+        pipe.set(self.meta_key, json.dumps({
+            "cursor":       _newest([m.get("ts") for m in fetched] + ([] if full else [meta["cursor"]])),
+            "refreshed_at": now,
+            "resynced_at":  now if full else meta["resynced_at"],
+        }))
+        pipe.execute()
+
+        # keep the newest max_messages
+        dropped = self.client.zrange(self.index_key, 0, -self.max_messages - 1)
+        if dropped:
+            pipe = self.client.pipeline()
+            pipe.zrem(self.index_key, *dropped)
+            pipe.hdel(self.messages_key, *dropped)
+            pipe.execute()
+        if full:
+            print(f"🔄 Slack store resynced: {len(fetched)} messages")
+
+    # --- threads ---
+
+    def thread(self, thread_ts, limit=100) -> list:
+        """Parent and replies of a thread, chronological, at most `limit`."""
+        stored = self._read_thread(thread_ts)
+        if stored is None or self._thread_is_stale(thread_ts, stored):
+            try:
+                stored = self._sync_thread(thread_ts, stored)
+            except (SlackApiError, OSError) as e:
+                error = e.response["error"] if isinstance(e, SlackApiError) else e
+                print(f"⚠️ Slack thread sync failed for {thread_ts}: {error}")
+                if stored is None:
+                    return []
+        return stored["messages"][:limit]
+
+    def refresh_message(self, ts) -> None:
+        """Re-read a message that changed through this app, e.g. a reaction from SlackReactView."""
+        thread_ts = self.client.get(f"{self.thread_of_prefix}:{ts}")
+        # the thread holding it is re-read in full when next opened
+        self.client.delete(self._thread_key(thread_ts.decode() if thread_ts else ts))
+        if not self.client.hexists(self.messages_key, ts):
+            return
+        message = self.slack.get_message(ts)
+        if message is None:
+            self.client.zrem(self.index_key, ts)
+            self.client.hdel(self.messages_key, ts)
+        else:
+            self.client.hset(self.messages_key, ts, json.dumps(_slim(message)))
+
+    def _thread_key(self, thread_ts) -> str:
+        return f"{self.thread_prefix}:{thread_ts}"
+
+    def _read_thread(self, thread_ts):
+        raw = self.client.get(self._thread_key(thread_ts))
+        return json.loads(raw) if raw else None
+
+    def _thread_is_stale(self, thread_ts, stored) -> bool:
+        if time.time() - stored["synced_at"] >= self.sync_seconds:
+            return True
+        raw = self.client.hget(self.messages_key, thread_ts)
+        latest = json.loads(raw).get("latest_reply") if raw else None
+        return bool(latest) and float(latest) > float(stored["latest_reply"] or 0)
+
+    def _sync_thread(self, thread_ts, stored) -> dict:
+        oldest = stored["latest_reply"] if stored else None
+        fetched = self.slack.get_thread_since(thread_ts, oldest)
+        messages = {m["ts"]: m for m in (stored["messages"] if stored else [])}
+        messages.update((m["ts"], _slim(m)) for m in fetched if m.get("ts"))
+
+        parent = messages.get(thread_ts)
+        parent_fetched = any(m.get("ts") == thread_ts for m in fetched)
+        if stored and parent_fetched and parent.get("reply_count", 0) < len(messages) - 1:
+            # replies were deleted: read the whole thread again
+            return self._sync_thread(thread_ts, None)
+
+        replies = [ts for ts in messages if ts != thread_ts]
+        thread = {
+            "latest_reply": _newest(replies),
+            "synced_at":    time.time(),
+            "messages":     sorted(messages.values(), key=lambda m: float(m["ts"])),
+        }
+        pipe = self.client.pipeline()
+        pipe.set(self._thread_key(thread_ts), json.dumps(thread), ex=self.THREAD_TTL)
+        for ts in replies:
+            pipe.set(f"{self.thread_of_prefix}:{ts}", thread_ts, ex=self.THREAD_TTL)
+        if parent_fetched and self.client.hexists(self.messages_key, thread_ts):
+            # the list view shows the parent's reply count and reactions
+            pipe.hset(self.messages_key, thread_ts, json.dumps(parent))
+        pipe.execute()
+        return thread
+
+
+slack_store = SlackStore()
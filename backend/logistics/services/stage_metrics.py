@@ -0,0 +1,179 @@
+#backend/logistics/services/stage_metrics.py
+import sys
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Count, Sum
+from django.utils import timezone
+from logistics.models import InvoiceRunStage
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+QUANTILES = (0.5, 0.95)
+
+
+def _reset_peak_rss() -> None:
+    # Linux: writing 5 to clear_refs resets VmHWM, so the next reading is
+    # the peak of this stage rather than of the whole process lifetime
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    # lifetime peak instead: bytes on macOS, KB elsewhere
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+class StageTimer:
+    """
+    Times the stages of one DeltaChecker evaluation:
+
+        with timer.span("parse") as span:
+            df = parser.parse(...)
+            span["rows"] = len(df)
+
+    Spans are kept in memory until the InvoiceRun exists, then written with
+    save(run) together with a "total" span since the timer was created.
+    Memory is the process's resident high-water mark during the span
+    (reset per span on Linux); with a thread pool, concurrent tasks share it.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+
+    @contextmanager
+    def span(self, stage: str):
+        span = {"stage": stage, "rows": None}
+        _reset_peak_rss()
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span["seconds"] = time.perf_counter() - start
+            span["max_rss_mb"] = _peak_rss_mb()
+            self.spans.append(span)
+
+    def summary(self) -> str:
+        return ", ".join(f"{span['stage']} {span['seconds']:.2f}s" for span in self.spans)
+
+    def save(self, run) -> None:
+        peaks = [span["max_rss_mb"] for span in self.spans if span["max_rss_mb"] is not None]
+        spans = self.spans + [{
+            "stage":      "total",
+            "seconds":    time.perf_counter() - self.started,
+            "rows":       run.num_rows,
+            "max_rss_mb": max(peaks) if peaks else None,
+        }]
+        InvoiceRunStage.objects.bulk_create([
+            InvoiceRunStage(
+                run=run,
+                stage=span["stage"],
+                seconds=span["seconds"],
+                rows=span["rows"],
+                max_rss_mb=round(span["max_rss_mb"], 1) if span["max_rss_mb"] is not None else None,
+            )
+            for span in spans
+        ])
+
+
+def _quantile(values: list, q: float) -> float:
+    # nearest rank on sorted values
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+class StageMetrics:
+    """
+    Prometheus text exposition of the recorded stage timings per (partner,
+    stage), for durations, row counts and memory. p50 / p95 are over the
+    last STAGE_METRICS_WINDOW_HOURS and computed here (no pandas) since the
+    samples are few; _sum and _count are totals over every recorded stage,
+    so they only grow and rate() over them works as Prometheus expects.
+    """
+
+    FAMILIES = [
+        ("invoice_stage_duration_seconds", "seconds", 1.0,
+         "Duration of an invoice pipeline stage."),
+        ("invoice_stage_rows", "rows", 1.0,
+         "Rows handled by an invoice pipeline stage."),
+        ("invoice_stage_max_rss_bytes", "max_rss_mb", 2**20,
+         "Peak resident memory of the worker during an invoice pipeline stage."),
+    ]
+
+    def samples(self, since=None) -> dict:
+        """{(partner, stage): {field: [values...]}} of the stages recorded since `since`."""
+        if since is None:
+            since = timezone.now() - timedelta(hours=settings.STAGE_METRICS_WINDOW_HOURS)
+        fields = [field for _, field, _, _ in self.FAMILIES]
+        groups = {}
+        rows = (
+            InvoiceRunStage.objects.filter(created__gte=since)
+                                   .values_list("run__partner", "stage", *fields)
+                                   .order_by()
+                                   .iterator()
+        )
+        for partner, stage, *values in rows:
+            group = groups.setdefault((partner, stage), {field: [] for field in fields})
+            for field, value in zip(fields, values):
+                if value is not None:
+                    group[field].append(value)
+        return groups
+
+    def totals(self) -> dict:
+        """{(partner, stage): {field: (sum, count)}} over every recorded stage."""
+        aggregates = {}
+        for _, field, _, _ in self.FAMILIES:
+            aggregates[f"{field}_sum"] = Sum(field)
+            aggregates[f"{field}_count"] = Count(field)
+        rows = (
+            InvoiceRunStage.objects.values("run__partner", "stage")
+                                   .annotate(**aggregates)
+                                   .order_by()
+        )
+        return {
+            (row["run__partner"], row["stage"]): {
+                field: (row[f"{field}_sum"] or 0, row[f"{field}_count"])
+                for _, field, _, _ in self.FAMILIES
+            }
+            for row in rows
+        }
+
+    def render(self, since=None) -> str:
+        groups = self.samples(since)
+        totals = self.totals()
+        lines = []
+        for name, field, scale, help_text in self.FAMILIES:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} summary")
+            for (partner, stage), total in sorted(totals.items()):
+                value_sum, count = total[field]
+                if not count:
+                    continue
+                labels = f'partner="{partner}",stage="{stage}"'
+                values = sorted(value * scale for value in groups.get((partner, stage), {}).get(field, []))
+                if values:
+                    for q in QUANTILES:
+                        lines.append(f'{name}{{{labels},quantile="{q}"}} {_quantile(values, q):.10g}')
+                lines.append(f"{name}_sum{{{labels}}} {value_sum * scale:.10g}")
+                lines.append(f"{name}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+stage_metrics = StageMetrics()
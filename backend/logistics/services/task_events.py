@@ -0,0 +1,89 @@
+#backend/logistics/services/task_events.py
+import json
+import time
+from typing import Iterator, Optional
+import redis
+from django.conf import settings
+
+redis_client = redis.from_url(settings.REDIS_URL)
+
+# events that end a task's stream
+FINAL_EVENTS = ("result", "error")
+
+
+class TaskEvents:
+    """
+    Progress events of a Celery task, published on a Redis pub/sub channel
+    per task id (started, parsed, matched, priced, persisted, then result
+    or error).
+
+    Every event is also appended to a short-lived replay list, so a client
+    that connects after the task started (or after it finished) first gets
+    the events it missed, then the live ones. Publishing errors are logged
+    and never fail a task.
+    """
+
+    CHANNEL    = "task-events:{task_id}"
+    REPLAY_KEY = "task-events:{task_id}:log"
+    REPLAY_TTL = 3600
+
+    def __init__(self, client=None):
+        self.client = client or redis_client
+
+    def publish(self, task_id: str, event: str, **data) -> None:
+        if not task_id:
+            return
+        payload = {"event": event, "ts": time.time(), **data}
+        replay_key = self.REPLAY_KEY.format(task_id=task_id)
+        try:
+            # the replay position doubles as sequence number for de-duplication
+            seq = self.client.rpush(replay_key, json.dumps(payload, default=str))
+            pipe = self.client.pipeline()
+            pipe.expire(replay_key, self.REPLAY_TTL)
+            pipe.publish(self.CHANNEL.format(task_id=task_id), json.dumps({**payload, "seq": seq}, default=str))
+            pipe.execute()
+        except redis.RedisError as e:
+            print(f"⚠️ Could not publish task event {event} for {task_id}: {e}")
+
+    def reporter(self, task_id: str):
+        """Callable(event, **data) bound to one task, for DeltaChecker(progress=...)."""
+        def report(event: str, **data) -> None:
+            self.publish(task_id, event, **data)
+        return report
+
+    def stream(self, task_id: str, timeout: float, heartbeat: float = 15.0) -> Iterator[Optional[dict]]:
+        """
+        Yield the task's events (replayed, then live) until a final event or
+        timeout. Yields None every `heartbeat` seconds without an event so
+        the caller can keep the connection alive or check the task itself.
+        """
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        # subscribe before reading the replay list so no event falls in between
+        pubsub.subscribe(self.CHANNEL.format(task_id=task_id))
+        try:
+            seen = 0
+            for raw in self.client.lrange(self.REPLAY_KEY.format(task_id=task_id), 0, -1):
+                seen += 1
+                event = {**json.loads(raw), "seq": seen}
+                yield event
+                if event["event"] in FINAL_EVENTS:
+                    return
+
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                message = pubsub.get_message(timeout=heartbeat)
+                if message is None:
+                    yield None
+                    continue
+                event = json.loads(message["data"])
+                if event.get("seq", 0) <= seen:
+                    continue  # already replayed
+                seen = event["seq"]
+                yield event
+                if event["event"] in FINAL_EVENTS:
+                    return
+        finally:
+            pubsub.close()
+
+
+task_events = TaskEvents()
@@ -0,0 +1,145 @@
+#backend/logistics/services/upload_store.py
+import mmap
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+import redis
+from django.conf import settings
+
+redis_client = redis.from_url(settings.REDIS_URL)
+
+
+class UploadNotFound(FileNotFoundError):
+    pass
+
+
+class RedisUploadStore:
+    """
+    Uploaded files in Redis under upload:<key>, written chunk by chunk with
+    APPEND (the upload is never read into memory as a whole) and expired
+    after UPLOAD_TTL seconds.
+    """
+
+    PREFIX = "upload"
+
+    def __init__(self, client=None, ttl=None):
+        self.client = client or redis_client
+        self.ttl = ttl or settings.UPLOAD_TTL
+
+    def _key(self, key: str) -> str:
+        return f"{self.PREFIX}:{key}"
+
+    def save(self, chunks) -> str:
+        key = str(uuid.uuid4())
+        name = self._key(key)
+        # one APPEND per chunk: a pipeline would buffer the whole file again
+        written = False
+        for chunk in chunks:
+            self.client.append(name, chunk)
+            if not written:
+                # expire even if the upload is interrupted halfway
+                self.client.expire(name, self.ttl)
+                written = True
+        if not written:
+            self.client.set(name, b"", ex=self.ttl)
+        return key
+
+    @contextmanager
+    def open(self, key: str) -> Iterator[bytes]:
+        data = self.client.get(self._key(key))
+        if data is None:
+            raise UploadNotFound(f"No upload stored for {self._key(key)}")
+        yield data
+
+    def exists(self, key: str) -> bool:
+        return bool(self.client.exists(self._key(key)))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self._key(key))
+
+    def cleanup(self) -> int:
+        # Redis expires uploads by itself
+        return 0
+
+
+class SpoolUploadStore:
+    """
+    Uploaded files in a local spool directory, written chunk by chunk and
+    opened memory-mapped, so the bytes stay in the page cache instead of
+    the worker's heap. Web and worker processes must share the directory.
+    Files older than UPLOAD_TTL seconds are removed by cleanup(), which
+    save() runs at most every UPLOAD_TTL / 2 seconds.
+    """
+
+    def __init__(self, directory=None, ttl=None):
+        self.directory = Path(directory or settings.UPLOAD_SPOOL_DIR)
+        self.ttl = ttl or settings.UPLOAD_TTL
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._last_cleanup = 0.0
+
+    def _path(self, key: str) -> Path:
+        # keys are generated uuids; never let a caller escape the spool dir
+        return self.directory / Path(key).name
+
+    def save(self, chunks) -> str:
+        key = str(uuid.uuid4())
+        partial = self._path(f"{key}.part")
+        with open(partial, "wb") as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+        os.replace(partial, self._path(key))
+        # sweep expired uploads now and then, no scheduler needed
+        if time.time() - self._last_cleanup > self.ttl / 2:
+            self._last_cleanup = time.time()
+            self.cleanup()
+        return key
+
+    @contextmanager
+    def open(self, key: str) -> Iterator[mmap.mmap]:
+        path = self._path(key)
+        if not path.is_file():
+            raise UploadNotFound(f"No upload stored for {key}")
+        with open(path, "rb") as fh:
+            if os.fstat(fh.fileno()).st_size == 0:
+                yield b""
+                return
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield buffer
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def cleanup(self) -> int:
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for path in self.directory.iterdir():
+            try:
+                if path.is_file() and path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+
+STORES = {
+    "redis": RedisUploadStore,
+    "spool": SpoolUploadStore,
+}
+
+
+def get_upload_store(backend: Optional[str] = None):
+    backend = backend or settings.UPLOAD_STORE
+    try:
+        return STORES[backend]()
+    except KeyError:
+        raise ValueError(f"Unknown UPLOAD_STORE '{backend}', expected one of {sorted(STORES)}")
+
+
+upload_store = get_upload_store()
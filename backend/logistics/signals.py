@@ -0,0 +1,14 @@
+# backend/logistics/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from logistics.models import InvoiceRun
+from logistics.services.analytics_cache import analytics_cache
+
+
+@receiver(post_save, sender=InvoiceRun)
+@receiver(post_delete, sender=InvoiceRun)
+def invalidate_analytics(sender, **kwargs):
+    # bump after commit so the new version never serves pre-commit data
+    transaction.on_commit(analytics_cache.bump)
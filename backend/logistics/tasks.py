@@ -1,62 +1,154 @@
 #backend/logistics/tasks.py
 import logging
-import redis
-import pandas as pd
-from celery import shared_task, chain
-from django.conf import settings
-from datetime import datetime, date
-from logistics.services.delta_checker import DeltaChecker
+import uuid
+from contextlib import ExitStack
+from celery import shared_task, chain, chord, group
+from logistics.services.task_events import task_events
+from logistics.services.upload_store import upload_store
 
 logger = logging.getLogger(__name__)
-redis_client = redis.from_url(settings.REDIS_URL)
 
 
-@shared_task(name="logistics.tasks.load_invoice_bytes")
-def load_invoice_bytes(redis_key: str, redis_key_pdf: str = "") -> dict:
-    logger.info("🔄 [load_invoice_bytes] fetching %s / %s", redis_key, redis_key_pdf)
+# acks_late: a parse interrupted by a worker shutdown is redelivered; re-running
+# is safe since runs are upserted per (partner, invoice_number)
+@shared_task(bind=True, acks_late=True, name="logistics.tasks.evaluate_invoice")
+def evaluate_invoice(
+    self,
+    partner: str,
+    redis_key: str,
+    redis_key_pdf: str = "",
+    delta_threshold: float = 20.0,
+    batch_id: str = "",
+) -> dict:
+    """
+    The whole invoice pipeline in one task: open the uploads from the
+    upload store, parse, match, price and persist. Only the upload keys go
+    through the broker, and only the run summary comes back in the result.
+    Its id is the one the client follows on /logistics/task-events/.
 
-    def _get_bytes(key):
-        if not key:
-            return None
-        data = redis_client.get(f"upload:{key}")
-        if not data:
-            msg = f"No data in Redis for upload:{key}"
+    As part of a batch (batch_id set) it prices against the shared orders
+    snapshot and also reports its outcome on the batch's event stream.
+    """
+    logger.info("🔍 [evaluate_invoice] partner=%s %s / %s", partner, redis_key, redis_key_pdf)
+    report = task_events.reporter(self.request.id)
+    report("started", partner=partner)
+
+    for key in (redis_key, redis_key_pdf):
+        if key and not upload_store.exists(key):
+            msg = f"No upload stored for {key}"
             logger.error("❌ %s", msg)
-            raise FileNotFoundError(msg)
-        return data
+            # returned, not raised: one missing file must not fail a whole batch
+            return _finish(report, batch_id, {"error": msg, "partner": partner})
+
+    # imported on first use: web processes import this module only to send
+    # tasks and never need pandas / SQLAlchemy / the parsers
+    from logistics.services.delta_checker import DeltaChecker
 
-    return {
-        "invoice_bytes": _get_bytes(redis_key),
-        "pdf_bytes":     _get_bytes(redis_key_pdf),
+    checker = DeltaChecker(progress=report, prefer_snapshot=bool(batch_id))
+    with ExitStack() as stack:
+        # bytes (Redis) or a read-only mmap (spool), only valid inside this block
+        invoice_bytes, pdf_bytes = (
+            stack.enter_context(upload_store.open(key)) if key else None
+            for key in (redis_key, redis_key_pdf)
+        )
+        success, parsed_ok, df_merged = checker.evaluate(
+            partner=partner,
+            df_list=[],
+            invoice_bytes=invoice_bytes,
+            pdf_bytes=pdf_bytes,
+            delta_threshold=delta_threshold,
+        )
+  
+    if df_merged is None or checker.last_run is None:
+        return _finish(report, batch_id, {"error": f"Delta failed for {partner}", "partner": partner})
+
+    # rows are persisted as InvoiceLine; the frontend pages through
+    # /logistics/runs/<run_id>/lines/ instead of receiving them here
+    run = checker.last_run
+    result = {
+        "delta_ok":       success,
+        "parsed_ok":      parsed_ok,
+        "delta_sum":      round(float(df_merged["Delta"].sum()), 2),
+        "run_id":         run.pk,
+        "partner":        run.partner,
+        "invoice_number": run.invoice_number,
+        "num_rows":       run.num_rows,
     }
+    return _finish(report, batch_id, result)
 
 
-@shared_task(name="logistics.tasks.evaluate_delta")
-def evaluate_delta(ctx: dict, partner: str, delta_threshold: float) -> dict:
-    logger.info("🔍 [evaluate_delta] partner=%s", partner)
-    checker = DeltaChecker()
-    success, parsed_ok, df_merged = checker.evaluate(
-        partner=partner,
-        df_list=[],
-        invoice_bytes=ctx.get("invoice_bytes"),
-        pdf_bytes=ctx.get("pdf_bytes"),
-        delta_threshold=delta_threshold,
-    )
-  
-    if df_merged is None:
-        return {"error": f"Delta failed for {partner}"}
-    records = df_merged.to_dict(orient="records")
-    for rec in records:
-        if isinstance(rec.get("order_creation_date"), (pd.Timestamp, datetime)):
-            rec["order_creation_date"] = rec["order_creation_date"].isoformat()
-        if isinstance(rec.get("Invoice date"), (pd.Timestamp, datetime, date)):
-            rec["Invoice date"] = rec["Invoice date"].isoformat()
-    return {
-        "delta_ok":   success,
-        "parsed_ok":  parsed_ok,
-        "delta_sum":  round(df_merged["Delta"].sum(), 2),
-        "data":       records,
+def _finish(report, batch_id: str, result: dict) -> dict:
+    if "error" in result:
+        report("error", **result)
+    else:
+        report("result", result=result)
+    if batch_id:
+        task_events.publish(batch_id, "invoice", result=result)
+    return result
+
+
+@shared_task(bind=True, name="logistics.tasks.warm_order_snapshot")
+def warm_order_snapshot(self, batch_id: str = "") -> dict:
+    """Refresh the shared orders snapshot once, before a batch fans out."""
+    from logistics.services.database_service import DatabaseService
+    from logistics.services.order_snapshot import OrderSnapshot
+
+    df_order = OrderSnapshot(DatabaseService()).get()
+    logger.info("📦 [warm_order_snapshot] %s orders for batch %s", len(df_order), batch_id)
+    task_events.publish(batch_id, "orders_ready", orders=len(df_order))
+    return {"orders": len(df_order)}
+
+
+@shared_task(name="logistics.tasks.summarize_batch")
+def summarize_batch(results: list, invoices: list, batch_id: str = "") -> dict:
+    """
+    Chord callback: per-invoice outcomes (in request order) and the combined
+    delta sum of the batch.
+    """
+    items = [{**invoice, **result} for invoice, result in zip(invoices, results)]
+    succeeded = [item for item in items if "error" not in item]
+    summary = {
+        "batch_id":        batch_id,
+        "invoices":        items,
+        "succeeded":       len(succeeded),
+        "failed":          len(items) - len(succeeded),
+        "total_delta_sum": round(sum(item["delta_sum"] for item in succeeded), 2),
+        "total_rows":      sum(item["num_rows"] for item in succeeded),
+        "delta_ok":        bool(succeeded) and all(item["delta_ok"] for item in succeeded),
     }
+    logger.info("🧾 [summarize_batch] %s: %s ok, %s failed", batch_id, summary["succeeded"], summary["failed"])
+    task_events.publish(batch_id, "result", result=summary)
+    return summary
+
+def dispatch_invoice_batch(invoices: list, delta_threshold: float) -> dict:
+    """
+    Evaluate many uploaded invoices in parallel:
+
+        chain(warm_order_snapshot, chord(group(evaluate_invoice ...), summarize_batch))
+
+    `invoices` are dicts with partner, redis_key and optional redis_key_pdf.
+    Returns the batch id (the summarize_batch task, also the batch's event
+    stream) and one task id per invoice, in request order.
+    """
+    batch_id = str(uuid.uuid4())
+    task_ids = [str(uuid.uuid4()) for _ in invoices]
+    members = [
+        evaluate_invoice.si(
+            invoice["partner"], invoice["redis_key"], invoice.get("redis_key_pdf") or "",
+            delta_threshold, batch_id=batch_id,
+        ).set(task_id=task_id)
+        for invoice, task_id in zip(invoices, task_ids)
+    ]
+    described = [
+        {"task_id": task_id, "partner": invoice["partner"], "redis_key": invoice["redis_key"]}
+        for invoice, task_id in zip(invoices, task_ids)
+    ]
+    chain(
+        warm_order_snapshot.si(batch_id),
+        chord(group(members), summarize_batch.s(described, batch_id).set(task_id=batch_id)),
+    ).apply_async()
+    logger.info("🗂️ Dispatched batch %s with %s invoices", batch_id, len(invoices))
+    return {"batch_id": batch_id, "task_ids": task_ids}
 
 #Update JSW google oauth
 #@shared_task(name="logistics.tasks.export_sheet")
@@ -79,17 +171,13 @@ def process_invoice_pipeline(
     delta_threshold: float = 20.0
 ) -> dict:
     """
-    Dispatches a chain of subtasks, then returns immediately with the chain id.
-    Your view should return {"task_id": chain.id} and let the frontend poll.
+    Dispatches evaluate_invoice, then returns immediately with its id.
+    Your view should return {"task_id": job.id} and let the frontend follow it.
     """
     logger.info("▶️ Starting pipeline %s for %s", self.request.id, partner)
 
-    job = chain(
-        load_invoice_bytes.s(redis_key, redis_key_pdf),
-        evaluate_delta.s(partner, delta_threshold)
-        #export_sheet.s(partner)
-    )()
-    logger.info("🔗 Dispatched chain, id=%s", job.id)
+    job = evaluate_invoice.delay(partner, redis_key, redis_key_pdf, delta_threshold)
+    logger.info("🔗 Dispatched evaluate_invoice, id=%s", job.id)
 
     return {"task_id": job.id}
 
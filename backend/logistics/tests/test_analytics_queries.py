@@ -0,0 +1,94 @@
+#backend/logistics/tests/test_analytics_queries.py
+import random
+from datetime import date
+import pandas as pd
+from django.test import SimpleTestCase, TestCase
+from logistics.models import InvoiceRun
+from logistics.services.analytics_queries import AnalyticsQuery
+from logistics.services.analytics_rollups import AnalyticsRollups
+from logistics.services.line_writer import InvoiceLineWriter
+
+ROUTES = ["NL-NL", "BE-NL", "NL-BE", "DE-NL", ""]
+CATEGORIES = ["sofas", "chairs", "lamps"]
+
+
+def _lines(rng: random.Random, rows: int, invoice_date: pd.Timestamp) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "order_creation_date":          [invoice_date - pd.Timedelta(days=rng.randint(1, 30)) for _ in range(rows)],
+        "Order ID":                     [f"order-{rng.random()}" for _ in range(rows)],
+        "weight":                       [rng.choice([5, 10, 20]) for _ in range(rows)],
+        "buyer_country-seller_country": [rng.choice(ROUTES) for _ in range(rows)],
+        "cat_level_1_and_2":            [rng.choice(CATEGORIES) for _ in range(rows)],
+        "cat_level_2_and_3":            [""] * rows,
+        "price":                        [50.0] * rows,
+        "Delta":                        [round(rng.uniform(-20, 40), 2) for _ in range(rows)],
+        "Invoice date":                 [invoice_date] * rows,
+    })
+    df["Delta_sum"] = df["Delta"].sum()
+    return df
+
+
+class AnalyticsQueryTests(TestCase):
+    """Rollup-backed and line-backed payloads agree, and filters select the right lines."""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        invoices = [
+            ("brenger", "2025-01-15"), ("brenger", "2025-02-10"), ("tadde", "2025-02-20"),
+            ("swdevries", "2025-03-05"), ("tadde", "2025-03-31"),
+        ]
+        for i, (partner, invoice_date) in enumerate(invoices):
+            df = _lines(rng, 40, pd.Timestamp(invoice_date))
+            run = InvoiceRun.objects.create(
+                partner=partner, invoice_number=f"INV-{i}", delta_sum=float(df["Delta"].sum()),
+                parsed_ok=True, num_rows=len(df),
+            )
+            InvoiceLineWriter().write(run, df, partner, run.invoice_number)
+            AnalyticsRollups().rebuild(run)
+
+    def assertSamePayload(self, rollups: AnalyticsQuery, lines: AnalyticsQuery):
+        self.assertFalse(rollups.uses_lines)
+        self.assertTrue(lines.uses_lines)
+        expected, actual = rollups.payload(), lines.payload()
+        expected.pop("filters"), actual.pop("filters")
+        self.assertEqual(actual, expected)
+
+    def test_lines_match_rollups(self):
+        self.assertSamePayload(AnalyticsQuery(), AnalyticsQuery(date_from=date(2000, 1, 1)))
+
+    def test_lines_match_rollups_for_a_partner(self):
+        self.assertSamePayload(AnalyticsQuery(partner="tadde"), AnalyticsQuery(partner="tadde", date_to=date(2100, 1, 1)))
+
+    def test_date_range(self):
+        payload = AnalyticsQuery(date_from=date(2025, 2, 1), date_to=date(2025, 2, 28)).payload()
+        self.assertEqual(payload["total_runs"], 2)
+        self.assertEqual([row["month"] for row in payload["trend_data"]], ["2025-02"])
+        self.assertEqual(set(payload["over_per_partner"]), {"brenger", "tadde"})
+
+    def test_route(self):
+        payload = AnalyticsQuery(route="BE-NL").payload()
+        self.assertEqual(list(payload["over_per_country"]), ["BE"])
+        self.assertEqual([row["route"] for row in payload["top_routes"]], ["BE-NL"])
+
+    def test_pagination(self):
+        everything = AnalyticsQuery(limit=100).payload()
+        page = AnalyticsQuery(limit=2, offset=1).payload()
+        self.assertEqual(page["top_routes"], everything["top_routes"][1:3])
+        self.assertEqual(page["category_weight"], everything["category_weight"][1:3])
+        self.assertEqual(page["category_weight_count"], everything["category_weight_count"])
+
+
+class AnalyticsQueryParamsTests(SimpleTestCase):
+    def test_from_params(self):
+        query = AnalyticsQuery.from_params({"from": "2025-02-01", "partner": " Tadde ", "limit": "5000", "offset": "10"})
+        self.assertEqual(query.date_from, date(2025, 2, 1))
+        self.assertEqual(query.partner, "tadde")
+        self.assertEqual(query.limit, 1000)
+        self.assertEqual(query.offset, 10)
+        self.assertTrue(query.uses_lines)
+
+    def test_invalid_params(self):
+        for params in ({"from": "01-02-2025"}, {"limit": "ten"}, {"offset": "-1"}):
+            with self.assertRaises(ValueError):
+                AnalyticsQuery.from_params(params)
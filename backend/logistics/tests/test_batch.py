@@ -0,0 +1,98 @@
+#backend/logistics/tests/test_batch.py
+import contextlib
+import io
+from unittest import mock
+from django.conf import settings
+from django.test import SimpleTestCase
+from django.urls import reverse
+from logistics import tasks
+from logistics.services.task_events import TaskEvents
+from logistics.tests.test_task_events import FakeRedis
+
+INVOICES = [
+    {"partner": "brenger", "redis_key": "upload:1"},
+    {"partner": "libero", "redis_key": "upload:2", "redis_key_pdf": "upload:3"},
+]
+
+
+class DispatchBatchTests(SimpleTestCase):
+    def test_canvas(self):
+        with mock.patch.object(tasks, "chain") as chain:
+            batch = tasks.dispatch_invoice_batch(INVOICES, 15.0)
+
+        warm, batch_chord = chain.call_args.args
+        chain.return_value.apply_async.assert_called_once_with()
+        self.assertEqual(warm.task, "logistics.tasks.warm_order_snapshot")
+        self.assertEqual(warm.args, (batch["batch_id"],))
+
+        members = list(batch_chord.tasks)
+        self.assertEqual([m.options["task_id"] for m in members], batch["task_ids"])
+        self.assertEqual(members[1].args, ("libero", "upload:2", "upload:3", 15.0))
+        self.assertEqual(members[0].kwargs, {"batch_id": batch["batch_id"]})
+        self.assertTrue(all(m.immutable for m in members))
+
+        body = batch_chord.body
+        self.assertEqual(body.task, "logistics.tasks.summarize_batch")
+        self.assertEqual(body.options["task_id"], batch["batch_id"])
+        described, batch_id = body.args
+        self.assertEqual(batch_id, batch["batch_id"])
+        self.assertEqual([d["task_id"] for d in described], batch["task_ids"])
+
+
+class BatchTaskTests(SimpleTestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        patcher = mock.patch.object(tasks, "task_events", TaskEvents(client=self.redis))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _batch_events(self, batch_id):
+        return list(tasks.task_events.stream(batch_id, timeout=0, heartbeat=0))
+
+    def test_summarize_batch(self):
+        described = [{"task_id": "a", "partner": "brenger"}, {"task_id": "b", "partner": "libero"}, {"task_id": "c", "partner": "tadde"}]
+        results = [
+            {"delta_ok": True, "delta_sum": 10.5, "num_rows": 3, "run_id": 1},
+            {"error": "No upload stored for upload:2", "partner": "libero"},
+            {"delta_ok": True, "delta_sum": -2.25, "num_rows": 4, "run_id": 2},
+        ]
+        summary = tasks.summarize_batch(results, described, "batch-1")
+
+        self.assertEqual([item["task_id"] for item in summary["invoices"]], ["a", "b", "c"])
+        self.assertEqual((summary["succeeded"], summary["failed"]), (2, 1))
+        self.assertEqual(summary["total_delta_sum"], 8.25)
+        self.assertEqual(summary["total_rows"], 7)
+        self.assertTrue(summary["delta_ok"])
+        self.assertEqual(self._batch_events("batch-1")[-1]["result"], summary)
+
+    def test_missing_upload_does_not_fail_the_batch(self):
+        with mock.patch.object(tasks.upload_store, "exists", return_value=False), contextlib.redirect_stdout(io.StringIO()):
+            result = tasks.evaluate_invoice.apply(
+                args=("brenger", "upload:1"), kwargs={"batch_id": "batch-1"}, task_id="task-1",
+            ).get()
+
+        self.assertEqual(result, {"error": "No upload stored for upload:1", "partner": "brenger"})
+        (event,) = self._batch_events("batch-1")
+        self.assertEqual((event["event"], event["result"]), ("invoice", result))
+        task_events = [e["event"] for e in tasks.task_events.stream("task-1", timeout=0, heartbeat=0)]
+        self.assertEqual(task_events, ["started", "error"])
+
+
+class CheckDeltaBatchViewTests(SimpleTestCase):
+    def _post(self, body):
+        return self.client.post(
+            reverse("logistics:check-delta-batch"), body, content_type="application/json",
+            HTTP_HOST=settings.ALLOWED_HOSTS[0],
+        )
+
+    def test_dispatch(self):
+        with mock.patch("logistics.views.dispatch_invoice_batch", return_value={"batch_id": "b", "task_ids": ["t1", "t2"]}) as dispatch:
+            response = self._post({"invoices": INVOICES, "delta_threshold": 15})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json(), {"batch_id": "b", "task_ids": ["t1", "t2"]})
+        dispatch.assert_called_once_with(INVOICES, 15.0)
+
+    def test_invalid(self):
+        too_many = [{"partner": "brenger", "redis_key": f"upload:{i}"} for i in range(settings.BATCH_MAX_INVOICES + 1)]
+        for body in ({}, {"invoices": []}, {"invoices": [{"partner": "brenger"}]}, {"invoices": too_many}):
+            self.assertEqual(self._post(body).status_code, 400)
@@ -0,0 +1,72 @@
+#backend/logistics/tests/test_frame_codec.py
+import contextlib
+import io
+import pickle
+import zlib
+import pandas as pd
+from django.test import SimpleTestCase
+from logistics.services.frame_codec import dump_frame, load_frame
+from logistics.services.invoice_cache import ParsedInvoiceCache
+from logistics.services.order_snapshot import OrderSnapshot
+
+
+class DictRedis:
+    """The few Redis commands the caches read with."""
+
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def zadd(self, key, mapping):
+        pass
+
+    def zrem(self, key, *members):
+        pass
+
+
+def _pickled(df: pd.DataFrame) -> bytes:
+    # what the caches stored before frames were encoded with Arrow
+    return zlib.compress(pickle.dumps(df), 1)
+
+
+class FrameCodecTests(SimpleTestCase):
+    def test_round_trip(self):
+        df = pd.DataFrame(
+            {
+                "Order ID":            ["a", None, "c"],
+                "price":               [10.5, None, 3.0],
+                "order_creation_date": pd.to_datetime(["2025-01-01", "2025-02-01", None]),
+                "count":               [1, 2, 3],
+            },
+            index=pd.Index([7, 3, 5], name="row"),
+        )
+        pd.testing.assert_frame_equal(load_frame(dump_frame(df)), df)
+
+    def test_empty_frame(self):
+        df = pd.DataFrame(columns=["Order ID", "price"])
+        self.assertEqual(list(load_frame(dump_frame(df)).columns), ["Order ID", "price"])
+
+    def test_rejects_pickle(self):
+        with self.assertRaises(ValueError):
+            load_frame(_pickled(pd.DataFrame({"a": [1]})))
+
+    def test_unencodable_frame(self):
+        with self.assertRaises(ValueError):
+            dump_frame(pd.DataFrame({"mixed": [1, "x"]}))
+
+
+class LegacyEntryTests(SimpleTestCase):
+    """Pickled entries left in Redis are treated as misses, never unpickled."""
+
+    def test_invoice_cache_miss(self):
+        cache = ParsedInvoiceCache(client=DictRedis({"key": _pickled(pd.DataFrame({"a": [1]}))}), max_entries=10, ttl=60)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertIsNone(cache.get("key"))
+
+    def test_order_snapshot_rebuilds(self):
+        client = DictRedis({OrderSnapshot.FRAME_KEY: _pickled(pd.DataFrame({"a": [1]}))})
+        snapshot = OrderSnapshot(db_service=None, client=client, refresh_seconds=60, rebuild_seconds=600)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertIsNone(snapshot._load({"version": "legacy"}))
@@ -0,0 +1,108 @@
+#backend/logistics/tests/test_geo_service.py
+import contextlib
+import io
+from django.test import TestCase
+from logistics.models import DistanceCache, GeocodeCache
+from logistics.services.geo_service import GeoQuotaExceeded, GeoService
+
+
+class FakeProvider:
+    """Records every call; raises GeoQuotaExceeded after `quota` calls."""
+
+    name = "google"
+
+    def __init__(self, quota=None):
+        self.quota = quota
+        self.geocodes, self.distance_calls = [], []
+
+    def _spend(self):
+        if self.quota is not None and len(self.geocodes) + len(self.distance_calls) >= self.quota:
+            raise GeoQuotaExceeded("OVER_QUERY_LIMIT")
+
+    def geocode(self, country, postal_code):
+        self._spend()
+        self.geocodes.append((country, postal_code))
+        return 52.0 + int(postal_code[:2]) / 100, 5.0
+
+    def distances(self, origin, destinations):
+        self._spend()
+        self.distance_calls.append((origin, destinations))
+        return [100.0 + i for i in range(len(destinations))]
+
+
+class FakeFallback:
+    name = "offline"
+
+    def geocode(self, country, postal_code):
+        return 50.0, 4.0
+
+    def distances(self, origin, destinations):
+        return [999.0] * len(destinations)
+
+
+ROUTES = [("NL", "1012AB", "DE", "10115"), ("NL", "1012AB", "FR", "75001"), ("NL", "3511AA", "DE", "10115")]
+
+
+def _quiet():
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+class GeoServiceCacheTests(TestCase):
+    def test_routes_are_resolved_once_per_origin(self):
+        provider = FakeProvider()
+        km = GeoService(provider=provider, fallback=FakeFallback(), lru_size=100).route_distances(ROUTES + ROUTES)
+        self.assertEqual(len(km), 3)
+        self.assertEqual(len(provider.distance_calls), 2)
+        self.assertEqual(len(provider.geocodes), 4)
+
+    def test_places_are_normalized(self):
+        service = GeoService(provider=FakeProvider(), fallback=FakeFallback(), lru_size=100)
+        km = service.route_distances([("nl", " 1012 ab", "de", "10115"), ("NL", "1012AB", "DE", "10115")])
+        self.assertEqual(len(set(km.values())), 1)
+
+    def test_lru_then_database(self):
+        provider = FakeProvider()
+        first = GeoService(provider=provider, fallback=FakeFallback(), lru_size=100)
+        expected = first.route_distances(ROUTES)
+        self.assertEqual(DistanceCache.objects.filter(provider="google").count(), 3)
+        self.assertEqual(GeocodeCache.objects.filter(provider="google").count(), 4)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(first.route_distances(ROUTES), expected)
+
+        # a new process: empty LRU, rows from the cache tables, no provider calls
+        fresh = FakeProvider()
+        self.assertEqual(GeoService(provider=fresh, fallback=FakeFallback(), lru_size=100).route_distances(ROUTES), expected)
+        self.assertEqual((fresh.geocodes, fresh.distance_calls), ([], []))
+
+
+class GeoServiceFallbackTests(TestCase):
+    def test_fallback_results_are_not_cached(self):
+        provider = FakeProvider(quota=1)
+        service = GeoService(provider=provider, fallback=FakeFallback(), lru_size=100, breaker_seconds=60)
+        with _quiet():
+            km = service.route_distances(ROUTES)
+        self.assertEqual(set(km.values()), {999.0})
+        self.assertFalse(DistanceCache.objects.exists())
+        self.assertFalse(any(key[0] == "dist" for key in service._lru))
+
+    def test_breaker_skips_the_provider(self):
+        provider = FakeProvider(quota=1)
+        service = GeoService(provider=provider, fallback=FakeFallback(), lru_size=100, breaker_seconds=60)
+        with _quiet():
+            service.route_distances(ROUTES[:1])
+            calls = len(provider.geocodes) + len(provider.distance_calls)
+            provider.quota = None
+            km = service.route_distances([("BE", "1000", "NL", "1012AB")])
+        self.assertEqual(len(provider.geocodes) + len(provider.distance_calls), calls)
+        self.assertEqual(list(km.values()), [999.0])
+
+    def test_provider_is_used_again_after_the_breaker(self):
+        provider = FakeProvider(quota=1)
+        service = GeoService(provider=provider, fallback=FakeFallback(), lru_size=100, breaker_seconds=0)
+        with _quiet():
+            service.route_distances(ROUTES[:1])
+            provider.quota = None
+            km = service.route_distances(ROUTES[:1])
+        self.assertEqual(list(km.values()), [100.0])
+        self.assertEqual(DistanceCache.objects.count(), 1)
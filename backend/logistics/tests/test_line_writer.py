@@ -0,0 +1,109 @@
+#backend/logistics/tests/test_line_writer.py
+import io
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from django.db import connection
+from django.test import TestCase
+from logistics.models import InvoiceLine, InvoiceRun
+from logistics.services.line_writer import COPY_NULL, InvoiceLineWriter
+
+
+def delta_frame(partner: str, rows: int = 5) -> pd.DataFrame:
+    """A delta calculator's output, as DeltaChecker hands it to the writer."""
+    price_column = "price_libero_logistics" if partner == "libero" else f"price_{partner}"
+    df = pd.DataFrame({
+        "order_creation_date":          pd.date_range("2025-01-01 10:30", periods=rows, freq="D", tz="Europe/Amsterdam"),
+        "Order ID":                     [f"order-{i}" for i in range(rows)],
+        "weight":                       ["10.00", 12.346, 3, 5, "7.50"][:rows],
+        "buyer_country-seller_country": ["NL-NL", "BE-NL", "DE", "", "NL-BE"][:rows],
+        "cat_level_1_and_2":            ["sofas"] * rows,
+        "cat_level_2_and_3":            ["2-seaters", "", "armchairs", "", "stools"][:rows],
+        "price":                        [50.0, 60.126, 70.0, 0.0, 80.0][:rows],
+        price_column:                   [55.0, 60.0, np.nan, 40.0, 80.0][:rows],
+        "Delta":                        [5.0, -0.126, -70.0, 40.0, 0.0][:rows],
+        "Invoice date":                 [pd.Timestamp("2025-03-01")] * rows,
+        "Invoice number":               ["INV-1"] * rows,
+    })
+    df["Delta_sum"] = df["Delta"].sum()
+    return df
+
+
+class InvoiceLineWriterTests(TestCase):
+    def setUp(self):
+        self.run = InvoiceRun.objects.create(partner="brenger", invoice_number="INV-1", delta_sum=0, parsed_ok=True, num_rows=5)
+
+    def test_write(self):
+        written = InvoiceLineWriter().write(self.run, delta_frame("brenger"), "brenger", "INV-1")
+        self.assertEqual(written, 5)
+
+        lines = list(InvoiceLine.objects.filter(run=self.run).order_by("id"))
+        self.assertEqual([line.order_id for line in lines], [f"order-{i}" for i in range(5)])
+        first = lines[0]
+        self.assertEqual(first.order_creation_date.isoformat(), "2025-01-01T09:30:00+00:00")
+        self.assertEqual(first.invoice_date.isoformat(), "2025-03-01")
+        self.assertEqual(first.invoice_number, "INV-1")
+        self.assertEqual(first.price_brenger, Decimal("55.00"))
+        self.assertIsNone(first.price_tadde)
+        self.assertEqual(lines[1].price_expected, Decimal("60.13"))
+        self.assertEqual(lines[1].weight, Decimal("12.35"))
+        self.assertIsNone(lines[2].price_brenger)
+
+    def test_route_countries(self):
+        InvoiceLineWriter().write(self.run, delta_frame("brenger"), "brenger", "INV-1")
+        countries = list(InvoiceLine.objects.filter(run=self.run).order_by("id").values_list("route", "buyer_country", "seller_country"))
+        self.assertEqual(countries[:3], [("NL-NL", "NL", "NL"), ("BE-NL", "BE", "NL"), ("DE", "DE", "")])
+
+    def test_replace(self):
+        writer = InvoiceLineWriter()
+        writer.write(self.run, delta_frame("brenger"), "brenger", "INV-1")
+        writer.delete(self.run)
+        writer.write(self.run, delta_frame("brenger", rows=2), "brenger", "INV-1")
+        self.assertEqual(InvoiceLine.objects.filter(run=self.run).count(), 2)
+
+    def test_empty_frame(self):
+        self.assertEqual(InvoiceLineWriter().write(self.run, delta_frame("brenger").iloc[:0], "brenger", "INV-1"), 0)
+
+
+class CopyCursor:
+    """psycopg2 cursor stand-in that keeps what COPY would load."""
+
+    def __init__(self):
+        self.cursor = self
+        self.sql, self.data = None, None
+
+    def copy_expert(self, sql, buffer):
+        self.sql, self.data = sql, buffer.read()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class CopyConnection:
+    vendor = "postgresql"
+
+    def __init__(self):
+        self.copy_cursor = CopyCursor()
+
+    def cursor(self):
+        return self.copy_cursor
+
+
+class CopyTests(TestCase):
+    def test_copy_csv(self):
+        run = InvoiceRun.objects.create(partner="libero", invoice_number="INV-1", delta_sum=0, parsed_ok=True, num_rows=5)
+        writer = InvoiceLineWriter(using=connection.alias)
+        frame = writer._frame(run, delta_frame("libero"), "libero", "INV-1")
+        target = CopyConnection()
+        writer._copy(target, frame)
+
+        self.assertIn(f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')", target.copy_cursor.sql)
+        self.assertIn("price_libero", target.copy_cursor.sql)
+        rows = pd.read_csv(io.StringIO(target.copy_cursor.data), header=None, names=list(frame.columns), dtype=str, keep_default_na=False)
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows.loc[2, "price_libero"], COPY_NULL)
+        self.assertEqual(rows.loc[0, "order_creation_date"], "2025-01-01 09:30:00")
+        self.assertEqual(rows.loc[0, "price_libero"], "55.0")
@@ -0,0 +1,49 @@
+#backend/logistics/tests/test_magic_movers.py
+import contextlib
+import io
+import pandas as pd
+from openpyxl import Workbook
+from django.test import SimpleTestCase
+from logistics.parsers.magic_movers import MagicMoversParser
+
+
+def _xlsx(rows: list) -> bytes:
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Arkusz1")
+    for row in rows:
+        worksheet.append(row)
+    out = io.BytesIO()
+    workbook.save(out)
+    return out.getvalue()
+
+
+class MagicMoversParserTests(SimpleTestCase):
+    def setUp(self):
+        self.invoice = _xlsx([
+            ["Faktura", "MM/2025/03"],
+            [None, None, None, "Order ID"],
+            [None, "M/20250301/1", 120.0, "order-1"],
+            ["03-03-2025", "W/20250302/2", 80.5, "order-2"],
+            [None, "M/20250303/3", 99.5, "order-3"],
+            [None, "Suma", 300.0, None],
+            [None, "Do zapłaty", 300.0, None],
+        ])
+
+    def _parse(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            df = MagicMoversParser().parse(self.invoice)
+        return df, out.getvalue()
+
+    def test_lines(self):
+        df, _ = self._parse()
+        self.assertEqual(list(df["Order ID"]), ["order-1", "order-2", "order-3"])
+        self.assertEqual(list(df["price_magic_movers"]), [120.0, 80.5, 99.5])
+        self.assertEqual(list(df["is_wooden"]), [False, True, False])
+
+    def test_invoice_metadata(self):
+        df, output = self._parse()
+        # the parser reads both from the second line of the sheet
+        self.assertTrue((df["Invoice number"] == "W/20250302/2").all())
+        self.assertTrue((df["Invoice date"] == pd.Timestamp("2025-03-03")).all())
+        self.assertIn("Total matches", output)
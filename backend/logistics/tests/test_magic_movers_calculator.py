@@ -0,0 +1,150 @@
+#backend/logistics/tests/test_magic_movers_calculator.py
+import contextlib
+import io
+import random
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from logistics.delta.magic_movers import CHAIRS_AFTER_2, MagicMoversDeltaCalculator
+
+
+class StubGeo:
+    """Deterministic distances instead of Google; some routes are unknown."""
+
+    def __init__(self):
+        self.calls = []
+
+    def km(self, route):
+        if route[3].endswith("0"):
+            return None
+        return float(sum(map(ord, "".join(route))) % 1100)
+
+    def route_distances(self, routes):
+        routes = list(routes)
+        self.calls.append(routes)
+        return {route: self.km(route) for route in routes}
+
+
+# Reference implementations: the row-wise costs the calculator used before
+# vectorizing, with the three bugs fixed in that change (swapped geocode
+# arguments, undefined `category`, garden-chair surcharge on every row).
+
+def _transport(row, geo) -> float:
+    sc, bc = row["seller_country"], row["buyer_country"]
+    dist = geo.km((sc, str(row["seller_post_code"]), bc, str(row["buyer_post_code"]))) or 0.0
+    if sc == "NL" and bc == "NL":
+        return 70
+    if sc == "NL" and bc == "BE":
+        return 100
+    if sc == "NL" and bc == "DE":
+        if dist <= 300:
+            return 120
+        if dist <= 500:
+            return 150
+        return 200
+    if sc == "NL" and bc == "FR":
+        if dist <= 300:
+            return 120
+        if dist <= 500:
+            return 150
+        if dist <= 900:
+            return 180
+        return 240
+    return 0
+
+
+def _surcharge(row) -> float:
+    surcharge = 0
+    cat = (row.get("cat_level_2_and_3") or "").lower()
+    n = row.get("number_of_items", 1)
+    max_dim = max(row.get(c, 0) for c in ("height", "width", "depth"))
+
+    if "dining-chairs" in cat:
+        surcharge += max(n - 6, 0) * 20
+    for chair in CHAIRS_AFTER_2:
+        if chair in cat:
+            surcharge += max(n - 2, 0) * 20
+    if "garden-chairs" in cat:
+        extra = max(n - 6, 0)
+        if extra != 0:
+            if extra < 3:
+                surcharge += extra * 20
+            elif extra < 4:
+                surcharge += (extra - 1) * 20 + 40
+            else:
+                surcharge += 20 + 20 + 40 + (extra - 3) * 20
+
+    if 200 < max_dim <= 240:
+        surcharge += 70
+    elif 240 < max_dim <= 300:
+        surcharge += 150
+    return surcharge
+
+
+def _packing(row) -> float:
+    max_dim = max(row.get(c, 0) for c in ("height", "width", "depth"))
+    if row.get("subtotal_excl_vat", 0) <= 750:
+        return 0
+    cost = 50
+    if max_dim < 100:
+        cost += 170
+    elif max_dim <= 130:
+        cost += 190
+    elif max_dim <= 160:
+        cost += 220
+    elif max_dim <= 200:
+        cost += 240
+    elif max_dim <= 220:
+        cost += 280
+    if row.get("is_wooden"):
+        cost += row.get("number_of_items", 1) * 20
+    return cost
+
+
+def _shipments(rows: int = 400, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    categories = CHAIRS_AFTER_2 + ["dining-chairs", "garden-chairs", "sofas", "garden-chairs-and-armchairs", ""]
+    return pd.DataFrame([
+        {
+            "Order ID":          f"order-{i}",
+            "seller_country":    rng.choice(["NL", "NL", "NL", "BE"]),
+            "seller_post_code":  f"{rng.randint(1000, 1020)}",
+            "buyer_country":     rng.choice(["NL", "BE", "DE", "FR", "IT"]),
+            "buyer_post_code":   f"{rng.randint(10000, 10100)}",
+            "cat_level_2_and_3": rng.choice(categories),
+            "number_of_items":   rng.randint(1, 14),
+            "height":            rng.choice([50, 99, 100, 130, 131, 160, 200, 201, 220, 240, 241, 300, 301]),
+            "width":             rng.randint(20, 250),
+            "depth":             rng.randint(20, 120),
+            "subtotal_excl_vat": rng.choice([0, 500, 750, 750.01, 1200, 3000]),
+            "is_wooden":         rng.random() < 0.3,
+        }
+        for i in range(rows)
+    ])
+
+
+class MagicMoversCostTests(SimpleTestCase):
+    """Vectorized costs match the row-wise versions they replaced."""
+
+    def setUp(self):
+        self.df = _shipments()
+        self.calculator = MagicMoversDeltaCalculator(pd.DataFrame(), pd.DataFrame())
+        self.calculator.geo = StubGeo()
+
+    def test_transport_cost(self):
+        expected = [_transport(row, self.calculator.geo) for _, row in self.df.iterrows()]
+        np.testing.assert_array_equal(self.calculator.calculate_transport_cost(self.df), expected)
+
+    def test_only_nl_to_de_fr_routes_are_looked_up(self):
+        self.calculator.calculate_transport_cost(self.df)
+        (routes,) = self.calculator.geo.calls
+        self.assertTrue(all(r[0] == "NL" and r[2] in ("DE", "FR") for r in routes))
+
+    def test_surcharge(self):
+        expected = [_surcharge(row) for _, row in self.df.iterrows()]
+        with contextlib.redirect_stdout(io.StringIO()):
+            np.testing.assert_array_equal(self.calculator.calculate_surcharge(self.df), expected)
+
+    def test_packing_cost(self):
+        expected = [_packing(row) for _, row in self.df.iterrows()]
+        np.testing.assert_array_equal(self.calculator.calculate_packing_cost(self.df), expected)
@@ -0,0 +1,70 @@
+#backend/logistics/tests/test_migrations.py
+import datetime
+from decimal import Decimal
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from logistics.models import InvoiceRun, RollupBuyerCountry, RollupCategoryWeight, RollupPartnerMonth, RollupRoute
+from logistics.services.analytics_rollups import AnalyticsRollups
+
+LINES = [
+    # route, category, weight, delta, invoice date
+    ("NL-NL",  "sofas",  "10.00", "12.50", datetime.date(2025, 1, 31)),
+    ("NL-NL",  "sofas",  "10.00", "7.25",  datetime.date(2025, 2, 3)),
+    ("BE-NL",  "chairs", "5.00",  "3.00",  datetime.date(2025, 2, 3)),
+    ("",       "chairs", "5.00",  "1.00",  datetime.date(2025, 2, 3)),
+    ("NL-BE",  "sofas",  "10.00", "-4.00", datetime.date(2025, 2, 3)),
+]
+
+
+def _rollups(run_id):
+    return {
+        "partner_month": sorted(RollupPartnerMonth.objects.filter(run_id=run_id).values_list("partner", "month", "total_over", "over_count")),
+        "route":         sorted(RollupRoute.objects.filter(run_id=run_id).values_list("route", "total_over", "over_count")),
+        "buyer_country": sorted(RollupBuyerCountry.objects.filter(run_id=run_id).values_list("buyer_country", "total_over", "over_count")),
+        "category":      sorted(RollupCategoryWeight.objects.filter(run_id=run_id).values_list("category", "weight", "total_over", "over_count")),
+    }
+
+
+class BackfillRollupsMigrationTests(TransactionTestCase):
+    """0004 backfills the same rollups AnalyticsRollups.rebuild() writes."""
+
+    before = [("logistics", "0003_geo_cache")]
+    after  = [("logistics", "0004_analytics_rollups")]
+
+    def _migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self._migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_backfill_matches_service(self):
+        apps = self._migrate(self.before)
+        OldRun  = apps.get_model("logistics", "InvoiceRun")
+        OldLine = apps.get_model("logistics", "InvoiceLine")
+        runs = [
+            OldRun.objects.create(partner=partner, invoice_number=f"INV-{partner}", delta_sum=0, parsed_ok=True, num_rows=len(LINES))
+            for partner in ("brenger", "tadde")
+        ]
+        for run in runs:
+            OldLine.objects.bulk_create([
+                OldLine(
+                    run=run, order_creation_date=datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc), order_id=f"order-{i}",
+                    weight=Decimal(weight), route=route, category_lvl_1_and_2=category, category_lvl_2_and_3=category,
+                    price_expected=Decimal("50"), delta=Decimal(delta), delta_sum=Decimal("0"),
+                    invoice_date=invoice_date, invoice_number=run.invoice_number,
+                )
+                for i, (route, category, weight, delta, invoice_date) in enumerate(LINES)
+            ])
+
+        self._migrate(self.after)
+        backfilled = {run.pk: _rollups(run.pk) for run in runs}
+        self.assertEqual(len(backfilled[runs[0].pk]["route"]), 3)
+
+        self._migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+        for run in InvoiceRun.objects.filter(pk__in=backfilled):
+            AnalyticsRollups().rebuild(run)
+            self.assertEqual(_rollups(run.pk), backfilled[run.pk])
@@ -0,0 +1,143 @@
+#backend/logistics/tests/test_orders.py
+import contextlib
+import io
+import tracemalloc
+import uuid
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase, TestCase
+from logistics.models import InvoiceRun
+from logistics.services.database_service import ORDERS_COLUMNS, DatabaseService
+from logistics.services.delta_checker import DeltaChecker
+
+
+class EmptyOrdersDatabase(DatabaseService):
+    """No external database: every query returns `result` (no rows by default)."""
+
+    def __init__(self, result=None):
+        self.result = pd.DataFrame(columns=ORDERS_COLUMNS) if result is None else result
+        self.queries = []
+
+    def execute_query_with_retries(self, query, params=None, **kwargs):
+        self.queries.append(params)
+        return self.result.copy()
+
+
+class StaleSnapshot:
+    def get_if_fresh(self):
+        return None
+
+    def get(self):
+        raise AssertionError("the invoice has keys, the full window must not be loaded")
+
+
+class CachedInvoice:
+    """Parsed invoice cache that always hits, so no invoice file is needed."""
+
+    def __init__(self, df_invoice):
+        self.df_invoice = df_invoice
+
+    def make_key(self, *args):
+        return "key"
+
+    def get(self, key):
+        return self.df_invoice.copy()
+
+    def set(self, key, df):
+        pass
+
+
+class PrepareOrdersTests(SimpleTestCase):
+    def test_empty_result_keeps_prepared_columns(self):
+        df = EmptyOrdersDatabase().get_orders_for_keys(order_ids=[str(uuid.uuid4())])
+        self.assertTrue(df.empty)
+        self.assertIn("Order ID", df.columns)
+        self.assertIn("buyer_country-seller_country", df.columns)
+        self.assertNotIn("order_id", df.columns)
+
+    def test_failed_query_gets_order_columns(self):
+        df = EmptyOrdersDatabase(result=pd.DataFrame()).get_orders_for_keys(tracking_ids=["T1"])
+        self.assertTrue(df.empty)
+        self.assertIn("Order ID", df.columns)
+        self.assertIn("buyer_country-seller_country", df.columns)
+
+
+def _chunks(count, size):
+    """Numeric chunks laid out as one 2-D block, like from_records builds them, generated lazily."""
+    for k in range(count):
+        yield pd.DataFrame(np.arange(k * size * 4, (k + 1) * size * 4, dtype=float).reshape(size, 4), columns=list("abcd"))
+
+
+def _peak(fn, chunks):
+    tracemalloc.start()
+    try:
+        df = fn(chunks)
+        return df, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class ConcatChunksTests(SimpleTestCase):
+    def test_same_as_concat(self):
+        chunks = [
+            pd.DataFrame({"a": [1, 2], "b": [None, None], "c": ["x", "y"]}),
+            pd.DataFrame({"a": [3.5], "b": ["z"], "c": [None]}),
+        ]
+        pd.testing.assert_frame_equal(
+            DatabaseService._concat_chunks(iter(chunks)),
+            pd.concat(chunks, ignore_index=True),
+        )
+
+    def test_single_empty_chunk_keeps_columns(self):
+        df = DatabaseService._concat_chunks(iter([pd.DataFrame(columns=ORDERS_COLUMNS)]))
+        self.assertTrue(df.empty)
+        self.assertEqual(list(df.columns), ORDERS_COLUMNS)
+
+    def test_chunks_are_not_all_held_next_to_the_result(self):
+        listed, listed_peak = _peak(lambda chunks: pd.concat(list(chunks), ignore_index=True), _chunks(100, 1000))
+        joined, joined_peak = _peak(DatabaseService._concat_chunks, _chunks(100, 1000))
+        pd.testing.assert_frame_equal(joined, listed)
+        # all chunks plus the result vs the result plus one column
+        self.assertLess(joined_peak, 0.75 * listed_peak)
+
+
+class EmptyOrdersRunTests(TestCase):
+    """An invoice none of whose orders are in the window is stored as an empty run."""
+
+    def _evaluate(self, partner, df_invoice):
+        db = EmptyOrdersDatabase()
+        checker = DeltaChecker(
+            db_service=db,
+            order_snapshot=StaleSnapshot(),
+            invoice_cache=CachedInvoice(df_invoice),
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = checker.evaluate(partner, [], b"invoice")
+        self.assertEqual(len(db.queries), 1)
+        return result, checker.last_run
+
+    def test_swdevries(self):
+        df_invoice = pd.DataFrame({
+            "Order ID":        [str(uuid.uuid4()), str(uuid.uuid4())],
+            "price_swdevries": [80.0, 95.0],
+            "Invoice date":    [pd.Timestamp("2025-03-01")] * 2,
+            "Invoice number":  ["SW-1"] * 2,
+        })
+        (delta_ok, parsed_ok, df_merged), run = self._evaluate("swdevries", df_invoice)
+        self.assertTrue(delta_ok)
+        self.assertIsNotNone(df_merged)
+        self.assertTrue(df_merged.empty)
+        self.assertEqual(InvoiceRun.objects.get(pk=run.pk).num_rows, 0)
+
+    def test_brenger(self):
+        df_invoice = pd.DataFrame({
+            "id":             ["T1", "T2"],
+            "price_brenger":  [60.0, 70.0],
+            "Invoice date":   [pd.Timestamp("2025-03-01")] * 2,
+            "Invoice number": ["BR-1"] * 2,
+        })
+        (delta_ok, parsed_ok, df_merged), run = self._evaluate("brenger", df_invoice)
+        self.assertTrue(delta_ok)
+        self.assertIsNotNone(df_merged)
+        self.assertTrue(df_merged.empty)
+        self.assertEqual(run.partner, "brenger")
@@ -0,0 +1,50 @@
+#backend/logistics/tests/test_pdf_text.py
+import contextlib
+import io
+import multiprocessing
+import billiard
+import pymupdf
+from django.test import SimpleTestCase
+from logistics.parsers.pdf_text import extract_page_lines, iter_page_lines
+
+
+def _pdf(pages: int) -> bytes:
+    doc = pymupdf.open()
+    for i in range(pages):
+        page = doc.new_page()
+        for j in range(20):
+            page.insert_text((50, 72 + j * 15), f"page {i} line {j}")
+    return doc.tobytes()
+
+
+def _extract_in_worker_child(pdf_bytes, results):
+    # what a Celery prefork child sees: a daemonic process
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        lines = extract_page_lines(pdf_bytes, max_workers=2)
+    results.put((multiprocessing.current_process().daemon, lines, out.getvalue()))
+
+
+class ExtractPageLinesTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pdf_bytes = _pdf(30)
+        cls.expected = list(iter_page_lines(cls.pdf_bytes))
+
+    def test_serial_and_parallel_agree(self):
+        self.assertEqual(len(self.expected), 30)
+        self.assertEqual(self.expected[3][0], "page 3 line 0")
+        self.assertEqual(extract_page_lines(self.pdf_bytes, max_workers=1), self.expected)
+        self.assertEqual(extract_page_lines(self.pdf_bytes, max_workers=2), self.expected)
+
+    def test_parallel_inside_daemonic_worker_child(self):
+        results = billiard.Queue()
+        child = billiard.Process(target=_extract_in_worker_child, args=(self.pdf_bytes, results), daemon=True)
+        child.start()
+        daemon, lines, output = results.get(timeout=60)
+        child.join(timeout=10)
+
+        self.assertTrue(daemon)
+        self.assertEqual(lines, self.expected)
+        self.assertNotIn("extracting serially", output)
@@ -0,0 +1,156 @@
+#backend/logistics/tests/test_price_table.py
+import contextlib
+import io
+import os
+import random
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.test import SimpleTestCase
+from logistics.delta.brenger import BrengerDeltaCalculator
+from logistics.delta.price_table import PriceTable
+from logistics.delta.swdevries import SwdevriesDeltaCalculator
+from logistics.delta.tadde import TaddeDeltaCalculator
+
+CHANGE_PRICE_DATE = pd.Timestamp("2025-02-01")
+
+
+def _read_price_list(name: str, format_weights: bool) -> pd.DataFrame:
+    df = pd.read_json(os.path.join(settings.PRICING_DATA_PATH, name))
+    if format_weights:
+        df["Weightclass"] = df["Weightclass"].astype(float).apply(lambda x: format(x, '.2f'))
+    return df
+
+
+# Reference implementations: the row-by-row scans the calculators used
+# before PriceTable. Prices must come out identical.
+
+def _scan_brenger(df_merged: pd.DataFrame, df_price: pd.DataFrame) -> list:
+    prices = []
+    for _, row in df_merged.iterrows():
+        category = row["cat_level_2_and_3"]
+        if not category:
+            category = row["cat_level_1_and_2"]
+        route = row["buyer_country-seller_country"]
+        if route not in ["NL-NL", "BE-NL", "NL-BE", "BE-BE"]:
+            route = "NL-NL"
+        matched_price = 0
+        for _, price_row in df_price.iterrows():
+            if price_row["CMS category"] == category and price_row["Weightclass"] == row["weight"]:
+                matched_price = price_row.get(route, 0)
+                break
+        prices.append(matched_price)
+    return prices
+
+
+def _scan_dated(df_merged: pd.DataFrame, df_price: pd.DataFrame, suffix: str) -> list:
+    prices = []
+    for _, row in df_merged.iterrows():
+        route = row.get("buyer_country-seller_country")
+        matched_price = 0
+        for _, price_row in df_price.iterrows():
+            if price_row["CMS category"] == row.get("cat_level_2_and_3") and price_row["Weightclass"] == row.get("weight"):
+                if row.get("order_creation_date") < CHANGE_PRICE_DATE and f"{route}-OLD" in price_row:
+                    column_key = f"{route}-OLD{suffix}"
+                else:
+                    column_key = f"{route}{suffix}"
+                matched_price = price_row.get(column_key, matched_price)
+                break
+        prices.append(matched_price)
+    return prices
+
+
+def _quiet():
+    # the calculators print their merged frames
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def _frames(df_price: pd.DataFrame, partner: str, routes: list, rows: int = 300, seed: int = 0):
+    """Invoice and prepared orders for `rows` shipments, some of them outside the price list."""
+    rng = random.Random(seed)
+    keys = list(df_price[["CMS category", "Weightclass"]].itertuples(index=False, name=None))
+    orders, invoice = [], []
+    for i in range(rows):
+        category, weight = rng.choice(keys)
+        if rng.random() < 0.1:
+            category = "unknown-category"
+        if rng.random() < 0.1:
+            weight = 999
+        order_id = f"order-{i}"
+        orders.append({
+            "Order ID":                     order_id,
+            "tracking_id":                  f"T{i}",
+            "external_courier_provider":    partner,
+            "cat_level_1_and_2":            category,
+            "cat_level_2_and_3":            "" if rng.random() < 0.1 else category,
+            "weight":                       format(float(weight), ".2f"),
+            "order_creation_date":          CHANGE_PRICE_DATE + pd.Timedelta(days=rng.randint(-60, 60)),
+            "buyer_country-seller_country": rng.choice(routes),
+        })
+        invoice.append({
+            "Order ID":          order_id,
+            "id":                f"T{i}",
+            f"price_{partner}":  float(rng.randint(20, 400)),
+            "Invoice date":      pd.Timestamp("2025-03-01"),
+            "Invoice number":    "INV-1",
+        })
+    return pd.DataFrame(invoice), pd.DataFrame(orders)
+
+
+class PriceTableTests(SimpleTestCase):
+    def test_first_matching_row_wins(self):
+        table = PriceTable(pd.DataFrame({
+            "CMS category": ["sofas", "sofas", "chairs"],
+            "Weightclass":  [10, 10.0, 5],
+            "NL-NL":        [50, 60, 20],
+        }))
+        prices = table.lookup(["sofas", "chairs", "lamps"], ["10.00", 5.0, 1], ["NL-NL", "NL-NL", "NL-NL"])
+        np.testing.assert_array_equal(prices, [50, 20, 0])
+
+    def test_missing_column_uses_default(self):
+        table = PriceTable(pd.DataFrame({"CMS category": ["sofas"], "Weightclass": [10], "NL-NL": [50]}))
+        np.testing.assert_array_equal(table.lookup(["sofas"], [10], ["DE-NL"], default=-1), [-1])
+        np.testing.assert_array_equal(table.has_column(["NL-NL", "DE-NL"]), [True, False])
+
+    def test_empty_lookup(self):
+        table = PriceTable(pd.DataFrame({"CMS category": ["sofas"], "Weightclass": [10], "NL-NL": [50]}))
+        self.assertEqual(len(table.lookup([], [], [])), 0)
+
+
+class CalculatorEquivalenceTests(SimpleTestCase):
+    """Calculators priced through PriceTable match the old row-by-row scans."""
+
+    def assertPricesEqual(self, df_merged, expected):
+        np.testing.assert_array_equal(
+            df_merged["price"].to_numpy(dtype=float),
+            pd.to_numeric(pd.Series(expected), errors="coerce").to_numpy(dtype=float),
+        )
+
+    def test_brenger(self):
+        df_price = _read_price_list("prijslijst_brenger.json", format_weights=False)
+        df_invoice, df_order = _frames(df_price, "brenger", ["NL-NL", "NL-BE", "BE-BE", "DE-NL", "FR-FR"])
+        df_invoice = df_invoice.drop(columns=["Order ID"])  # Brenger invoices only carry tracking ids
+        with _quiet():
+            df_merged, _, _ = BrengerDeltaCalculator(df_invoice, df_order).compute()
+
+        reference = df_invoice.merge(df_order, left_on="id", right_on="tracking_id", how="inner")
+        reference["weight"] = reference["weight"].astype(float).round(2)
+        self.assertPricesEqual(df_merged, _scan_brenger(reference, df_price))
+
+    def test_swdevries(self):
+        df_price = _read_price_list("prijslijst_other_partners.json", format_weights=True)
+        df_invoice, df_order = _frames(df_price, "swdevries", ["NL-NL", "NL-BE", "BE-NL", "DE-NL"])
+        with _quiet():
+            df_merged, _, _ = SwdevriesDeltaCalculator(df_invoice, df_order).compute()
+
+        reference = df_invoice.merge(df_order, on="Order ID", how="inner")
+        self.assertPricesEqual(df_merged, _scan_dated(reference, df_price, "-swdevries"))
+
+    def test_tadde(self):
+        df_price = _read_price_list("prijslijst_tadde.json", format_weights=True)
+        df_invoice, df_order = _frames(df_price, "tadde", ["FR-FR", "FR-BE", "FR-NL", "NL-NL"])
+        with _quiet():
+            df_merged, _, _ = TaddeDeltaCalculator(df_invoice, df_order).compute()
+
+        reference = df_invoice.merge(df_order, on="Order ID", how="inner")
+        self.assertPricesEqual(df_merged, _scan_dated(reference, df_price, ""))
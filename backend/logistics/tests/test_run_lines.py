@@ -0,0 +1,75 @@
+#backend/logistics/tests/test_run_lines.py
+import csv
+import io
+import json
+from django.conf import settings
+from django.test import TestCase
+from django.urls import reverse
+from logistics.models import InvoiceRun
+from logistics.services.line_writer import InvoiceLineWriter
+from logistics.services.run_lines import RunLines
+from logistics.tests.test_line_writer import delta_frame
+
+
+class RunLinesTests(TestCase):
+    def _run(self, partner: str, rows: int = 5) -> InvoiceRun:
+        run = InvoiceRun.objects.create(partner=partner, invoice_number="INV-1", delta_sum=0, parsed_ok=True, num_rows=rows)
+        InvoiceLineWriter().write(run, delta_frame(partner, rows), partner, "INV-1")
+        return run
+
+    def test_records_use_calculator_keys(self):
+        record = RunLines(self._run("brenger")).page(0, 1)[0]
+        self.assertEqual(record["Order ID"], "order-0")
+        self.assertEqual(record["price_brenger"], 55.0)
+        self.assertEqual(record["Delta"], 5.0)
+        self.assertEqual(record["Invoice date"], "2025-03-01")
+        self.assertEqual(record["Invoice number"], "INV-1")
+        self.assertEqual(record["partner"], "brenger")
+
+    def test_libero_price_round_trips(self):
+        record = RunLines(self._run("libero")).page(0, 1)[0]
+        self.assertEqual(record["price_libero_logistics"], 55.0)
+        self.assertNotIn("price_libero", record)
+
+    def test_page(self):
+        lines = RunLines(self._run("brenger"))
+        self.assertEqual(lines.count(), 5)
+        self.assertEqual([r["Order ID"] for r in lines.page(3, 10)], ["order-3", "order-4"])
+
+    def test_downloads_match_pages(self):
+        lines = RunLines(self._run("brenger"), chunk_size=2)
+        records = lines.page(0, 10)
+
+        ndjson = [json.loads(line) for line in "".join(lines.iter_ndjson()).splitlines()]
+        self.assertEqual(ndjson, records)
+
+        chunks = list(lines.iter_csv())
+        self.assertEqual(len(chunks), 3)
+        rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+        self.assertEqual(list(rows[0]), lines.columns)
+        self.assertEqual([row["Order ID"] for row in rows], [r["Order ID"] for r in records])
+
+
+class RunLinesViewTests(TestCase):
+    def setUp(self):
+        self.run = InvoiceRun.objects.create(partner="brenger", invoice_number="INV-1", delta_sum=0, parsed_ok=True, num_rows=5)
+        InvoiceLineWriter().write(self.run, delta_frame("brenger"), "brenger", "INV-1")
+        self.url = reverse("logistics:run-lines", args=[self.run.pk])
+
+    def _get(self, url, **params):
+        return self.client.get(url, params, HTTP_HOST=settings.ALLOWED_HOSTS[0])
+
+    def test_page(self):
+        body = self._get(self.url, limit=2, offset=1).json()
+        self.assertEqual(body["count"], 5)
+        self.assertEqual([r["Order ID"] for r in body["results"]], ["order-1", "order-2"])
+
+    def test_download(self):
+        response = self._get(self.url, download="ndjson")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="brenger_INV-1.ndjson"')
+        self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 5)
+
+    def test_bad_requests(self):
+        self.assertEqual(self._get(self.url, download="xlsx").status_code, 400)
+        self.assertEqual(self._get(self.url, limit="x").status_code, 400)
+        self.assertEqual(self._get(reverse("logistics:run-lines", args=[self.run.pk + 1])).status_code, 404)
@@ -0,0 +1,39 @@
+#backend/logistics/tests/test_slack_views.py
+import contextlib
+import io
+from unittest import mock
+import redis
+from django.conf import settings
+from django.test import SimpleTestCase
+from django.urls import reverse
+from logistics.services.slack_store import slack_store
+
+
+class DownRedis:
+    """Every command fails as if the Redis server were unreachable."""
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            raise redis.ConnectionError("Error 111 connecting to localhost:6379. Connection refused.")
+        return command
+
+
+class SlackStoreUnavailableTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(slack_store, "client", DownRedis())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _get(self, url, **params):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.client.get(url, params, HTTP_HOST=settings.ALLOWED_HOSTS[0])
+
+    def test_messages(self):
+        response = self._get(reverse("logistics:slack-messages"))
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("error", response.json())
+
+    def test_thread(self):
+        response = self._get(reverse("logistics:slack-threads"), thread_ts="1700000000.000100")
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("error", response.json())
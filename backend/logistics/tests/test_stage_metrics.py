@@ -0,0 +1,45 @@
+#backend/logistics/tests/test_stage_metrics.py
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from logistics.models import InvoiceRun, InvoiceRunStage
+from logistics.services.stage_metrics import StageMetrics
+
+
+class StageMetricsTests(TestCase):
+    def setUp(self):
+        run = InvoiceRun.objects.create(partner="brenger", delta_sum=0, parsed_ok=True, num_rows=10)
+        old = [InvoiceRunStage.objects.create(run=run, stage="parse", seconds=s, rows=10) for s in (100.0, 200.0)]
+        for s in (1.0, 2.0, 3.0):
+            InvoiceRunStage.objects.create(run=run, stage="parse", seconds=s, rows=10, max_rss_mb=2.0)
+        # recorded before the window
+        InvoiceRunStage.objects.filter(pk__in=[stage.pk for stage in old]).update(
+            created=timezone.now() - timedelta(days=30)
+        )
+
+    def _metrics(self):
+        lines = StageMetrics().render(since=timezone.now() - timedelta(days=1)).splitlines()
+        return dict(line.rsplit(" ", 1) for line in lines if not line.startswith("#"))
+
+    def test_quantiles_over_the_window(self):
+        metrics = self._metrics()
+        labels = 'partner="brenger",stage="parse"'
+        self.assertEqual(metrics[f'invoice_stage_duration_seconds{{{labels},quantile="0.5"}}'], "2")
+        self.assertEqual(metrics[f'invoice_stage_duration_seconds{{{labels},quantile="0.95"}}'], "3")
+
+    def test_sum_and_count_are_cumulative(self):
+        metrics = self._metrics()
+        labels = 'partner="brenger",stage="parse"'
+        self.assertEqual(metrics[f"invoice_stage_duration_seconds_sum{{{labels}}}"], "306")
+        self.assertEqual(metrics[f"invoice_stage_duration_seconds_count{{{labels}}}"], "5")
+        self.assertEqual(metrics[f"invoice_stage_rows_count{{{labels}}}"], "5")
+        # stages without a memory reading are not counted
+        self.assertEqual(metrics[f"invoice_stage_max_rss_bytes_sum{{{labels}}}"], str(6 * 2**20))
+        self.assertEqual(metrics[f"invoice_stage_max_rss_bytes_count{{{labels}}}"], "3")
+
+    def test_stage_outside_the_window_keeps_its_totals(self):
+        InvoiceRunStage.objects.filter(seconds__lt=100).update(created=timezone.now() - timedelta(days=30))
+        metrics = self._metrics()
+        labels = 'partner="brenger",stage="parse"'
+        self.assertNotIn(f'invoice_stage_duration_seconds{{{labels},quantile="0.5"}}', metrics)
+        self.assertEqual(metrics[f"invoice_stage_duration_seconds_count{{{labels}}}"], "5")
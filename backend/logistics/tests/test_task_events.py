@@ -0,0 +1,131 @@
+#backend/logistics/tests/test_task_events.py
+import json
+import queue
+from unittest import mock
+from django.conf import settings
+from django.test import SimpleTestCase
+from django.urls import reverse
+from logistics.services.task_events import TaskEvents
+
+
+class FakePubSub:
+    def __init__(self, server):
+        self.server = server
+        self.messages = queue.Queue()
+
+    def subscribe(self, channel):
+        self.server.subscribers.setdefault(channel, []).append(self)
+
+    def get_message(self, timeout=0.0):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        for subscribers in self.server.subscribers.values():
+            if self in subscribers:
+                subscribers.remove(self)
+
+
+class FakePipeline:
+    def __init__(self, server):
+        self.server = server
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    def execute(self):
+        return [getattr(self.server, name)(*args) for name, args in self.commands]
+
+
+class FakeRedis:
+    """The lists and pub/sub commands TaskEvents uses, in memory."""
+
+    def __init__(self):
+        self.lists, self.subscribers = {}, {}
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value.encode())
+        return len(self.lists[key])
+
+    def lrange(self, key, start, stop):
+        return list(self.lists.get(key, []))
+
+    def expire(self, key, seconds):
+        return True
+
+    def publish(self, channel, message):
+        for pubsub in self.subscribers.get(channel, []):
+            pubsub.messages.put({"type": "message", "data": message.encode()})
+        return len(self.subscribers.get(channel, []))
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self)
+
+
+class TaskEventsTests(SimpleTestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.events = TaskEvents(client=self.redis)
+
+    def _names(self, stream):
+        return [None if event is None else event["event"] for event in stream]
+
+    def test_late_client_gets_the_replay(self):
+        for name in ("started", "parsed", "priced"):
+            self.events.publish("t1", name)
+        self.events.publish("t1", "result", result={"ok": True})
+
+        events = list(self.events.stream("t1", timeout=1, heartbeat=0.01))
+        self.assertEqual([e["event"] for e in events], ["started", "parsed", "priced", "result"])
+        self.assertEqual([e["seq"] for e in events], [1, 2, 3, 4])
+        self.assertEqual(events[-1]["result"], {"ok": True})
+
+    def test_replay_then_live_without_duplicates(self):
+        self.events.publish("t1", "started")
+        stream = self.events.stream("t1", timeout=5, heartbeat=0.01)
+        self.assertEqual(next(stream)["event"], "started")
+
+        # published between subscribing and reading the replay: on the channel too
+        self.redis.publish("task-events:t1", json.dumps({"event": "started", "seq": 1}))
+        self.events.publish("t1", "parsed")
+        self.events.publish("t1", "error", error="boom")
+
+        rest = [event for event in stream if event is not None]
+        self.assertEqual([(e["event"], e["seq"]) for e in rest], [("parsed", 2), ("error", 3)])
+
+    def test_heartbeat_and_timeout(self):
+        names = self._names(self.events.stream("t2", timeout=0.05, heartbeat=0.01))
+        self.assertTrue(names)
+        self.assertEqual(set(names), {None})
+        self.assertEqual(self.redis.subscribers["task-events:t2"], [])
+
+    def test_publish_without_task_id(self):
+        self.events.publish("", "started")
+        self.assertEqual(self.redis.lists, {})
+
+
+class TaskEventsViewTests(SimpleTestCase):
+    def test_stream(self):
+        events = TaskEvents(client=FakeRedis())
+        events.publish("t1", "started")
+        events.publish("t1", "result", result={"run_id": 7})
+
+        with mock.patch("logistics.views.task_events", events):
+            response = self.client.get(reverse("logistics:task-events"), {"task_id": "t1"}, HTTP_HOST=settings.ALLOWED_HOSTS[0])
+            body = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        blocks = body.strip().split("\n\n")
+        self.assertEqual(blocks[0], "retry: 3000")
+        self.assertTrue(blocks[1].startswith("event: started\nid: 1\ndata: "))
+        self.assertEqual(json.loads(blocks[2].split("data: ", 1)[1])["result"], {"run_id": 7})
+
+    def test_missing_task_id(self):
+        response = self.client.get(reverse("logistics:task-events"), HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        self.assertEqual(response.status_code, 400)
@@ -1,15 +1,19 @@
 #backend/logistics/urls.py
 from django.urls import path
-from .views import CheckDeltaView, UploadInvoiceFile, TaskStatusView, TaskResultView, AnalyticsView, SlackMessagesView, SlackThreadView, SlackReactView, PricingMetadataView, PricingLookupView, SlackFileDownloadView
+from .views import CheckDeltaView, CheckDeltaBatchView, UploadInvoiceFile, TaskStatusView, TaskResultView, TaskEventsView, RunLinesView, StageMetricsView, AnalyticsView, SlackMessagesView, SlackThreadView, SlackReactView, PricingMetadataView, PricingLookupView, SlackFileDownloadView
 
 app_name = "logistics"
 
 urlpatterns = [
     path("upload/", UploadInvoiceFile.as_view(), name="upload-invoice"),
     path("check-delta/", CheckDeltaView.as_view(), name="check-delta"),
+    path("check-delta/batch/", CheckDeltaBatchView.as_view(), name="check-delta-batch"),
     path("task-status/", TaskStatusView.as_view(), name="task-status"),
     path("task-result/", TaskResultView.as_view(), name="task-result"),
+    path("task-events/", TaskEventsView.as_view(), name="task-events"),
+    path("runs/<int:run_id>/lines/", RunLinesView.as_view(), name="run-lines"),
     path("analytics/", AnalyticsView.as_view(), name="analytics"),
+    path("metrics/", StageMetricsView.as_view(), name="stage-metrics"),
     path("slack/messages/", SlackMessagesView.as_view(), name="slack-messages"),
     path("slack/threads/",  SlackThreadView.as_view(), name="slack-threads"),
     path("slack/react/", SlackReactView.as_view(), name="slack-react"),
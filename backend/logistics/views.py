@@ -1,30 +1,28 @@
 # backend/logistics/views.py
-import uuid
-import redis
-import os
-import pandas as pd
 import json
 import logging
-import requests
-from collections import defaultdict
 from django.conf import settings
-from celery import chain
 from celery.result import AsyncResult
 from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView
-from django.db.models import Avg, Sum, Count, F, FloatField, ExpressionWrapper, Value, Func
-from django.db.models.functions import Cast, TruncMonth
-from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseServerError
-
-from logistics.models import InvoiceRun, InvoiceLine
-
-from .tasks import load_invoice_bytes, evaluate_delta#, export_sheet
-from .services.slack_service import SlackService
-from slack_sdk.errors import SlackApiError
-
-redis_client = redis.from_url(settings.REDIS_URL)
+from django.views import View
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseServerError, StreamingHttpResponse
+
+from logistics.models import InvoiceRun
+
+from .tasks import evaluate_invoice, dispatch_invoice_batch
+from .services.pricing_registry import pricing_registry
+from .services.analytics_cache import analytics_cache
+from .services.analytics_queries import AnalyticsQuery
+from .services.run_lines import RunLines
+from .services.stage_metrics import stage_metrics
+from .services.task_events import task_events, FINAL_EVENTS
+from .services.upload_store import upload_store
+
+# slack_sdk and requests are imported inside the Slack views: most workers
+# never serve them and should not pay for the import at startup
 logger = logging.getLogger(__name__)
 
 class UploadInvoiceFile(APIView):
@@ -41,9 +39,8 @@ class UploadInvoiceFile(APIView):
 
         for f in files:
             ext = f.name.rsplit(".", 1)[-1].lower()
-            key = str(uuid.uuid4())
-            raw = f.read()
-            redis_client.setex(f"upload:{key}", 600, raw)
+            # streamed chunk by chunk into the upload store
+            key = upload_store.save(f.chunks())
             if ext in ("xlsx", "xls"):
                 redis_key = key
             elif ext == "pdf":
@@ -57,8 +54,8 @@ class UploadInvoiceFile(APIView):
 
 class CheckDeltaView(APIView):
     """
-    Instead of firing only the wrapper task, build and dispatch the chain
-    and return *that* chain’s ID so the front-end polls the real long-running job.
+    Dispatch evaluate_invoice with the upload keys and return its task id,
+    which the front-end follows on task-events (or polls on task-status).
     """
 
     def post(self, request):
@@ -71,20 +68,44 @@ class CheckDeltaView(APIView):
             return Response({"error": "Missing required fields."},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        # Build & launch the exact same chain as your wrapper did:
-        job = chain(
-            load_invoice_bytes.s(redis_key, redis_key_pdf),
-            evaluate_delta.s(partner, delta_threshold)
-            #export_sheet.s(partner)
-        )()
+        # one task; only the keys travel through the broker
+        job = evaluate_invoice.delay(partner, redis_key, redis_key_pdf or "", delta_threshold)
 
-        # Return the *chain* ID (i.e. the ID of the last sub-task)
         return Response({"task_id": job.id}, status=status.HTTP_202_ACCEPTED)
 
 
+class CheckDeltaBatchView(APIView):
+    """
+    POST /logistics/check-delta/batch/
+    Body: { invoices: [{partner, redis_key, redis_key_pdf?}, ...], delta_threshold? }
+    Evaluates every invoice in parallel against one shared orders snapshot.
+    Returns: { batch_id, task_ids } — follow batch_id on task-events (one
+    `invoice` event per finished invoice, then the combined `result`) or
+    fetch its summary from task-result.
+    """
+
+    def post(self, request):
+        invoices        = request.data.get("invoices")
+        delta_threshold = float(request.data.get("delta_threshold", 20.0))
+
+        if not isinstance(invoices, list) or not invoices:
+            return Response({"error": "invoices must be a non-empty list."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(invoices) > settings.BATCH_MAX_INVOICES:
+            return Response({"error": f"At most {settings.BATCH_MAX_INVOICES} invoices per batch."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        for i, invoice in enumerate(invoices):
+            if not isinstance(invoice, dict) or not invoice.get("partner") or not invoice.get("redis_key"):
+                return Response({"error": f"Invoice {i} is missing partner or redis_key."},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        batch = dispatch_invoice_batch(invoices, delta_threshold)
+        return Response(batch, status=status.HTTP_202_ACCEPTED)
+
+
 class TaskStatusView(APIView):
     """
-    Poll the real chain ID until it reaches SUCCESS or FAILURE.
+    Poll the task ID until it reaches SUCCESS or FAILURE.
     """
 
     def get(self, request):
@@ -124,128 +145,168 @@ class TaskResultView(APIView):
 
         return Response(result, status=status.HTTP_200_OK)
 
-class AnalyticsView(APIView):
+class TaskEventsView(View):
     """
-    Returns comprehensive analytics.
+    GET /logistics/task-events/?task_id=…
+    Server-Sent Events stream of a task's progress (started, parsed,
+    matched, priced, persisted) ending with a `result` or `error` event, so
+    the client holds one connection instead of polling task-status and
+    task-result. A plain Django view: DRF content negotiation would reject
+    `Accept: text/event-stream`.
     """
+
     def get(self, request):
+        task_id = request.GET.get("task_id")
+        if not task_id:
+            return HttpResponseBadRequest("Missing task_id")
+
+        response = StreamingHttpResponse(self._events(task_id), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    @staticmethod
+    def _sse(event: dict) -> str:
+        lines = [f"event: {event['event']}"]
+        if "seq" in event:
+            lines.append(f"id: {event['seq']}")
+        lines.append(f"data: {json.dumps(event, default=str)}")
+        return "\n".join(lines) + "\n\n"
+
+    def _events(self, task_id):
+        # tell EventSource how long to wait before reconnecting
+        yield "retry: 3000\n\n"
+        for event in task_events.stream(
+            task_id,
+            timeout=settings.TASK_EVENTS_STREAM_TIMEOUT,
+            heartbeat=settings.TASK_EVENTS_HEARTBEAT,
+        ):
+            if event is not None:
+                yield self._sse(event)
+                if event["event"] in FINAL_EVENTS:
+                    return
+                continue
+
+            # quiet period: the task may have ended without publishing
+            # (failed before reporting, events expired), ask the backend
+            res = AsyncResult(task_id)
+            if res.state == "SUCCESS":
+                result = res.result or {}
+                final = {"event": "error", **result} if "error" in result else {"event": "result", "result": result}
+                yield self._sse(final)
+                return
+            if res.state == "FAILURE":
+                yield self._sse({"event": "error", "error": str(res.result)})
+                return
+            yield ": keep-alive\n\n"
+
+        yield self._sse({"event": "error", "error": "Timed out waiting for the task"})
+
+
+class StageMetricsView(View):
+    """
+    GET /logistics/metrics/
+    p50 / p95 duration, rows and memory per partner and pipeline stage in
+    the Prometheus text format, for scraping. A plain Django view: the
+    exposition format is not JSON.
+    """
+
+    def get(self, request):
+        return HttpResponse(
+            stage_metrics.render(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+
+class RunLinesView(APIView):
+    """
+    GET /logistics/runs/<run_id>/lines/
+    Query params: limit (default 500, max 5000), offset, or
+    download=ndjson|csv to stream every line of the run.
+    Returns: { run_id, partner, invoice_number, count, limit, offset, results }
+    """
+    DEFAULT_LIMIT = 500
+    MAX_LIMIT     = 5000
+
+    def get(self, request, run_id):
         try:
-            # Base querysets
-            runs  = InvoiceRun.objects.all()
-            lines = InvoiceLine.objects.all()
-
-            # 1) Totals & averages
-            total_runs        = runs.count()
-            avg_delta_per_run = runs.aggregate(avg=Avg("delta_sum"))["avg"] or 0.0
-
-            # 2) Top partner
-            top = (
-                runs.values("partner")
-                    .annotate(cnt=Count("id"))
-                    .order_by("-cnt")
-                    .first()
-            )
-            top_partner = top["partner"] if top else ""
+            run = InvoiceRun.objects.get(pk=run_id)
+        except InvoiceRun.DoesNotExist:
+            return Response({"error": f"Unknown run {run_id}"},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        lines = RunLines(run)
+        download = request.query_params.get("download")
+        if download in ("ndjson", "csv"):
+            filename = f"{run.partner}_{run.invoice_number or run.pk}.{download}"
+            if download == "ndjson":
+                response = StreamingHttpResponse(lines.iter_ndjson(), content_type="application/x-ndjson")
+            else:
+                response = StreamingHttpResponse(lines.iter_csv(), content_type="text/csv")
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return response
+        if download:
+            return Response({"error": "download must be 'ndjson' or 'csv'"},
+                            status=status.HTTP_400_BAD_REQUEST)
 
-            # 3) Positive‐delta lines
-            pos = lines.filter(delta__gt=0).annotate(
-                over=ExpressionWrapper(F("delta"), output_field=FloatField())
-            )
-            avg_over_per_order = pos.aggregate(avg=Avg("over"))["avg"] or 0.0
-
-            # 4) Over‐charge by partner
-            over_per_partner = {
-                rec["run__partner"]: float(rec["total_over"])
-                for rec in pos.values("run__partner")
-                             .annotate(total_over=Sum("over"))
-                             .order_by("-total_over")
-            }
-
-            # 5) Over‐charge by country
-            country_acc = defaultdict(float)
-            for route, over in pos.values_list("route", "over"):
-                buyer = route.split("-",1)[0] if route and "-" in route else route or "Unknown"
-                country_acc[buyer] += over
-            over_per_country = dict(sorted(country_acc.items(), key=lambda x: x[1], reverse=True))
-
-            # 6) Monthly trend
-            trend_dict, partners = defaultdict(dict), set()
-            for rec in pos.annotate(month=TruncMonth("invoice_date")) \
-                          .values("month", "run__partner") \
-                          .annotate(total_over=Sum("over")):
-                m = rec["month"].strftime("%Y-%m")
-                p = rec["run__partner"]
-                trend_dict[m][p] = float(rec["total_over"])
-                partners.add(p)
-
-            trend_data    = [{"month": m, **trend_dict[m]} for m in sorted(trend_dict)]
-            partners_list = sorted(partners)
-
-            # 7) Top 5 lossy routes by **average** over-charge per order
-            route_qs = (
-                pos.values("route")
-                   .annotate(
-                       total_over=Sum("over"),
-                       order_count=Count("id")
-                   )
-                   .filter(order_count__gt=0)
-                   .annotate(
-                       avg_over=ExpressionWrapper(
-                           F("total_over") / F("order_count"),
-                           output_field=FloatField()
-                       )
-                   )
-                   .order_by("-avg_over")[:5]
-            )
-            top_routes = [
-                {
-                    "route":     rec["route"],
-                    "avg_over":  round(rec["avg_over"], 2),
-                    "total_over": float(rec["total_over"]),
-                    "orders":    rec["order_count"],
-                }
-                for rec in route_qs
-            ]
+        try:
+            limit  = int(request.query_params.get("limit", self.DEFAULT_LIMIT))
+            offset = int(request.query_params.get("offset", 0))
+        except ValueError:
+            return Response({"error": "limit and offset must be integers"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1 or offset < 0:
+            return Response({"error": "limit must be positive and offset not negative"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        limit = min(limit, self.MAX_LIMIT)
 
-            # 8) Over-charge by category & weight (average per item)
-            cat_wt_qs = (
-                pos.values("category_lvl_1_and_2", "weight")
-                   .annotate(
-                       total_over=Sum("over"),
-                       count=Count("id"),
-                   )
-                   .annotate(
-                       avg_over=ExpressionWrapper(
-                           F("total_over") / F("count"),
-                           output_field=FloatField()
-                       )
-                   )
-            )
-            
-            # Build a list of { category, weight, avg_over, total_over, count }
-            category_weight = [
-                {
-                    "category":    rec["category_lvl_1_and_2"],
-                    "weight":      float(rec["weight"]),
-                    "total_over":  float(rec["total_over"]),
-                    "count":       rec["count"],
-                    "avg_over":    round(rec["avg_over"], 2),
-                }
-                for rec in cat_wt_qs
-            ]
+        return Response({
+            "run_id":         run.pk,
+            "partner":        run.partner,
+            "invoice_number": run.invoice_number,
+            "count":          lines.count(),
+            "limit":          limit,
+            "offset":         offset,
+            "results":        lines.page(offset, limit),
+        }, status=status.HTTP_200_OK)
+
+
+class AnalyticsView(APIView):
+    """
+    GET /logistics/analytics/
+    Optional query params: from, to (invoice date, YYYY-MM-DD), partner,
+    route, limit, offset (on top_routes / category_weight).
+    Returns comprehensive analytics.
 
-            return Response({
-                "total_runs":         total_runs,
-                "avg_delta_per_run":  round(avg_delta_per_run, 2),
-                "top_partner":        top_partner,
-                "avg_over_per_order": round(avg_over_per_order, 2),
-                "over_per_partner":   over_per_partner,
-                "over_per_country":   over_per_country,
-                "trend_data":         trend_data,
-                "partners_list":      partners_list,
-                "top_routes":         top_routes,
-                "category_weight":    category_weight,
-            }, status=status.HTTP_200_OK)
+    Payloads are cached per analytics version (bumped on every InvoiceRun
+    change) and filter combination, and sent with a matching ETag, so
+    clients revalidating with If-None-Match get a 304 until new runs land.
+    """
+    def get(self, request):
+        try:
+            query = AnalyticsQuery.from_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            variant = query.cache_variant
+            version = analytics_cache.version()
+            etag = analytics_cache.etag(version, variant)
+            if etag and etag in request.headers.get("If-None-Match", ""):
+                response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+                response["ETag"] = etag
+                return response
+
+            payload = analytics_cache.get(version, variant)
+            if payload is None:
+                payload = query.payload()
+                analytics_cache.set(version, payload, variant)
+
+            response = Response(payload, status=status.HTTP_200_OK)
+            if etag:
+                response["ETag"] = etag
+                response["Cache-Control"] = "no-cache"
+            return response
 
         except Exception as e:
             # Print stack to logs and return error to frontend
@@ -262,9 +323,17 @@ class SlackMessagesView(APIView):
     with reply_count, reactions & files.
     """
     def get(self, request):
+        from redis import RedisError
+        from .services.slack_store import slack_store
+
         try:
-            slack = SlackService()
-            all_msgs = slack.get_latest_messages(limit=50)
+            all_msgs = slack_store.messages(limit=50)
+        except RedisError as e:
+            print(f"❌ SlackMessagesView: Slack store unavailable: {e}")
+            return Response(
+                {"error": "Slack messages are temporarily unavailable."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
         except Exception as e:
             return Response(
                 {"error": str(e)},
@@ -328,6 +397,10 @@ class SlackThreadView(APIView):
     each with reactions & files.
     """
     def get(self, request):
+        from redis import RedisError
+        from slack_sdk.errors import SlackApiError
+        from .services.slack_store import slack_store
+
         thread_ts = request.query_params.get("thread_ts")
         if not thread_ts:
             return Response(
@@ -336,8 +409,13 @@ class SlackThreadView(APIView):
             )
 
         try:
-            slack = SlackService()
-            thread_msgs = slack.get_thread(thread_ts, limit=100)
+            thread_msgs = slack_store.thread(thread_ts, limit=100)
+        except RedisError as e:
+            print(f"❌ SlackThreadView: Slack store unavailable: {e}")
+            return Response(
+                {"error": "Slack threads are temporarily unavailable."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
         except SlackApiError as e:
             return Response(
                 {"error": "Failed to fetch thread from Slack."},
@@ -390,6 +468,10 @@ class SlackReactView(APIView):
     Adds/removes the given reaction on the given message.
     """
     def post(self, request):
+        from slack_sdk.errors import SlackApiError
+        from .services.slack_service import SlackService
+        from .services.slack_store import slack_store
+
         ts       = request.data.get("ts")
         reaction = request.data.get("reaction")
         if not ts or not reaction:
@@ -401,6 +483,10 @@ class SlackReactView(APIView):
         try:
             slack = SlackService()
             slack.react_to_message(ts, reaction)
+            try:
+                slack_store.refresh_message(ts)
+            except Exception as e:
+                print(f"⚠️ SlackReactView could not refresh stored message {ts}: {e}")
             return Response({"ok": True}, status=status.HTTP_200_OK)
         except SlackApiError as e:
             print(f"❌ SlackReactView SlackApiError: {e.response['error']}")
@@ -422,6 +508,8 @@ class SlackFileDownloadView(APIView):
     GET /logistics/slack/download/?file_url=…
     """
     def get(self, request):
+        import requests
+
         file_url = request.query_params.get("file_url")
         if not file_url:
             return HttpResponseBadRequest("Missing file_url param")
@@ -455,10 +543,8 @@ class PricingMetadataView(APIView):
         if not partner:
             return Response({"error": "Missing partner"}, status=status.HTTP_400_BAD_REQUEST)
 
-        path = os.path.join(settings.PRICING_DATA_PATH, f"prijslijst_{partner}.json")
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = pricing_registry.get_json(f"prijslijst_{partner}.json")
         except FileNotFoundError:
             return Response({"error": f"No pricing for {partner}"}, status=status.HTTP_404_NOT_FOUND)
         except Exception:
@@ -491,10 +577,8 @@ class PricingLookupView(APIView):
             )
 
         # load your JSON file
-        pricing_path = os.path.join(settings.PRICING_DATA_PATH,
-                                    f"prijslijst_{partner}.json")
         try:
-            df = pd.read_json(pricing_path)
+            df = pricing_registry.get_frame(f"prijslijst_{partner}.json")
         except Exception:
             return Response(
                 {"error": f"Cannot load pricing for {partner}."},
@@ -6,6 +6,8 @@ import { LineChartCard }  from '../components/LineChartCard'
 import { HeatmapCard }    from '../components/HeatmapCard'
 import InfoTooltip        from '../components/InfoTooltip'
 
+const CACHE_KEY = 'analytics-cache'
+
 export default function Analytics() {
   const API = import.meta.env.VITE_API_URL
   const [data, setData]   = useState(null)
@@ -13,12 +15,22 @@ export default function Analytics() {
 
   useEffect(() => {
     async function fetchAnalytics() {
+      // last payload + its ETag, so an unchanged payload is not re-downloaded
+      const cached = JSON.parse(sessionStorage.getItem(CACHE_KEY) || 'null')
+      if (cached) setData(cached.data)
       try {
-        const res = await fetch(`${API}/logistics/analytics/`)
+        const res = await fetch(`${API}/logistics/analytics/`, {
+          cache: 'no-store',
+          headers: cached?.etag ? { 'If-None-Match': cached.etag } : {},
+        })
+        if (res.status === 304 && cached) return
         if (!res.ok) throw new Error(`Server returned ${res.status}`)
-        setData(await res.json())
+        const json = await res.json()
+        setData(json)
+        const etag = res.headers.get('ETag')
+        if (etag) sessionStorage.setItem(CACHE_KEY, JSON.stringify({ etag, data: json }))
       } catch {
-        setError('Could not load analytics')
+        if (!cached) setError('Could not load analytics')
       }
     }
     fetchAnalytics()
@@ -22,10 +22,16 @@ export default function Dashboard() {
   const [data,      setData]     = useState([]);
   const [error,     setError]    = useState("");
   const [taskId,    setTaskId]   = useState(null);
-  const pollRef = useRef(null);
+  const [run,       setRun]      = useState(null);   // { id, count } when lines are paged from the server
+  const [progress,  setProgress] = useState("");
+  const pollRef   = useRef(null);
+  const eventsRef = useRef(null);
 
 
-  useEffect(() => () => clearInterval(pollRef.current), []);
+  useEffect(() => () => {
+    clearInterval(pollRef.current);
+    eventsRef.current?.close();
+  }, []);
 
   
   useEffect(() => {
@@ -55,6 +61,54 @@ export default function Dashboard() {
 
   const onFiles = useCallback((fileList) => setFiles(Array.from(fileList)), []);
 
+  const PROGRESS_LABELS = {
+    started:   () => "Started…",
+    parsed:    (e) => `Parsed ${e.rows} invoice rows${e.cached ? " (cached)" : ""}…`,
+    matched:   (e) => `Matched against ${e.orders} orders…`,
+    priced:    (e) => `Priced ${e.rows} rows…`,
+    persisted: (e) => `Saved ${e.lines} lines…`,
+  };
+
+  // Follow the task over Server-Sent Events; fall back to polling when the
+  // stream cannot be opened.
+  const followTask = (id) => {
+    if (!window.EventSource) {
+      startPolling(id);
+      return;
+    }
+    eventsRef.current?.close();
+    const source = new EventSource(
+      `${API_BASE}/logistics/task-events/?task_id=${encodeURIComponent(id)}`
+    );
+    eventsRef.current = source;
+    let received = false;
+
+    Object.keys(PROGRESS_LABELS).forEach((name) =>
+      source.addEventListener(name, (msg) => {
+        received = true;
+        setProgress(PROGRESS_LABELS[name](JSON.parse(msg.data)));
+      })
+    );
+    source.addEventListener("result", (msg) => {
+      source.close();
+      setProgress("");
+      applyResult(JSON.parse(msg.data).result);
+    });
+    source.addEventListener("error", (msg) => {
+      if (msg.data) {
+        // error event sent by the server
+        source.close();
+        setProgress("");
+        setError(JSON.parse(msg.data).error || "Server failed to process the task.");
+        setLoading(false);
+      } else if (!received) {
+        // connection failed before any event
+        source.close();
+        startPolling(id);
+      }
+    });
+  };
+
   const startPolling = (id) => {
     pollRef.current = setInterval(async () => {
       try {
@@ -82,16 +136,46 @@ export default function Dashboard() {
     }, 2000);
   };
 
-  const applyResult = (resData) => {
-    const { delta_sum, delta_ok, sheet_url, message } = resData;
-    const returnedData = Array.isArray(resData.data)
+  const PAGE_SIZE = 500;
+
+  const fetchLines = async (runId, offset) => {
+    const res = await axios.get(`${API_BASE}/logistics/runs/${runId}/lines/`, {
+      params: { limit: PAGE_SIZE, offset },
+    });
+    return res.data;
+  };
+
+  const applyResult = async (resData) => {
+    if (resData.error) {
+      setData([]);
+      setError(resData.error);
+      setLoading(false);
+      return;
+    }
+    const { delta_sum, delta_ok, sheet_url, message, run_id } = resData;
+    setDeltaSum(delta_sum);
+    setDeltaOk(delta_ok);
+    setSheetUrl(sheet_url);
+
+    let returnedData = Array.isArray(resData.data)
       ? resData.data
       : Array.isArray(resData.table_data)
       ? resData.table_data
       : [];
-    setDeltaSum(delta_sum);
-    setDeltaOk(delta_ok);
-    setSheetUrl(sheet_url);
+    setRun(null);
+    if (run_id && !returnedData.length) {
+      try {
+        const page = await fetchLines(run_id, 0);
+        returnedData = page.results;
+        setRun({ id: run_id, count: page.count });
+      } catch (e) {
+        setError(e.response?.data?.error || e.message || "Could not load run lines.");
+        setData([]);
+        setLoading(false);
+        return;
+      }
+    }
+
     if (returnedData.length) {
       setData(returnedData);
       setError("");
@@ -102,6 +186,17 @@ export default function Dashboard() {
     setLoading(false);
   };
 
+  const loadMore = async () => {
+    if (!run) return;
+    try {
+      const page = await fetchLines(run.id, data.length);
+      setData((prev) => [...prev, ...page.results]);
+      setRun({ id: run.id, count: page.count });
+    } catch (e) {
+      setError(e.response?.data?.error || e.message || "Could not load more lines.");
+    }
+  };
+
   const handleSubmit = async (overrideFiles, overridePartner) => {
     const useFiles   = overrideFiles   || files;
     const usePartner = overridePartner || partner;
@@ -153,7 +248,7 @@ export default function Dashboard() {
       );
       if (res.status === 202 && res.data.task_id) {
         setTaskId(res.data.task_id);
-        startPolling(res.data.task_id);
+        followTask(res.data.task_id);
       } else {
         applyResult(res.data);
       }
@@ -181,6 +276,7 @@ export default function Dashboard() {
       >
         {loading ? "Processing…" : "Upload & Analyze"}
       </button>
+      {loading && progress && <p className="text-gray-600">{progress}</p>}
 
       {error && <p className="text-red-600 whitespace-pre-wrap">{error}</p>}
 
@@ -205,6 +301,32 @@ export default function Dashboard() {
             )}
           </div>
           <Table data={data} />
+          {run && (
+            <div className="flex justify-between items-center text-sm">
+              <span>
+                Showing {data.length} of {run.count} lines
+              </span>
+              <div className="space-x-4">
+                {data.length < run.count && (
+                  <button onClick={loadMore} className="text-indigo-600 hover:underline">
+                    Load more
+                  </button>
+                )}
+                <a
+                  href={`${API_BASE}/logistics/runs/${run.id}/lines/?download=csv`}
+                  className="text-indigo-600 hover:underline"
+                >
+                  Download CSV
+                </a>
+                <a
+                  href={`${API_BASE}/logistics/runs/${run.id}/lines/?download=ndjson`}
+                  className="text-indigo-600 hover:underline"
+                >
+                  Download NDJSON
+                </a>
+              </div>
+            </div>
+          )}
         </div>
       )}
     </div>